@@ -29,7 +29,7 @@ class AbstractAnalyser:
         self._output_location = os.path.join(os.getcwd(), *output_path)
 
 
-    def analyse(self, start: str, end: str, analysis_type: AnalysisType, *args):
+    def analyse(self, start: str, end: str, analysis_type: AnalysisType, *args, **kwargs):
         """
         Parameters
         ----------
@@ -41,9 +41,17 @@ class AbstractAnalyser:
 
         analysis_type : AnalysisType
             The chosen type of anayzis for this method call.
+
+        Additional keyword arguments are forwarded to the subclass implementation,
+        e.g. to choose the output format.
+
+        Returns
+        -------
+        Whatever the subclass implementation of _analyse returns,
+        e.g. futures of the written output files.
         """
         self.__check_parameters(start, end, analysis_type, *args)
-        self._analyse(start, end, analysis_type, *args)
+        return self._analyse(start, end, analysis_type, *args, **kwargs)
     
 
     def __check_parameters(self, start: str, end: str, analysis_type: AnalysisType, *args):
@@ -72,7 +80,7 @@ class AbstractAnalyser:
         # TODO: check if dates have valid format
 
 
-    def _analyse(self, start_date: str, end_date: str, analysis_type: AnalysisType, *args):
+    def _analyse(self, start_date: str, end_date: str, analysis_type: AnalysisType, *args, **kwargs):
         """
         Parameters
         ----------
@@ -1,17 +1,25 @@
+from __future__ import annotations
+
 import os
 import math
 import datetime
 from typing import List, Tuple, Union
 
 import numpy as np
-import pandas as pd
 
+from common.lazy_import import LazyModule
 from summary.summary_container import SummaryContainer
 from common.constants import *
-from common.date_helper import *
-# from common.date_helper import all_date_strings_between_dates, get_day_before
+from common.date_helper import get_day_before, get_n_days_before, get_n_days_after
 from analyser.abstract_analyser import AbstractAnalyser
 from analyser.transform_measurements import *
+from analyser.analysis_type_configurations import RollingTraceKind, CorrelationMethod
+from analyser.rolling_window import rolling_mean, rolling_baseline
+from analyser.correlation import pairwise_correlation
+from analyser.circular_statistics import circular_mean, circular_percentiles, seconds_of_day_to_hours
+
+# pandas is only imported when the first plot gets created
+pd = LazyModule('pandas')
 
 
 class AbstractPlotter(AbstractAnalyser):
@@ -65,6 +73,289 @@ class AbstractPlotter(AbstractAnalyser):
         return dates_by_periodicity, plot_data_sets, plot_legends, plot_units
 
 
+    def _get_year_comparison_data_sets(self, start: str, end: str, periodicity: Periodicity, summary_type_measurement_tuples: List[Tuple[str, str]]) -> Tuple[np.array, List[np.array], List[str], List[Unit]]:
+        """
+        Averaging the daily values of each year separately by week or month of the year,
+        so the years can be compared on one axis.
+        The weeks of the year are counted in blocks of seven days from the first of january.
+
+        Parameters
+        ----------
+        start : str
+            Analysis start date in YYYY-MM-DD format.
+
+        end : str
+            Analysis end date in YYYY-MM-DD format.
+
+        periodicity : Periodicity
+            Either Periodicity.weekly or Periodicity.monthly.
+
+        summary_type_measurement_tuples : str
+            List of Tuples, where each tuple represents the summary type and 
+            measurement name which will get plotted.
+
+        Returns
+        --------
+        Tuple
+            np.array of the week or month numbers within the year,
+            List of np.arrays with the averaged values of each year and measurement,
+            List of titles of the measurement and year,
+            List of units of the measurements
+        """
+
+        days = pd.date_range(start, end)
+        year_indices = np.asarray(days.year - days[0].year)
+        n_years = year_indices[-1] + 1
+
+        if periodicity == Periodicity.weekly:
+            period_indices = np.asarray(days.day_of_year - 1) // 7
+            n_periods = 53
+        elif periodicity == Periodicity.monthly:
+            period_indices = np.asarray(days.month - 1)
+            n_periods = 12
+        else:
+            raise ValueError("Years can only be compared by weeks or months")
+
+        # one bucket for each period of each year
+        bucket_indices = year_indices * n_periods + period_indices
+
+        plot_data_sets, plot_legends, plot_units = [], [], []
+        for summary_type, measurement_name in summary_type_measurement_tuples:
+            daily_data, plot_legend_name, plot_unit = self._get_plottable_data(start, end, Periodicity.daily, summary_type, measurement_name)
+            daily_values = np.asarray(daily_data, dtype=float)
+            available = np.isfinite(daily_values)
+
+            sums = np.bincount(bucket_indices[available], weights=daily_values[available], minlength=n_years * n_periods)
+            counts = np.bincount(bucket_indices[available], minlength=n_years * n_periods)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                averages_by_year = (sums / counts).reshape(n_years, n_periods)
+
+            for year_index in range(n_years):
+                plot_data_sets.append(averages_by_year[year_index])
+                plot_legends.append("{} {}".format(plot_legend_name, days[0].year + year_index))
+                plot_units.append(plot_unit)
+
+        return np.arange(1, n_periods + 1), plot_data_sets, plot_legends, plot_units
+
+
+    def _get_rolling_plot_data_sets(self, start: str, end: str, summary_type_measurement_tuples: List[Tuple[str, str]], rolling_windows: List[int], baseline_window: int = None) -> Tuple[List[np.array], List[str], List[RollingTraceKind], List[int]]:
+        """
+        Computing rolling window statistics of the daily values of multiple
+        summary_type-measurement_name combinations, all measurements in one pass.
+        The days before the start date are loaded as well, so the windows of the first days are filled.
+
+        Parameters
+        ----------
+        start : str
+            Analysis start date in YYYY-MM-DD format.
+
+        end : str
+            Analysis end date in YYYY-MM-DD format.
+
+        summary_type_measurement_tuples : str
+            List of Tuples, where each tuple represents the summary type and 
+            measurement name which will get plotted.
+
+        rolling_windows : List[int]
+            Window sizes in days, for each of them the rolling means are computed.
+
+        baseline_window : int
+            Window size in days of the baseline, the mean and standard deviation of the days before each day.
+            If None, no baseline is computed.
+
+        Returns
+        --------
+        Tuple of multiple lists:
+            List of np.arrays with one value per day from start to end,
+            List of titles of the rolling statistics,
+            List of the kinds of the rolling statistics,
+            List of the indices of the summary_type-measurement_name combination each statistic belongs to
+        """
+
+        windows = list(rolling_windows)
+        if baseline_window:
+            windows.append(baseline_window)
+        if len(windows) == 0:
+            return [], [], [], []
+
+        # the windows of the first days are reaching into the days before the start date
+        loading_offset = max(windows)
+        loading_start = get_n_days_before(start, loading_offset)
+
+        # one column per measurement
+        daily_data_sets, titles = [], []
+        for summary_type, measurement_name in summary_type_measurement_tuples:
+            plot_data, plot_legend_name, _ = self._get_plottable_data(loading_start, end, Periodicity.daily, summary_type, measurement_name)
+            daily_data_sets.append(np.asarray(plot_data, dtype=float))
+            titles.append(plot_legend_name)
+        daily_values = np.column_stack(daily_data_sets)
+
+        rolling_data_sets, rolling_legends, rolling_kinds, rolling_indices = [], [], [], []
+
+        for window in rolling_windows:
+            means = rolling_mean(daily_values, window)[loading_offset:]
+            for index, title in enumerate(titles):
+                rolling_data_sets.append(means[:, index])
+                rolling_legends.append("{} ({}-day mean)".format(title, window))
+                rolling_kinds.append(RollingTraceKind.mean)
+                rolling_indices.append(index)
+
+        if baseline_window:
+            baseline_means, baseline_stds = rolling_baseline(daily_values, baseline_window)
+            baseline_means = baseline_means[loading_offset:]
+            baseline_stds = baseline_stds[loading_offset:]
+
+            for index, title in enumerate(titles):
+                legend = "{} ({}-day baseline)".format(title, baseline_window)
+                rolling_data_sets += [baseline_means[:, index], baseline_means[:, index] - baseline_stds[:, index], baseline_means[:, index] + baseline_stds[:, index]]
+                rolling_legends += [legend, legend, legend]
+                rolling_kinds += [RollingTraceKind.baseline, RollingTraceKind.baseline_band_lower, RollingTraceKind.baseline_band_upper]
+                rolling_indices += [index, index, index]
+
+        return rolling_data_sets, rolling_legends, rolling_kinds, rolling_indices
+
+
+    def _get_time_of_day_percentile_data_sets(self, start: str, end: str, periodicity: Periodicity, summary_type_measurement_tuples: List[Tuple[str, str]], percentiles: Tuple[float, float]) -> Tuple[List[np.array], List[str], List[RollingTraceKind], List[int]]:
+        """
+        Computing a band between a lower and an upper percentile of the times of day in each bucket of the periodicity,
+        for all summary_type-measurement_name combinations with times of day. Other measurements get no band.
+        The results have the same format as the rolling window statistics, so they are drawn the same way.
+
+        Parameters
+        ----------
+        start : str
+            Analysis start date in YYYY-MM-DD format.
+
+        end : str
+            Analysis end date in YYYY-MM-DD format.
+
+        periodicity : Periodicity
+            Which timeframes must be considered. Periodicity.daily may not be called here.
+
+        summary_type_measurement_tuples : str
+            List of Tuples, where each tuple represents the summary type and 
+            measurement name which will get plotted.
+
+        percentiles : Tuple[float, float]
+            Lower and upper percentile of the band, in [0, 100].
+
+        Returns
+        --------
+        Tuple of multiple lists:
+            List of np.arrays with one value per bucket in hours,
+            List of titles of the bands,
+            List of the kinds of the traces,
+            List of the indices of the summary_type-measurement_name combination each band belongs to
+        """
+
+        if periodicity == Periodicity.daily:
+            raise AttributeError()
+
+        bucket_indices = self._get_bucket_indices_by_periodicity(start, end, periodicity)
+        n_buckets = len(self._get_dates_by_periodicity(start, end, periodicity))
+        lower_percentile, upper_percentile = percentiles
+
+        data_sets, legends, kinds, indices = [], [], [], []
+        for index, (summary_type, measurement_name) in enumerate(summary_type_measurement_tuples):
+            summary_transform = summary_type_transform[summary_type]
+            if measurement_name not in summary_transform.keys():
+                continue
+            _, _, _, _, trans_unit, measurement_title, one_day_offset = summary_transform[measurement_name]
+            if trans_unit != Unit.time_of_day:
+                continue
+
+            if one_day_offset:
+                loading_start, loading_end = get_day_before(start), get_day_before(end)
+            else:
+                loading_start, loading_end = start, end
+
+            daily_seconds = self._container.get_values(loading_start, loading_end, summary_type, measurement_name)
+            lower, upper = circular_percentiles(daily_seconds, bucket_indices, n_buckets, [lower_percentile, upper_percentile])
+
+            legend = "{} ({:g}th to {:g}th percentile)".format(measurement_title, lower_percentile, upper_percentile)
+            data_sets += [seconds_of_day_to_hours(lower), seconds_of_day_to_hours(upper)]
+            legends += [legend, legend]
+            kinds += [RollingTraceKind.percentile_band_lower, RollingTraceKind.percentile_band_upper]
+            indices += [index, index]
+
+        return data_sets, legends, kinds, indices
+
+
+    def _get_correlation_data(self, start: str, end: str, summary_type_measurement_lag_tuples: List[Tuple[SummaryType, str, int]], method: CorrelationMethod) -> Tuple[np.array, List[str]]:
+        """
+        Computing the correlations between all pairs of the given measurements.
+        All measurements are loaded through the container into one aligned matrix with one row per day,
+        lagged measurements are shifted, so e.g. a lag of 1 puts the value of day N+1 into the row of day N.
+        Measurements with a one day offset are shifted the same way as in the other plots.
+
+        Parameters
+        ----------
+        start : str
+            Analysis start date in YYYY-MM-DD format.
+
+        end : str
+            Analysis end date in YYYY-MM-DD format.
+
+        summary_type_measurement_lag_tuples : List[Tuple[SummaryType, str, int]]
+            List of Tuples of the summary type, the measurement name and the lag in days.
+            If the measurement name is None, all measurements of the summary type are used.
+
+        method : CorrelationMethod
+            Pearson or spearman correlation.
+
+        Returns
+        --------
+        Tuple
+            np.array of the correlations with one row and column per measurement,
+            List of the titles of the measurements
+        """
+
+        # expanding summary types without measurement name into all their measurements
+        columns = []
+        for summary_type, measurement_name, lag in summary_type_measurement_lag_tuples:
+            if measurement_name is None:
+                columns += [(summary_type, name, lag) for name in self._container.get_measurement_names(summary_type)]
+            else:
+                columns.append((summary_type, measurement_name, lag))
+
+        if len(columns) == 0:
+            raise ValueError("No measurements available to correlate")
+
+        # shifts in days of the loaded values and titles for each column
+        shifts, titles = [], []
+        for summary_type, measurement_name, lag in columns:
+            summary_transform = summary_type_transform[summary_type]
+            if measurement_name in summary_transform.keys():
+                _, _, _, _, _, measurement_title, one_day_offset = summary_transform[measurement_name]
+            else:
+                measurement_title, one_day_offset = measurement_name, False
+
+            shifts.append(lag - 1 if one_day_offset else lag)
+            if lag != 0:
+                measurement_title = "{} ({:+d} {})".format(measurement_title, lag, "day" if abs(lag) == 1 else "days")
+            titles.append(measurement_title)
+
+        # loading each measurement only once, for all days any of its shifts needs
+        min_shift, max_shift = min(0, min(shifts)), max(0, max(shifts))
+        loading_start = get_n_days_before(start, -min_shift)
+        loading_end = get_n_days_after(end, max_shift)
+
+        measurements = []
+        for summary_type, measurement_name, _ in columns:
+            if (summary_type, measurement_name) not in measurements:
+                measurements.append((summary_type, measurement_name))
+        loaded_values = self._container.get_value_matrix(loading_start, loading_end, measurements)
+
+        n_days = loaded_values.shape[0] - (max_shift - min_shift)
+        aligned_values = np.empty((n_days, len(columns)))
+        for column, ((summary_type, measurement_name, _), shift) in enumerate(zip(columns, shifts)):
+            loaded_column = measurements.index((summary_type, measurement_name))
+            offset = shift - min_shift
+            aligned_values[:, column] = loaded_values[offset:offset + n_days, loaded_column]
+
+        return pairwise_correlation(aligned_values, method), titles
+
+
     def _get_plottable_data(self, start: str, end: str, periodicity: Periodicity, summary_type: str, measurement_name: str) -> Tuple[Union[np.array, List], str, Unit]:
         """
         Retrieving the raw data form the summary container, 
@@ -131,7 +422,10 @@ class AbstractPlotter(AbstractAnalyser):
         if periodicity == Periodicity.daily:
             plot_data = daily_plot_data
         else:
-            if transformed_values_are_numerical:
+            if trans_unit == Unit.time_of_day:
+                # times of day wrap around midnight, so they are averaged on the circle
+                plot_data = self.__transform_daily_times_of_day_to_averaged_by_periodicity(start, end, periodicity, raw_data)
+            elif transformed_values_are_numerical:
                 plot_data = self.__transform_daily_values_to_averaged_by_periodictiy(start, end, periodicity, daily_plot_data)
             else:
                 raise NotImplementedError()
@@ -142,7 +436,7 @@ class AbstractPlotter(AbstractAnalyser):
     def _get_dates_by_periodicity(self, start: str, end: str, periodicity: Periodicity) -> pd.DatetimeIndex:
         """
         Creating pd.DatetimeIndex of all relevant datetime events to plot with the given periodicity. 
-        For weekly and monthly the week/month the start and end date are in are included.
+        For weekly, monthly and yearly the week/month/year the start and end date are in are included.
         """
 
         if periodicity == Periodicity.daily:
@@ -157,23 +451,53 @@ class AbstractPlotter(AbstractAnalyser):
             return date_range
         
         if periodicity == Periodicity.monthly:
-            date_range = pd.date_range(*(pd.to_datetime([start, end]) + pd.offsets.MonthEnd()), freq='M')
-            if date_range[-1].month != pd.to_datetime([end])[0].month:
-                date_range = date_range[:-1]
+            # last day of each month
+            date_range = pd.period_range(start, end, freq='M').to_timestamp(how='end').normalize()
             return date_range
         
         if periodicity == Periodicity.yearly:
-            raise NotImplementedError()
+            # last day of each year
+            date_range = pd.period_range(start, end, freq='Y').to_timestamp(how='end').normalize()
+            return date_range
 
         if periodicity == Periodicity.weekdays:
             date_range = pd.date_range(start, periods=7)
             return date_range
 
 
+    def _get_bucket_indices_by_periodicity(self, start: str, end: str, periodicity: Periodicity) -> np.array:
+        """
+        Creating an np.array with one entry for each date from start to end,
+        containing the index of the bucket the date belongs to with the given periodicity.
+        The buckets are in the same order as the dates created by _get_dates_by_periodicity.
+        """
+
+        days = pd.date_range(start, end)
+
+        if periodicity == Periodicity.daily:
+            return np.arange(len(days))
+
+        if periodicity == Periodicity.weekly:
+            # weeks from monday until sunday
+            first_monday = days[0] - pd.Timedelta(days=days[0].day_of_week)
+            return np.asarray((days - first_monday).days) // 7
+
+        if periodicity == Periodicity.monthly:
+            return np.asarray((days.year - days[0].year) * 12 + days.month - days[0].month)
+
+        if periodicity == Periodicity.yearly:
+            return np.asarray(days.year - days[0].year)
+
+        if periodicity == Periodicity.weekdays:
+            # the weekdays start with the weekday of the start date
+            return np.asarray((days.day_of_week - days[0].day_of_week) % 7)
+
+
     def __transform_daily_values_to_averaged_by_periodictiy(self, start: str, end: str, periodicity: Periodicity, daily_data: Union[np.array, List]) -> np.array:
         """
         Averaging the daily values into averaged values depending on the periodicity.
         For e.g. the weekly periodicity the values of each week get averaged into one value.
+        Days without a value are left out of the average, buckets without any value are NaN.
 
         Parameters
         ----------
@@ -198,44 +522,37 @@ class AbstractPlotter(AbstractAnalyser):
         if periodicity == Periodicity.daily:
             raise AttributeError()
 
-        dates = all_date_strings_between_dates(start, end)
+        bucket_indices = self._get_bucket_indices_by_periodicity(start, end, periodicity)
+        n_buckets = len(self._get_dates_by_periodicity(start, end, periodicity))
 
-        # defining functions to transform datetime objects into unique identifiers 
-        # and so sort those chronologically
-        if periodicity == Periodicity.weekly:
-            date_obj_to_identifier_func = lambda date_obj: (date_obj.year, date_obj.isocalendar()[1])
-            identifier_sorting = lambda identifier: identifier[0] * 100 + identifier[1] 
-        elif periodicity == Periodicity.monthly:
-            date_obj_to_identifier_func = lambda date_obj: (date_obj.year, date_obj.month)
-            identifier_sorting = lambda identifier: identifier[0] * 100 + identifier[1] 
-        elif periodicity == Periodicity.weekdays:
-            date_obj_to_identifier_func = lambda date_obj: date_obj.isocalendar()[2]
-            identifier_sorting = lambda identifier: identifier 
-        elif periodicity == Periodicity.yearly:
-            date_obj_to_identifier_func = lambda date_obj: date_obj.year
-            identifier_sorting = lambda identifier: identifier 
-
-        # partioning by week
-        buckets = dict()
-        for index, date_str in enumerate(dates):
-            date_obj = simple_string_to_datetime(date_str)
-            identifier = date_obj_to_identifier_func(date_obj)
-
-            if identifier not in buckets.keys():
-                buckets[identifier] = []
-            
-            day_value = daily_data[index]
-            buckets[identifier].append(day_value)
-
-        # averaging daily values into one weekly value
-        averaged_values = dict()
-        for identifier, daily_values in buckets.items():
-            averaged_value = np.average(daily_values)
-            averaged_values[identifier] = averaged_value
-
-        # transforming dict into list in chronological order
-        mapped_averaged_value_tuples = map(lambda k: (identifier_sorting(k), averaged_values[k]), averaged_values.keys())
-        sorted_averaged_value_tuples = sorted(mapped_averaged_value_tuples, key=lambda s: s[0])
-        average_values_sorted_by_identifiers = list(map(lambda t: t[1], sorted_averaged_value_tuples))
-        
-        return np.asarray(average_values_sorted_by_identifiers)
+        daily_values = np.asarray(daily_data, dtype=float)
+        available = np.isfinite(daily_values)
+
+        # summing and counting the values of each bucket
+        sums = np.bincount(bucket_indices[available], weights=daily_values[available], minlength=n_buckets)
+        counts = np.bincount(bucket_indices[available], minlength=n_buckets)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return sums / counts
+
+
+    def __transform_daily_times_of_day_to_averaged_by_periodicity(self, start: str, end: str, periodicity: Periodicity, daily_seconds: np.array) -> np.array:
+        """
+        Averaging daily times of day, given as seconds relative to midnight, 
+        with the circular mean of each bucket of the periodicity.
+        Days without a value are left out of the average, buckets without any value are NaN.
+
+        Returns
+        --------
+        np.array 
+            of the averaged times of day in hours, see seconds_of_day_to_hours
+        """
+
+        if periodicity == Periodicity.daily:
+            raise AttributeError()
+
+        bucket_indices = self._get_bucket_indices_by_periodicity(start, end, periodicity)
+        n_buckets = len(self._get_dates_by_periodicity(start, end, periodicity))
+
+        means = circular_mean(np.asarray(daily_seconds, dtype=float), bucket_indices, n_buckets)
+        return seconds_of_day_to_hours(means)
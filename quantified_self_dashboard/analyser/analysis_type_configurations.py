@@ -8,6 +8,66 @@ PlotType = Enum(
         ('lines', 1),
         ('bar_chart', 2),
         ('histogram', 3),
+        ('heatmap', 4),
+        ('year_comparison', 5),
+    ]
+)
+
+OutputFormat = Enum(
+    value = 'OutputFormat',
+    names = [
+        ('png', 0),
+        ('html', 1),
+        ('png_and_html', 2),
+    ]
+)
+default_output_format = OutputFormat.png
+
+# how the plotly.js library is included into html outputs
+HtmlBundle = Enum(
+    value = 'HtmlBundle',
+    names = [
+        # each html file contains the whole library
+        ('self_contained', 0),
+        # all html files reference one plotly.min.js file in the output directory
+        ('shared', 1),
+    ]
+)
+default_html_bundle = HtmlBundle.self_contained
+
+# reduction of the points of long line plots
+DownsamplingMethod = Enum(
+    value = 'DownsamplingMethod',
+    names = [
+        ('none', 0),
+        # Largest-Triangle-Three-Buckets
+        ('lttb', 1),
+        # minimum and maximum per bucket
+        ('min_max', 2),
+    ]
+)
+default_downsampling_method = DownsamplingMethod.none
+default_downsampling_max_points = 1000
+
+CorrelationMethod = Enum(
+    value = 'CorrelationMethod',
+    names = [
+        ('pearson', 0),
+        ('spearman', 1),
+    ]
+)
+default_correlation_method = CorrelationMethod.pearson
+
+# kinds of traces drawn on top of line plots, derived from rolling windows or percentiles
+RollingTraceKind = Enum(
+    value = 'RollingTraceKind',
+    names = [
+        ('mean', 0),
+        ('baseline', 1),
+        ('baseline_band_lower', 2),
+        ('baseline_band_upper', 3),
+        ('percentile_band_lower', 4),
+        ('percentile_band_upper', 5),
     ]
 )
 
@@ -35,6 +95,29 @@ analysis_type_plot_titles_template = {
     AnalysisType.sleep_score_distribution: "Sleep Score Distribution from {} until {}",
     AnalysisType.readiness_score_distribution: "Readiness Score Distribution from {} until {}",
     AnalysisType.activity_score_distribution: "Activity Score Distribution from {} until {}",
+
+    AnalysisType.scores_rolling: "Rolling Scores",
+    AnalysisType.recovery_indicators_rolling: "Rolling Recovery Indicators",
+
+    AnalysisType.correlation_matrix: "Correlations from {} until {}",
+
+    AnalysisType.scores_yearly: "Yearly Scores",
+    AnalysisType.sleep_durations_yearly: "Yearly Sleep Times",
+    AnalysisType.bedtimes_yearly: "Yearly Bedtimes from {} until {}",
+    AnalysisType.recovery_indicators_yearly: "Yearly Recovery Indicators",
+
+    AnalysisType.sleep_score_weekly_by_year: "Weekly Sleep Score by Year",
+    AnalysisType.readiness_score_weekly_by_year: "Weekly Readiness Score by Year",
+    AnalysisType.rmssd_weekly_by_year: "Weekly RMSSD by Year",
+
+    AnalysisType.bedtime_windows_weekly: "Weekly Bedtime Windows",
+    AnalysisType.bedtime_windows_monthly: "Monthly Bedtime Windows",
+    AnalysisType.bedtime_windows_weekdays: "Bedtime Windows by Weekday",
+
+    AnalysisType.sleep_score_distribution_by_year: "Sleep Score Distribution by Year from {} until {}",
+    AnalysisType.readiness_score_distribution_by_year: "Readiness Score Distribution by Year from {} until {}",
+    AnalysisType.activity_score_distribution_by_year: "Activity Score Distribution by Year from {} until {}",
+    AnalysisType.scores_cumulative_distribution: "Cumulative Score Distributions from {} until {}",
 }
 
 analysis_type_summary_type_measurement_tuples = {
@@ -61,6 +144,48 @@ analysis_type_summary_type_measurement_tuples = {
     AnalysisType.sleep_score_distribution: [(SummaryType.sleep, "score")],
     AnalysisType.readiness_score_distribution: [(SummaryType.readiness, "score")],
     AnalysisType.activity_score_distribution: [(SummaryType.activity, "score")],
+
+    AnalysisType.scores_rolling: [(SummaryType.sleep, "score"), (SummaryType.readiness, "score"), (SummaryType.activity, "score")],
+    AnalysisType.recovery_indicators_rolling: [(SummaryType.sleep, 'hr_lowest'), (SummaryType.sleep, 'rmssd')],
+
+    # correlations: (summary type, measurement name or None for all measurements of the summary type, lag in days)
+    # a lag of 1 compares the values of day N with the measurement of day N+1
+    AnalysisType.correlation_matrix: [
+        (SummaryType.subjective, None, 0),
+        (SummaryType.sleep, "score", 0),
+        (SummaryType.sleep, "total", 0),
+        (SummaryType.sleep, "deep", 0),
+        (SummaryType.sleep, "rem", 0),
+        (SummaryType.sleep, "bedtime_start_delta", 0),
+        (SummaryType.sleep, "hr_lowest", 0),
+        (SummaryType.sleep, "rmssd", 0),
+        (SummaryType.readiness, "score", 0),
+        (SummaryType.activity, "score", 0),
+        (SummaryType.activity, "daily_movement", 0),
+        (SummaryType.activity, "cal_active", 0),
+        (SummaryType.sleep, "score", 1),
+        (SummaryType.sleep, "hr_lowest", 1),
+        (SummaryType.sleep, "rmssd", 1),
+        (SummaryType.readiness, "score", 1),
+    ],
+
+    AnalysisType.scores_yearly: [(SummaryType.sleep, "score"), (SummaryType.readiness, "score"), (SummaryType.activity, "score")],
+    AnalysisType.sleep_durations_yearly: [(SummaryType.sleep, "deep"), (SummaryType.sleep, "rem"), (SummaryType.sleep, "light"), (SummaryType.sleep, "awake")],
+    AnalysisType.bedtimes_yearly: [(SummaryType.sleep, "bedtime_start_delta"), (SummaryType.sleep, "duration")],
+    AnalysisType.recovery_indicators_yearly: [(SummaryType.sleep, 'hr_lowest'), (SummaryType.sleep, 'rmssd')],
+
+    AnalysisType.sleep_score_weekly_by_year: [(SummaryType.sleep, "score")],
+    AnalysisType.readiness_score_weekly_by_year: [(SummaryType.readiness, "score")],
+    AnalysisType.rmssd_weekly_by_year: [(SummaryType.sleep, "rmssd")],
+
+    AnalysisType.bedtime_windows_weekly: [(SummaryType.bedtime, "bedtime_window_start"), (SummaryType.bedtime, "bedtime_window_end"), (SummaryType.sleep, "bedtime_start_delta")],
+    AnalysisType.bedtime_windows_monthly: [(SummaryType.bedtime, "bedtime_window_start"), (SummaryType.bedtime, "bedtime_window_end"), (SummaryType.sleep, "bedtime_start_delta")],
+    AnalysisType.bedtime_windows_weekdays: [(SummaryType.bedtime, "bedtime_window_start"), (SummaryType.bedtime, "bedtime_window_end"), (SummaryType.sleep, "bedtime_start_delta")],
+
+    AnalysisType.sleep_score_distribution_by_year: [(SummaryType.sleep, "score")],
+    AnalysisType.readiness_score_distribution_by_year: [(SummaryType.readiness, "score")],
+    AnalysisType.activity_score_distribution_by_year: [(SummaryType.activity, "score")],
+    AnalysisType.scores_cumulative_distribution: [(SummaryType.sleep, "score"), (SummaryType.readiness, "score"), (SummaryType.activity, "score")],
 }
 
 analysis_type_periodicity = {
@@ -87,11 +212,34 @@ analysis_type_periodicity = {
     AnalysisType.sleep_score_distribution: Periodicity.daily,
     AnalysisType.readiness_score_distribution: Periodicity.daily,
     AnalysisType.activity_score_distribution: Periodicity.daily,
+
+    AnalysisType.scores_rolling: Periodicity.daily,
+    AnalysisType.recovery_indicators_rolling: Periodicity.daily,
+
+    AnalysisType.correlation_matrix: Periodicity.daily,
+
+    AnalysisType.scores_yearly: Periodicity.yearly,
+    AnalysisType.sleep_durations_yearly: Periodicity.yearly,
+    AnalysisType.bedtimes_yearly: Periodicity.yearly,
+    AnalysisType.recovery_indicators_yearly: Periodicity.yearly,
+
+    AnalysisType.sleep_score_weekly_by_year: Periodicity.weekly,
+    AnalysisType.readiness_score_weekly_by_year: Periodicity.weekly,
+    AnalysisType.rmssd_weekly_by_year: Periodicity.weekly,
+
+    AnalysisType.bedtime_windows_weekly: Periodicity.weekly,
+    AnalysisType.bedtime_windows_monthly: Periodicity.monthly,
+    AnalysisType.bedtime_windows_weekdays: Periodicity.weekdays,
+
+    AnalysisType.sleep_score_distribution_by_year: Periodicity.daily,
+    AnalysisType.readiness_score_distribution_by_year: Periodicity.daily,
+    AnalysisType.activity_score_distribution_by_year: Periodicity.daily,
+    AnalysisType.scores_cumulative_distribution: Periodicity.daily,
 }
 default_periodicity = Periodicity.daily
 
 analysis_type_plot_kwargs = {
-    AnalysisType.scores_daily: {'yaxis_to_zero': True},
+    AnalysisType.scores_daily: {'yaxis_to_zero': True, 'downsampling': DownsamplingMethod.lttb},
     AnalysisType.scores_weekly: {'yaxis_to_zero': True},
     AnalysisType.scores_monthly: {'yaxis_to_zero': True},
     AnalysisType.scores_weekdays: {'yaxis_to_zero': True},
@@ -101,10 +249,36 @@ analysis_type_plot_kwargs = {
     AnalysisType.sleep_durations_monthly: {'yaxis_to_zero': True},
     AnalysisType.sleep_durations_weekdays: {'yaxis_to_zero': True},
 
-    AnalysisType.recovery_indicators_daily: {'yaxis_to_zero': True},
+    AnalysisType.recovery_indicators_daily: {'yaxis_to_zero': True, 'downsampling': DownsamplingMethod.lttb},
     AnalysisType.recovery_indicators_weekly: {'yaxis_to_zero': True},
     AnalysisType.recovery_indicators_monthly: {'yaxis_to_zero': True},
     AnalysisType.recovery_indicators_weekdays: {'yaxis_to_zero': True},
+
+    # rolling means of the given windows in days and
+    # the baseline of the previous days with a band of one standard deviation
+    AnalysisType.scores_rolling: {'yaxis_to_zero': True, 'downsampling': DownsamplingMethod.lttb, 'rolling_windows': [7, 28]},
+    AnalysisType.recovery_indicators_rolling: {'yaxis_to_zero': True, 'downsampling': DownsamplingMethod.lttb, 'rolling_windows': [7], 'rolling_baseline_window': 28},
+
+    AnalysisType.correlation_matrix: {'correlation_method': CorrelationMethod.pearson},
+
+    AnalysisType.scores_yearly: {'yaxis_to_zero': True},
+    AnalysisType.sleep_durations_yearly: {'yaxis_to_zero': True},
+    AnalysisType.recovery_indicators_yearly: {'yaxis_to_zero': True},
+
+    AnalysisType.sleep_score_weekly_by_year: {'yaxis_to_zero': True},
+    AnalysisType.readiness_score_weekly_by_year: {'yaxis_to_zero': True},
+    AnalysisType.rmssd_weekly_by_year: {'yaxis_to_zero': True},
+
+    # circular means of the times of day with a band between the given percentiles
+    AnalysisType.bedtime_windows_weekly: {'time_of_day_percentiles': (25, 75)},
+    AnalysisType.bedtime_windows_monthly: {'time_of_day_percentiles': (25, 75)},
+    AnalysisType.bedtime_windows_weekdays: {'time_of_day_percentiles': (25, 75)},
+
+    # one distribution per year, drawn on top of each other
+    AnalysisType.sleep_score_distribution_by_year: {'histogram_by_year': True},
+    AnalysisType.readiness_score_distribution_by_year: {'histogram_by_year': True},
+    AnalysisType.activity_score_distribution_by_year: {'histogram_by_year': True},
+    AnalysisType.scores_cumulative_distribution: {'histogram_cumulative': True},
 }
 
 analysis_type_plot_type = {
@@ -131,6 +305,29 @@ analysis_type_plot_type = {
     AnalysisType.sleep_score_distribution: PlotType.histogram,
     AnalysisType.readiness_score_distribution: PlotType.histogram,
     AnalysisType.activity_score_distribution: PlotType.histogram,
+
+    AnalysisType.scores_rolling: PlotType.lines,
+    AnalysisType.recovery_indicators_rolling: PlotType.lines,
+
+    AnalysisType.correlation_matrix: PlotType.heatmap,
+
+    AnalysisType.scores_yearly: PlotType.lines,
+    AnalysisType.sleep_durations_yearly: PlotType.bar_chart,
+    AnalysisType.bedtimes_yearly: PlotType.time_period,
+    AnalysisType.recovery_indicators_yearly: PlotType.lines,
+
+    AnalysisType.sleep_score_weekly_by_year: PlotType.year_comparison,
+    AnalysisType.readiness_score_weekly_by_year: PlotType.year_comparison,
+    AnalysisType.rmssd_weekly_by_year: PlotType.year_comparison,
+
+    AnalysisType.bedtime_windows_weekly: PlotType.lines,
+    AnalysisType.bedtime_windows_monthly: PlotType.lines,
+    AnalysisType.bedtime_windows_weekdays: PlotType.lines,
+
+    AnalysisType.sleep_score_distribution_by_year: PlotType.histogram,
+    AnalysisType.readiness_score_distribution_by_year: PlotType.histogram,
+    AnalysisType.activity_score_distribution_by_year: PlotType.histogram,
+    AnalysisType.scores_cumulative_distribution: PlotType.histogram,
 }
 default_plot_type = PlotType.lines
 
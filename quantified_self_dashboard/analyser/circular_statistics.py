@@ -0,0 +1,138 @@
+from typing import List, Tuple
+
+import numpy as np
+
+
+seconds_per_day = 24 * 3600
+
+# times of day are displayed from noon until noon of the next day,
+# so that times around midnight are not split into both ends of the axis
+day_start_hour = 12
+
+
+def seconds_of_day_to_angles(seconds: np.array) -> np.array:
+    """ Mapping seconds relative to midnight onto the circle, one day is one full turn. NaN values stay NaN. """
+    return 2 * np.pi * np.mod(np.asarray(seconds, dtype=float), seconds_per_day) / seconds_per_day
+
+
+def angles_to_seconds_of_day(angles: np.array) -> np.array:
+    """ Mapping angles back to seconds after midnight in [0, seconds_per_day). """
+    return np.mod(np.asarray(angles, dtype=float), 2 * np.pi) / (2 * np.pi) * seconds_per_day
+
+
+def seconds_of_day_to_hours(seconds: np.array) -> np.array:
+    """
+    Hours after midnight, in [day_start_hour, day_start_hour + 24).
+    Times before the start of the day are moved to the next day,
+    e.g. 23:00 becomes 23.0 and 01:30 becomes 25.5.
+    """
+    hours = np.mod(np.asarray(seconds, dtype=float), seconds_per_day) / 3600
+    return np.where(hours < day_start_hour, hours + 24, hours)
+
+
+def circular_statistics(seconds: np.array, bucket_indices: np.array, n_buckets: int) -> Tuple[np.array, np.array, np.array]:
+    """
+    Circular mean and dispersion of the times of day in each bucket.
+    In contrast to the arithmetic mean, 23:30 and 00:30 average to 00:00 instead of 12:00.
+    NaN values are ignored, buckets without any value are NaN.
+
+    Parameters
+    ----------
+    seconds : np.array
+        One time of day per day, as seconds relative to midnight.
+
+    bucket_indices : np.array
+        Index of the bucket of each day.
+
+    n_buckets : int
+        Number of buckets.
+
+    Returns
+    --------
+    Tuple
+        np.array of the circular means as seconds after midnight,
+        np.array of the circular dispersions in [0, 1], 0 if all times of a bucket are equal,
+        np.array of the number of values in each bucket
+    """
+
+    angles = seconds_of_day_to_angles(seconds)
+    bucket_indices = np.asarray(bucket_indices)
+    available = np.isfinite(angles)
+
+    # summing the unit vectors of each bucket
+    cosines = np.bincount(bucket_indices[available], weights=np.cos(angles[available]), minlength=n_buckets)
+    sines = np.bincount(bucket_indices[available], weights=np.sin(angles[available]), minlength=n_buckets)
+    counts = np.bincount(bucket_indices[available], minlength=n_buckets)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        resultant_lengths = np.hypot(cosines, sines) / counts
+
+    means = angles_to_seconds_of_day(np.arctan2(sines, cosines))
+    means[counts == 0] = np.nan
+    dispersions = 1 - resultant_lengths
+
+    return means, dispersions, counts
+
+
+def circular_mean(seconds: np.array, bucket_indices: np.array, n_buckets: int) -> np.array:
+    """ Circular mean of the times of day in each bucket, as seconds after midnight. """
+    means, _, _ = circular_statistics(seconds, bucket_indices, n_buckets)
+    return means
+
+
+def circular_percentiles(seconds: np.array, bucket_indices: np.array, n_buckets: int, percentiles: List[float]) -> np.array:
+    """
+    Percentiles of the times of day in each bucket.
+    The times are unwrapped to within half a day around the circular mean of their bucket,
+    so the percentiles of times around midnight are not torn apart.
+    The percentiles are linearly interpolated, like np.percentile does,
+    for all buckets at once with one sort.
+
+    Parameters
+    ----------
+    seconds : np.array
+        One time of day per day, as seconds relative to midnight.
+
+    bucket_indices : np.array
+        Index of the bucket of each day.
+
+    n_buckets : int
+        Number of buckets.
+
+    percentiles : List[float]
+        Percentiles in [0, 100].
+
+    Returns
+    --------
+    np.array
+        of shape (len(percentiles), n_buckets) with the percentiles as seconds after midnight,
+        NaN for buckets without any value
+    """
+
+    seconds = np.asarray(seconds, dtype=float)
+    bucket_indices = np.asarray(bucket_indices)
+    means, _, counts = circular_statistics(seconds, bucket_indices, n_buckets)
+
+    available = np.isfinite(seconds)
+    seconds, bucket_indices = seconds[available], bucket_indices[available]
+
+    # signed distance of each time to the mean of its bucket, in [-half a day, half a day)
+    half_day = seconds_per_day / 2
+    deviations = np.mod(seconds - means[bucket_indices] + half_day, seconds_per_day) - half_day
+
+    # sorted by bucket and within each bucket by deviation
+    order = np.lexsort((deviations, bucket_indices))
+    sorted_deviations = deviations[order]
+    bucket_starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    result = np.full((len(percentiles), n_buckets), np.nan)
+    filled = counts > 0
+    for i, percentile in enumerate(percentiles):
+        positions = bucket_starts[filled] + percentile / 100 * (counts[filled] - 1)
+        lower = np.floor(positions).astype(np.int64)
+        upper = np.ceil(positions).astype(np.int64)
+        fractions = positions - lower
+        interpolated = sorted_deviations[lower] * (1 - fractions) + sorted_deviations[upper] * fractions
+        result[i, filled] = np.mod(means[filled] + interpolated, seconds_per_day)
+
+    return result
@@ -0,0 +1,66 @@
+import numpy as np
+
+from common.lazy_import import LazyModule
+from analyser.analysis_type_configurations import CorrelationMethod
+
+pd = LazyModule('pandas')
+
+
+def rank_columns(matrix: np.array) -> np.array:
+    """ Ranking the values of each column separately, ties get their average rank and NaN values stay NaN. """
+    return pd.DataFrame(matrix).rank(axis=0).values
+
+
+def pairwise_correlation(matrix: np.array, method: CorrelationMethod = CorrelationMethod.pearson, min_periods: int = 3) -> np.array:
+    """
+    Correlation coefficients between all pairs of columns of the matrix, computed with matrix products in one pass.
+    Each pair only considers the rows in which both columns have a value (pairwise-complete).
+    For the spearman method the columns are ranked as a whole before,
+    so ranks are not recomputed for the rows each pair has in common.
+
+    Parameters
+    ----------
+    matrix : np.array
+        Two dimensional array with one row per observation and one column per measurement,
+        missing values are NaN.
+
+    method : CorrelationMethod
+        Pearson or spearman correlation.
+
+    min_periods : int
+        Minimum number of common rows of a pair, otherwise its correlation is NaN.
+
+    Returns
+    --------
+    np.array
+        symmetric matrix of the correlation coefficients with one row and column per measurement
+    """
+
+    if method not in [CorrelationMethod.pearson, CorrelationMethod.spearman]:
+        raise ValueError("Invalid CorrelationMethod Parameter")
+
+    matrix = np.asarray(matrix, dtype=float)
+    if method == CorrelationMethod.spearman:
+        matrix = rank_columns(matrix)
+
+    finite = np.isfinite(matrix)
+    present = finite.astype(float)
+
+    # centering each column keeps the sums of products numerically stable
+    counts_per_column = present.sum(axis=0)
+    center = np.where(finite, matrix, 0.0).sum(axis=0) / np.maximum(counts_per_column, 1)
+    values = np.where(finite, matrix - center, 0.0)
+
+    # entry i, j of each product only sums over the rows where both column i and column j have a value
+    n = present.T @ present
+    sums = values.T @ present
+    squares = (values ** 2).T @ present
+    products = values.T @ values
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        covariances = products - sums * sums.T / n
+        variances = squares - sums ** 2 / n
+        correlations = covariances / np.sqrt(variances * variances.T)
+
+    correlations[n < min_periods] = np.nan
+    return np.clip(correlations, -1.0, 1.0)
@@ -0,0 +1,172 @@
+from typing import Tuple
+
+import numpy as np
+
+from analyser.analysis_type_configurations import DownsamplingMethod
+
+
+def lttb_indices(x: np.array, y: np.array, n_out: int) -> np.array:
+    """
+    Largest-Triangle-Three-Buckets selection of n_out points.
+    The first and last point are always kept. From each bucket in between the point is kept
+    which forms the largest triangle with the previously kept point and the average of the next bucket.
+    Expects x and y to be free of NaN values.
+
+    Returns
+    --------
+    np.array
+        sorted indices of the kept points
+    """
+
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+
+    # n_out - 2 buckets for all points between the first and the last one
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+
+    previous = 0
+    for i in range(n_out - 2):
+        bucket_start, bucket_end = edges[i], edges[i + 1]
+
+        # average of the next bucket, which is only the last point for the last bucket
+        if i < n_out - 3:
+            next_start, next_end = edges[i + 1], edges[i + 2]
+        else:
+            next_start, next_end = n - 1, n
+        next_x = x[next_start:next_end].mean()
+        next_y = y[next_start:next_end].mean()
+
+        # doubled triangle areas for all points of this bucket
+        bucket_x = x[bucket_start:bucket_end]
+        bucket_y = y[bucket_start:bucket_end]
+        areas = np.abs((x[previous] - next_x) * (bucket_y - y[previous]) - (x[previous] - bucket_x) * (next_y - y[previous]))
+
+        previous = bucket_start + np.argmax(areas)
+        indices[i + 1] = previous
+
+    return indices
+
+
+def min_max_indices(y: np.array, n_out: int) -> np.array:
+    """
+    Keeping the minimum and maximum of n_out / 2 equally sized buckets,
+    which keeps every spike visible.
+    Expects y to be free of NaN values.
+
+    Returns
+    --------
+    np.array
+        sorted indices of the kept points
+    """
+
+    n = len(y)
+    n_buckets = n_out // 2
+    if n_out >= n or n_buckets < 1:
+        return np.arange(n)
+
+    bucket_ids = np.arange(n) * n_buckets // n
+
+    # sorted by bucket and within each bucket by value
+    order = np.lexsort((y, bucket_ids))
+    bucket_starts = np.searchsorted(bucket_ids[order], np.arange(n_buckets))
+    bucket_ends = np.append(bucket_starts[1:], n)
+
+    minima = order[bucket_starts]
+    maxima = order[bucket_ends - 1]
+
+    return np.unique(np.concatenate(([0, n - 1], minima, maxima)))
+
+
+def downsample(x, y: np.array, n_out: int, method: DownsamplingMethod = DownsamplingMethod.lttb) -> Tuple[np.array, np.array]:
+    """
+    Reducing the points of one line to at most n_out points, keeping its visual shape.
+    Gaps of NaN values are kept by keeping their first point, so the plotted line stays interrupted there.
+    Gap markers and the points of the runs of values between them share one budget of n_out points:
+    only the longest gaps of at least the width of one of n_out buckets are kept, at most a sixth of n_out,
+    shorter gaps are bridged by merging the runs around them.
+    Each run gets at least its first and last point and the rest of the budget proportional to its length.
+
+    Parameters
+    ----------
+    x : array like
+        x values, e.g. a pd.DatetimeIndex.
+
+    y : np.array
+        y values, may contain NaN values.
+
+    n_out : int
+        Maximum number of points, at least 4.
+
+    method : DownsamplingMethod
+        Either Largest-Triangle-Three-Buckets or minimum and maximum per bucket.
+
+    Returns
+    --------
+    Tuple
+        the kept x values and the kept y values
+    """
+
+    if method not in [DownsamplingMethod.lttb, DownsamplingMethod.min_max]:
+        raise ValueError("Invalid DownsamplingMethod Parameter")
+
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n <= n_out:
+        return x, y
+
+    # x values as numbers for the triangle areas
+    x_array = np.asarray(x)
+    if np.issubdtype(x_array.dtype, np.datetime64):
+        x_numeric = x_array.astype('datetime64[ns]').astype(np.int64).astype(float)
+    else:
+        x_numeric = x_array.astype(float)
+
+    finite_indices = np.flatnonzero(np.isfinite(y))
+    if len(finite_indices) == 0:
+        return x, y
+
+    # gaps between the finite values, by the position of the finite value before them
+    gap_lengths = np.diff(finite_indices) - 1
+    gap_positions = np.flatnonzero(gap_lengths > 0)
+
+    # keeping the longest gaps which are at least as wide as one bucket, each costs its marker and the end points of one more run
+    max_kept_gaps = max(0, (n_out // 2 - 2) // 3)
+    gap_positions = gap_positions[gap_lengths[gap_positions] >= n / n_out]
+    longest_first = np.argsort(-gap_lengths[gap_positions], kind='stable')
+    kept_gap_positions = np.sort(gap_positions[longest_first[:max_kept_gaps]])
+
+    # first point of each kept gap and of the NaN values before the first and after the last value
+    markers = finite_indices[kept_gap_positions] + 1
+    if finite_indices[0] > 0:
+        markers = np.append(markers, 0)
+    if finite_indices[-1] < n - 1:
+        markers = np.append(markers, finite_indices[-1] + 1)
+
+    # runs of finite values between the kept gaps, as indices of their values
+    runs = np.split(finite_indices, kept_gap_positions + 1)
+    run_lengths = np.array([len(run) for run in runs])
+
+    # at least the first and the last point of each run, the rest proportional to the number of values
+    minimum_shares = np.minimum(run_lengths, 2)
+    n_remaining = max(0, n_out - len(markers) - minimum_shares.sum())
+    run_shares = np.minimum(run_lengths, minimum_shares + n_remaining * run_lengths // run_lengths.sum())
+
+    kept_indices = [markers]
+    for run, run_n_out in zip(runs, run_shares):
+        if run_n_out >= len(run):
+            kept_indices.append(run)
+        elif method == DownsamplingMethod.lttb and run_n_out >= 3:
+            kept_indices.append(run[lttb_indices(x_numeric[run], y[run], run_n_out)])
+        elif method == DownsamplingMethod.min_max and run_n_out >= 4:
+            # the first and the last point come on top of the minima and maxima
+            kept_indices.append(run[min_max_indices(y[run], run_n_out - 2)])
+        else:
+            kept_indices.append(run[[0, -1]])
+
+    indices = np.sort(np.concatenate(kept_indices))
+    return x[indices], y[indices]
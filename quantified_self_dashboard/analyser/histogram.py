@@ -0,0 +1,78 @@
+from typing import List, Tuple
+
+import numpy as np
+
+from common.constants import Unit
+
+
+# fixed bin edges of the units with a known range,
+# so the number of bins does not depend on the number of values
+unit_bin_edges = {
+    Unit.score: np.arange(0, 105, 5),
+    Unit.hours: np.arange(0, 12.5, 0.5),
+    Unit.minutes: np.arange(0, 125, 5),
+    Unit.time_of_day: np.arange(18, 32.25, 0.25),
+}
+
+# number of bins of the units without a known range
+default_number_of_bins = 20
+
+
+def get_bin_edges(unit: Unit, data_sets: List[np.array]) -> np.array:
+    """
+    Bin edges for the given unit. Units without fixed bin edges get
+    equally sized bins between the smallest and largest value of all data sets,
+    so distributions drawn on top of each other share their bins.
+    """
+
+    if unit in unit_bin_edges.keys():
+        return unit_bin_edges[unit]
+
+    values = np.concatenate([np.asarray(data, dtype=float).ravel() for data in data_sets]) if len(data_sets) > 0 else np.array([])
+    values = values[np.isfinite(values)]
+    if len(values) == 0:
+        return np.linspace(0, 1, default_number_of_bins + 1)
+
+    return np.histogram_bin_edges(values, bins=default_number_of_bins)
+
+
+def bin_values(values: np.array, bin_edges: np.array, cumulative: bool = False) -> Tuple[np.array, np.array, np.array]:
+    """
+    Binning values on the given edges, in percent of all values. NaN values are ignored.
+    Values outside of the edges are not part of any bin, but are still counted for the percentages.
+
+    Parameters
+    ----------
+    values : np.array
+        Values to bin, e.g. one value per day.
+
+    bin_edges : np.array
+        Sorted edges of the bins, the last bin includes its right edge.
+
+    cumulative : bool
+        Whether each bin contains the percentage of all values up to its right edge.
+
+    Returns
+    --------
+    Tuple
+        np.array of the centers of the bins,
+        np.array of the widths of the bins,
+        np.array of the percentages of the bins
+    """
+
+    values = np.asarray(values, dtype=float)
+    values = values[np.isfinite(values)]
+
+    counts, _ = np.histogram(values, bins=bin_edges)
+    if cumulative:
+        counts = np.cumsum(counts) + np.count_nonzero(values < bin_edges[0])
+
+    if len(values) > 0:
+        percentages = 100 * counts / len(values)
+    else:
+        percentages = np.zeros(len(counts))
+
+    centers = (bin_edges[:-1] + bin_edges[1:]) / 2
+    widths = np.diff(bin_edges)
+
+    return centers, widths, percentages
@@ -0,0 +1,143 @@
+import os
+import shutil
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import List
+
+
+def _initialize_exporter():
+    """
+    Initializer of each exporter process.
+    Rendering one empty figure starts the kaleido renderer of this process,
+    which then stays alive for all following exports.
+    """
+    import plotly.io as pio
+    import plotly.graph_objects as go
+
+    pio.to_image(go.Figure(), format='png')
+
+
+def _temporary_path_name(path_name: str) -> str:
+    """ Unique path name next to the given one, for writing a file before moving it into place. """
+    return "{}.{}.{}.tmp".format(path_name, os.getpid(), threading.get_ident())
+
+
+def link_file(source_path_name: str, target_path_name: str):
+    """
+    Hard linking the source file to the target path, replacing an existing target file.
+    Falls back to copying if the file system does not support hard links.
+    """
+    temporary_path_name = _temporary_path_name(target_path_name)
+    try:
+        os.link(source_path_name, temporary_path_name)
+    except OSError:
+        shutil.copyfile(source_path_name, temporary_path_name)
+    os.replace(temporary_path_name, target_path_name)
+
+
+def write_image_file(fig, path_name: str, link_path_names: List[str] = ()) -> str:
+    """
+    Writing the plotly figure as an image into the given path.
+    The image is written into a temporary file first and then moved into place,
+    so files hard linked to a previous version of the image stay untouched.
+    Afterwards the image is linked to all given link path names.
+
+    Returns
+    -------
+    str
+        the last path name the image is available at
+    """
+    temporary_path_name = _temporary_path_name(path_name)
+    fig.write_image(temporary_path_name, format=os.path.splitext(path_name)[1][1:])
+    os.replace(temporary_path_name, path_name)
+
+    for link_path_name in link_path_names:
+        link_file(path_name, link_path_name)
+        path_name = link_path_name
+
+    return path_name
+
+
+def _export_figure(fig_json: str, path_name: str, link_path_names: List[str]) -> str:
+    """ Deserializing the plotly figure and writing it as an image into the given path. """
+    import plotly.io as pio
+
+    fig = pio.from_json(fig_json)
+    return write_image_file(fig, path_name, link_path_names)
+
+
+class ImageExportPool:
+    """
+    Pool of long-lived exporter processes, writing plotly figures as images.
+    Each process keeps its own kaleido renderer warm, so the startup costs
+    are only paid once per process and not once per image.
+    """
+
+    def __init__(self, max_workers: int = None, max_pending: int = None):
+        """
+        Parameters
+        ----------
+        max_workers : int
+            Number of exporter processes. Defaults to the number of cores.
+
+        max_pending : int
+            Maximum number of submitted but not yet finished exports.
+            Submitting further exports blocks until an export has finished.
+            Defaults to twice the number of exporter processes.
+        """
+
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        if max_pending is None:
+            max_pending = 2 * max_workers
+        if max_workers < 1 or max_pending < 1:
+            raise ValueError("ImageExportPool needs at least one worker and one pending slot")
+
+        self.__executor = ProcessPoolExecutor(max_workers=max_workers, initializer=_initialize_exporter)
+        self.__pending_slots = threading.BoundedSemaphore(max_pending)
+
+
+    def submit(self, fig_json: str, path_name: str, link_path_names: List[str] = ()) -> Future:
+        """
+        Handing a serialized figure to the exporter processes.
+        Blocks as long as the maximum number of pending exports is reached.
+
+        Parameters
+        ----------
+        fig_json : str
+            The plotly figure, serialized with fig.to_json().
+
+        path_name : str
+            Path of the image file. The image format is derived from the file extension.
+
+        link_path_names : List[str]
+            Further paths the written image is hard linked to.
+
+        Returns
+        -------
+        Future
+            resolving to the last path name once the image is written and linked
+        """
+
+        self.__pending_slots.acquire()
+        try:
+            future = self.__executor.submit(_export_figure, fig_json, path_name, list(link_path_names))
+        except:
+            self.__pending_slots.release()
+            raise
+
+        future.add_done_callback(lambda f: self.__pending_slots.release())
+        return future
+
+
+    def shutdown(self, wait: bool = True):
+        """ Stopping all exporter processes. If wait is True, pending exports are finished first. """
+        self.__executor.shutdown(wait=wait)
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
@@ -1,21 +1,32 @@
+from __future__ import annotations
+
 import os
 import math
 import datetime
 from typing import List, Tuple, Union
 
 import numpy as np
-import pandas as pd
 from collections import Counter
-import plotly
-import plotly.express as px
-import plotly.graph_objects as go
+from concurrent.futures import Future
 
+from common.lazy_import import LazyModule
+from common import instrumentation
 from summary.summary_container import SummaryContainer
 from common.constants import *
 from common.date_helper import all_date_strings_between_dates
 from analyser.abstract_plotter import AbstractPlotter
 from analyser.transform_measurements import *
 from analyser.analysis_type_configurations import *
+from analyser.image_export import ImageExportPool, write_image_file
+from analyser.render_cache import RenderCache
+from analyser.downsampling import downsample
+from analyser.histogram import get_bin_edges, bin_values
+
+# pandas and plotly are only imported when the first plot gets created
+pd = LazyModule('pandas')
+px = LazyModule('plotly.express')
+go = LazyModule('plotly.graph_objects')
+plotly_colors = LazyModule('plotly.colors')
 
 
 
@@ -48,10 +59,55 @@ class PlotlyAnalyser(AbstractPlotter):
         AnalysisType.sleep_score_distribution,
         AnalysisType.readiness_score_distribution,
         AnalysisType.activity_score_distribution,
+
+        AnalysisType.scores_rolling,
+        AnalysisType.recovery_indicators_rolling,
+
+        AnalysisType.correlation_matrix,
+
+        AnalysisType.scores_yearly,
+        AnalysisType.sleep_durations_yearly,
+        AnalysisType.bedtimes_yearly,
+        AnalysisType.recovery_indicators_yearly,
+
+        AnalysisType.sleep_score_weekly_by_year,
+        AnalysisType.readiness_score_weekly_by_year,
+        AnalysisType.rmssd_weekly_by_year,
+        AnalysisType.bedtime_windows_weekly,
+        AnalysisType.bedtime_windows_monthly,
+        AnalysisType.bedtime_windows_weekdays,
+        AnalysisType.sleep_score_distribution_by_year,
+        AnalysisType.readiness_score_distribution_by_year,
+        AnalysisType.activity_score_distribution_by_year,
+        AnalysisType.scores_cumulative_distribution,
     ]
 
 
-    def _analyse(self, start: str, end: str, analysis_type: AnalysisType, *args):
+    def __init__(self, output_path: List[str], container: SummaryContainer, export_pool: ImageExportPool = None, render_cache: RenderCache = None):
+        """
+        Parameters
+        ----------
+        output_path : List[str]
+            Path where output images/files can be saved.
+
+        container : SummaryContainer
+            Where the analyser can get its analysis data from.
+
+        export_pool : ImageExportPool
+            Exporter processes to write the images with.
+            If None, the images are written synchronously in this process.
+
+        render_cache : RenderCache
+            Cache of previously rendered images. Figures which did not change
+            since they were rendered the last time are linked from the cache.
+            If None, every image is rendered.
+        """
+        super().__init__(output_path, container)
+        self.__export_pool = export_pool
+        self.__render_cache = render_cache
+
+
+    def _analyse(self, start: str, end: str, analysis_type: AnalysisType, *args, **kwargs):
         """
         Implementation of this analyser classes analysis.
 
@@ -69,6 +125,21 @@ class PlotlyAnalyser(AbstractPlotter):
         analysis_type : AnalysisType
             The chosen type of anayzis for this method call, must be part of the supported
             analysis types of this Analyser Class.
+
+        Additional keyword arguments
+        ----------------------------
+        output_format : OutputFormat
+            Whether a png image, an interactive html file or both are written.
+            Defaults to png.
+
+        html_bundle : HtmlBundle
+            Whether html files contain the plotly.js library themselves
+            or share one library file in the output directory.
+
+        Returns
+        -------
+        List[Future]
+            one future per written output file, resolving to its path
         """
 
         # summary_type_measurement_tuples
@@ -99,22 +170,100 @@ class PlotlyAnalyser(AbstractPlotter):
             analysis_type_str = analysis_type.name.title()
             title = "{} {} from {} until {}".format(periodicity_str, analysis_type_str, start, end)
 
-        # kwargs
+        # kwargs, the arguments of this call take precedence over the configured ones
         if analysis_type in analysis_type_plot_kwargs:
-            kwargs = analysis_type_plot_kwargs[analysis_type]
+            plot_kwargs = dict(analysis_type_plot_kwargs[analysis_type])
         else:
-            kwargs = dict()
-        kwargs['title'] = title
-        kwargs['output_file_name'] = output_file_name
+            plot_kwargs = dict()
+        plot_kwargs.update(kwargs)
+        plot_kwargs['title'] = title
+        plot_kwargs['output_file_name'] = output_file_name
+
 
+        with instrumentation.span("analyse"), instrumentation.span(analysis_type.name):
+            return self.__create_plot(start, end, periodicity, summary_type_measurement_tuples, plot_type, **plot_kwargs)
 
-        self.__create_plot(start, end, periodicity, summary_type_measurement_tuples, plot_type, **kwargs)
 
+    def __save(self, fig, file_name, output_format: OutputFormat, html_bundle: HtmlBundle) -> List[Future]:
+        """ Saving the plotly figure in the given output format(s) into the given output file name. """
 
-    def __save(self, fig, file_name):
-        """ Saving the plotly figure as an image into the given output file name. """
+        futures = []
+        if output_format in [OutputFormat.png, OutputFormat.png_and_html]:
+            futures.append(self.__save_image(fig, file_name))
+        if output_format in [OutputFormat.html, OutputFormat.png_and_html]:
+            futures.append(self.__save_html(fig, file_name, html_bundle))
+        return futures
+
+
+    def __save_html(self, fig, file_name, html_bundle: HtmlBundle) -> Future:
+        """
+        Saving the plotly figure as an interactive html file into the given output file name.
+        Line traces are drawn with WebGL, which keeps plots with many points responsive.
+        No image export is needed, so the returned future is already done.
+        """
+        path_name = "{}.html".format(os.path.join(self._output_location, file_name))
+        include_plotlyjs = 'directory' if html_bundle == HtmlBundle.shared else True
+
+        html_fig = go.Figure(layout=fig.layout)
+        for trace in fig.data:
+            if trace.type == 'scatter':
+                trace_properties = trace.to_plotly_json()
+                trace_properties.pop('type')
+                trace = go.Scattergl(trace_properties)
+            html_fig.add_trace(trace)
+
+        html_fig.write_html(path_name, include_plotlyjs=include_plotlyjs)
+        return self.__done_future(path_name)
+
+
+    def __save_image(self, fig, file_name) -> Future:
+        """
+        Saving the plotly figure as an image into the given output file name.
+        With an export pool the image is written by one of its exporter processes,
+        otherwise it is written right away and the returned future is already done.
+        If the render cache already contains the image, it is only linked to the output file.
+        """
         path_name = "{}.png".format(os.path.join(self._output_location, file_name))
-        fig.write_image(path_name)
+
+        if self.__render_cache:
+            fig_json = fig.to_json()
+            key = self.__render_cache.get_key(fig_json)
+            if self.__render_cache.link_cached(key, path_name):
+                instrumentation.count("render_cache_hits")
+                return self.__done_future(path_name)
+
+            # rendering into the cache and linking the cached image to the output file
+            render_path_name = self.__render_cache.get_entry_path_name(key)
+            link_path_names = [path_name]
+        else:
+            fig_json = None
+            render_path_name = path_name
+            link_path_names = []
+
+        instrumentation.count("images_exported")
+        if self.__export_pool:
+            if fig_json is None:
+                fig_json = fig.to_json()
+            future = self.__export_pool.submit(fig_json, render_path_name, link_path_names)
+        else:
+            future = Future()
+            try:
+                future.set_result(write_image_file(fig, render_path_name, link_path_names))
+            except Exception as e:
+                future.set_exception(e)
+
+        if self.__render_cache:
+            future.add_done_callback(lambda f: self.__render_cache.evict())
+
+        return future
+
+
+    @classmethod
+    def __done_future(cls, result) -> Future:
+        """ Future which is already resolved with the given result. """
+        future = Future()
+        future.set_result(result)
+        return future
 
 
     def __create_plot(self, start: str, end: str, periodicity: Periodicity, summary_type_measurement_tuples: List[Tuple[str, str]], plot_type: PlotType, **kwargs):
@@ -139,26 +288,74 @@ class PlotlyAnalyser(AbstractPlotter):
         plot_type : PlotType
             Which kind of plot will be created. Either lines, bar chart, histogram or time periods. 
             Easily extendable.
-        """
-
-        dates, plot_data_sets, plot_legends, plot_units = self._get_plot_data_sets(start, end, periodicity, summary_type_measurement_tuples)
 
-        # TODO
-        # check if each plot data has same unit, otherwise the scale might get screwd
-        # if len(Counter(plot_units).keys()) > 1:
-        #     raise ValueError("Different Units")
-
-        fig = self.__create_figure(plot_type, dates, plot_data_sets, plot_legends, plot_units)
+        Returns
+        -------
+        List[Future]
+            one future per written output file
+        """
 
-        # setting ticks format depending on periodicty
-        if periodicity == Periodicity.weekly:
-            fig.update_layout(xaxis={'tickformat': "CW%W"})
-        elif periodicity == Periodicity.monthly:
-            fig.update_layout(xaxis={'tickformat': "%B", 'tickvals': dates})
-        elif periodicity == Periodicity.weekdays:
-            fig.update_layout(xaxis={'tickformat': "%a", 'tickvals': dates})
-        elif periodicity == Periodicity.yearly:
-            fig.update_layout(xaxis={'tickformat': "%Y", 'tickvals': dates})
+        with instrumentation.span("load_data"):
+            if plot_type == PlotType.heatmap:
+                if 'correlation_method' in kwargs.keys():
+                    correlation_method = kwargs['correlation_method']
+                else:
+                    correlation_method = default_correlation_method
+
+                # the correlation matrix has the measurements on both axes instead of dates
+                correlations, titles = self._get_correlation_data(start, end, summary_type_measurement_tuples, correlation_method)
+                dates, plot_data_sets, plot_legends, plot_units = titles, [correlations], titles, [Unit.undefined]
+            elif plot_type == PlotType.year_comparison:
+                # the weeks or months of the year instead of dates, one data set per year
+                dates, plot_data_sets, plot_legends, plot_units = self._get_year_comparison_data_sets(start, end, periodicity, summary_type_measurement_tuples)
+            else:
+                dates, plot_data_sets, plot_legends, plot_units = self._get_plot_data_sets(start, end, periodicity, summary_type_measurement_tuples)
+
+            # TODO
+            # check if each plot data has same unit, otherwise the scale might get screwd
+            # if len(Counter(plot_units).keys()) > 1:
+            #     raise ValueError("Different Units")
+
+            # rolling window statistics on top of daily line plots
+            if plot_type == PlotType.lines and periodicity == Periodicity.daily:
+                rolling_windows = kwargs['rolling_windows'] if 'rolling_windows' in kwargs.keys() else []
+                baseline_window = kwargs['rolling_baseline_window'] if 'rolling_baseline_window' in kwargs.keys() else None
+
+                rolling_data_sets, rolling_legends, rolling_kinds, rolling_indices = self._get_rolling_plot_data_sets(start, end, summary_type_measurement_tuples, rolling_windows, baseline_window)
+                kwargs['rolling_data_sets'] = rolling_data_sets
+                kwargs['rolling_legends'] = rolling_legends
+                kwargs['rolling_kinds'] = rolling_kinds
+                kwargs['rolling_indices'] = rolling_indices
+
+            # percentiles of times of day around their circular means
+            if plot_type == PlotType.lines and periodicity != Periodicity.daily and 'time_of_day_percentiles' in kwargs.keys():
+                percentile_data_sets, percentile_legends, percentile_kinds, percentile_indices = self._get_time_of_day_percentile_data_sets(start, end, periodicity, summary_type_measurement_tuples, kwargs['time_of_day_percentiles'])
+                kwargs['rolling_data_sets'] = percentile_data_sets
+                kwargs['rolling_legends'] = percentile_legends
+                kwargs['rolling_kinds'] = percentile_kinds
+                kwargs['rolling_indices'] = percentile_indices
+
+            # reducing the points of long line plots
+            if plot_type == PlotType.lines:
+                kwargs['dates_per_data_set'] = self.__downsample(dates, plot_data_sets, **kwargs)
+                if 'rolling_data_sets' in kwargs.keys():
+                    kwargs['dates_per_rolling_data_set'] = self.__downsample(dates, kwargs['rolling_data_sets'], **kwargs)
+
+        with instrumentation.span("create_figure"):
+            fig = self.__create_figure(plot_type, dates, plot_data_sets, plot_legends, plot_units, **kwargs)
+
+            # setting ticks format depending on periodicty
+            if plot_type in [PlotType.heatmap, PlotType.year_comparison]:
+                # no dates on the x-axis
+                pass
+            elif periodicity == Periodicity.weekly:
+                fig.update_layout(xaxis={'tickformat': "CW%W"})
+            elif periodicity == Periodicity.monthly:
+                fig.update_layout(xaxis={'tickformat': "%B", 'tickvals': dates})
+            elif periodicity == Periodicity.weekdays:
+                fig.update_layout(xaxis={'tickformat': "%a", 'tickvals': dates})
+            elif periodicity == Periodicity.yearly:
+                fig.update_layout(xaxis={'tickformat': "%Y", 'tickvals': dates})
 
         # setting title
         if 'title' in kwargs.keys():
@@ -172,7 +369,51 @@ class PlotlyAnalyser(AbstractPlotter):
             output_file_name = kwargs['output_file_name']
         else:
             output_file_name = "temp"
-        self.__save(fig, output_file_name)
+
+        # output format
+        if 'output_format' in kwargs.keys():
+            output_format = kwargs['output_format']
+        else:
+            output_format = default_output_format
+
+        if 'html_bundle' in kwargs.keys():
+            html_bundle = kwargs['html_bundle']
+        else:
+            html_bundle = default_html_bundle
+
+        with instrumentation.span("save"):
+            return self.__save(fig, output_file_name, output_format, html_bundle)
+
+
+    def __downsample(self, dates: pd.DatetimeIndex, plot_data_sets, **kwargs) -> List[pd.DatetimeIndex]:
+        """
+        Reducing the number of points of each plot data set to about the maximum number of points,
+        with the downsampling method given in the kwargs. Data sets which are no np.arrays,
+        e.g. lists of datetime values, are not reduced.
+        The plot data sets are replaced in place, and the dates belonging to each
+        of the reduced data sets are returned.
+        """
+
+        if 'downsampling' in kwargs.keys():
+            method = kwargs['downsampling']
+        else:
+            method = default_downsampling_method
+
+        if 'max_points' in kwargs.keys():
+            max_points = kwargs['max_points']
+        else:
+            max_points = default_downsampling_max_points
+
+        dates_per_data_set = []
+        for i, data in enumerate(plot_data_sets):
+            if method == DownsamplingMethod.none or not isinstance(data, np.ndarray):
+                dates_per_data_set.append(dates)
+                continue
+
+            data_dates, plot_data_sets[i] = downsample(dates, data, max_points, method)
+            dates_per_data_set.append(data_dates)
+
+        return dates_per_data_set
 
 
     def __create_figure(self, plot_type, dates, plot_data_sets, plot_legends, plot_units, **kwargs) -> go.Figure:
@@ -190,6 +431,8 @@ class PlotlyAnalyser(AbstractPlotter):
             PlotType.lines: self.__line_figure,
             PlotType.bar_chart: self.__bar_chart_figure,
             PlotType.histogram: self.__histogram_figure,
+            PlotType.heatmap: self.__heatmap_figure,
+            PlotType.year_comparison: self.__year_comparison_figure,
         }
 
         create_figure_func = plot_type_to_create_figure_func[plot_type]
@@ -214,7 +457,20 @@ class PlotlyAnalyser(AbstractPlotter):
         fig.add_trace(go.Bar(x=dates, y=duration, base=start_times))
         fig.update_layout(xaxis={'title': {'text': 'Dates'}}, yaxis={'title': {'text': 'Time'}})
 
-        # adjusting ticks and ticktext for readable timeformats on the y-axis
+        self.__set_time_of_day_ticks(fig)
+
+        # more space for the time text
+        fig.update_traces(marker_colorbar_ticklen=10, selector=dict(type='scatter'))
+
+        return fig
+
+
+    def __set_time_of_day_ticks(self, fig: go.Figure):
+        """
+        Adjusting ticks and ticktext for readable timeformats on the y-axis,
+        for times of day given in hours, where hours above 24 belong to the next day.
+        """
+
         tickvals = list(range(0, 48, 1))
         ticktext = []
         for tickval in tickvals:
@@ -229,24 +485,35 @@ class PlotlyAnalyser(AbstractPlotter):
         fig.update_yaxes(tickvals=tickvals)
         fig.update_yaxes(ticktext=ticktext)
 
-        # more space for the time text
-        fig.update_traces(marker_colorbar_ticklen=10, selector=dict(type='scatter'))
-
-        return fig
-
 
     def __line_figure(self, dates: pd.DatetimeIndex, plot_data_sets, plot_legends: List[str], plot_units: List[Unit], **kwargs) -> go.Figure:
         """
         Drawing one or multiple lines in one plot. 
+        If the data sets were downsampled, each of them has its own dates.
+        Rolling window statistics are drawn in the color of the line they belong to.
         """
-        
+
+        if 'dates_per_data_set' in kwargs.keys():
+            dates_per_data_set = kwargs['dates_per_data_set']
+        else:
+            dates_per_data_set = [dates] * len(plot_data_sets)
+
+        colors = plotly_colors.qualitative.Plotly
+
         # drawing plotly figure
         fig = go.Figure()
-        for data, legend in zip(plot_data_sets, plot_legends):
-            fig.add_trace(go.Scatter(x=dates, y=data, name=legend, mode='lines+markers'))
+        for i, (data_dates, data, legend) in enumerate(zip(dates_per_data_set, plot_data_sets, plot_legends)):
+            fig.add_trace(go.Scatter(x=data_dates, y=data, name=legend, mode='lines+markers', line={'color': colors[i % len(colors)]}))
+
+        if 'rolling_data_sets' in kwargs.keys():
+            self.__add_rolling_traces(fig, dates, colors, **kwargs)
+
         unit_as_text = UnitsAnnotationText[plot_units[0]]
         fig.update_layout(xaxis={'title': {'text': 'Dates'}}, yaxis={'title': {'text': unit_as_text}})
 
+        if plot_units[0] == Unit.time_of_day:
+            self.__set_time_of_day_ticks(fig)
+
         fig.update_xaxes(constraintoward="left")
 
         # setting y-axis start to zero
@@ -262,6 +529,52 @@ class PlotlyAnalyser(AbstractPlotter):
         return fig
 
 
+    def __year_comparison_figure(self, dates: np.array, plot_data_sets, plot_legends: List[str], plot_units: List[Unit], **kwargs) -> go.Figure:
+        """
+        Drawing one line for each year, on an x-axis of the weeks or months of the year.
+        """
+
+        fig = self.__line_figure(dates, plot_data_sets, plot_legends, plot_units, **kwargs)
+
+        if len(dates) == 12:
+            fig.update_layout(xaxis={'title': {'text': 'Month of the Year'}, 'tickvals': dates})
+        else:
+            fig.update_layout(xaxis={'title': {'text': 'Week of the Year'}})
+
+        return fig
+
+
+    def __add_rolling_traces(self, fig: go.Figure, dates: pd.DatetimeIndex, colors: List[str], **kwargs):
+        """
+        Adding the rolling window statistics to a line figure.
+        Means are drawn dashed, baselines dotted and the bands around
+        a baseline or between percentiles as one filled area between their lower and upper bound.
+        """
+
+        rolling_data_sets = kwargs['rolling_data_sets']
+        if 'dates_per_rolling_data_set' in kwargs.keys():
+            dates_per_rolling_data_set = kwargs['dates_per_rolling_data_set']
+        else:
+            dates_per_rolling_data_set = [dates] * len(rolling_data_sets)
+
+        band_lower = None
+        for data_dates, data, legend, kind, index in zip(dates_per_rolling_data_set, rolling_data_sets, kwargs['rolling_legends'], kwargs['rolling_kinds'], kwargs['rolling_indices']):
+            color = colors[index % len(colors)]
+
+            if kind == RollingTraceKind.mean:
+                fig.add_trace(go.Scatter(x=data_dates, y=data, name=legend, mode='lines', line={'color': color, 'dash': 'dash'}))
+            elif kind == RollingTraceKind.baseline:
+                fig.add_trace(go.Scatter(x=data_dates, y=data, name=legend, mode='lines', line={'color': color, 'dash': 'dot'}))
+            elif kind in [RollingTraceKind.baseline_band_lower, RollingTraceKind.percentile_band_lower]:
+                band_lower = (data_dates, data)
+            elif kind in [RollingTraceKind.baseline_band_upper, RollingTraceKind.percentile_band_upper]:
+                # closed polygon along the upper bound and back along the lower bound
+                lower_dates, lower_data = band_lower
+                band_dates = np.concatenate((np.asarray(data_dates), np.asarray(lower_dates)[::-1]))
+                band_data = np.concatenate((data, lower_data[::-1]))
+                fig.add_trace(go.Scatter(x=band_dates, y=band_data, name=legend, mode='lines', fill='toself', line={'color': color, 'width': 0}, opacity=0.2, showlegend=False, hoverinfo='skip'))
+
+
     def __bar_chart_figure(self, dates: pd.DatetimeIndex, plot_data_sets, plot_legends: List[str], plot_units: List[Unit], **kwargs) -> go.Figure:
         """
         Drawing one or multiple bars in one plot. 
@@ -280,30 +593,73 @@ class PlotlyAnalyser(AbstractPlotter):
     def __histogram_figure(self, dates: pd.DatetimeIndex, plot_data_sets, plot_legends: List[str], plot_units: List[Unit], **kwargs) -> go.Figure:
         """
         Drawing a histogram of one or more distributions.
+        The values are binned here on fixed edges depending on the unit,
+        so only one bar per bin is part of the figure, independent of the number of days.
+        With the 'histogram_by_year' kwarg each year gets its own distribution,
+        with 'histogram_cumulative' the cumulative distributions are drawn as lines.
         """
 
-        # TODO: customize, this makes only sense for score units
-        interval_size = 5
-        nbins = 100 / interval_size
+        by_year = kwargs['histogram_by_year'] if 'histogram_by_year' in kwargs.keys() else False
+        cumulative = kwargs['histogram_cumulative'] if 'histogram_cumulative' in kwargs.keys() else False
+
+        # splitting each data set into one distribution per year
+        if by_year:
+            years = np.asarray(dates.year)
+            distributions, legends = [], []
+            for data, legend in zip(plot_data_sets, plot_legends):
+                data = np.asarray(data, dtype=float)
+                for year in np.unique(years):
+                    distributions.append(data[years == year])
+                    legends.append("{} {}".format(legend, year))
+        else:
+            distributions, legends = plot_data_sets, plot_legends
+
+        bin_edges = get_bin_edges(plot_units[0], distributions)
 
         # drawing plotly figure
         fig = go.Figure()
-        for data, legend in zip(plot_data_sets, plot_legends):
-            fig.add_trace(go.Histogram(x=data, name=legend, histnorm='percent'))
+        for data, legend in zip(distributions, legends):
+            centers, widths, percentages = bin_values(data, bin_edges, cumulative)
+            if cumulative:
+                # the percentage of all values up to the right edge of each bin
+                fig.add_trace(go.Scatter(x=bin_edges[1:], y=percentages, name=legend, mode='lines+markers'))
+            else:
+                fig.add_trace(go.Bar(x=centers, y=percentages, width=widths, name=legend, opacity=0.75))
 
         # setting annotations
         unit_as_text = UnitsAnnotationText[plot_units[0]]
         fig.update_layout(
             barmode='overlay', 
             xaxis={'title': {'text': unit_as_text}}, 
-            yaxis={'title': {'text': 'Percent'}}
+            yaxis={'title': {'text': 'Cumulative Percent' if cumulative else 'Percent'}}
         )
 
-        # transparency
-        fig.update_traces(opacity=0.75)
+        # setting range of x-axis to the bins, e.g. for Scores to 0 to 100
+        fig.update_layout(xaxis={'range': [bin_edges[0], bin_edges[-1]]})
+
+        return fig
+
+
+    def __heatmap_figure(self, dates: List[str], plot_data_sets, plot_legends: List[str], plot_units: List[Unit], **kwargs) -> go.Figure:
+        """
+        Drawing a matrix of correlations as a heatmap.
+        Instead of dates the titles of the correlated measurements are given, 
+        they label both axes.
+        """
+
+        correlations = plot_data_sets[0]
+        n_measurements = len(dates)
+
+        fig = go.Figure()
+        fig.add_trace(go.Heatmap(z=correlations, x=dates, y=dates, zmin=-1, zmax=1, zmid=0, colorscale='RdBu'))
+
+        # the coefficients are only readable for a small number of measurements
+        if n_measurements <= 20:
+            fig.update_traces(text=np.round(correlations, 2), texttemplate="%{text}")
 
-        # setting range of x-axis for Scores to 0 to 100
-        if plot_units[0] == Unit.score:
-            fig.update_layout(xaxis={'range': [0, 100]})
+        # growing with the number of measurements, so all labels stay readable
+        size = max(700, 20 * n_measurements)
+        fig.update_layout(width=size + 200, height=size)
+        fig.update_yaxes(autorange='reversed')
 
         return fig
@@ -0,0 +1,93 @@
+import os
+import hashlib
+import threading
+from typing import List
+
+from analyser.image_export import link_file
+
+
+class RenderCache:
+    """
+    Content addressed cache of rendered images.
+    Each image is stored under the hash of the serialized figure it was rendered from,
+    which contains the plotted data arrays as well as the layout.
+    Unchanged figures can therefore be linked to their output file instead of rendering them again.
+    The cache directory is kept below a maximum size by removing the least recently used images.
+    """
+
+    def __init__(self, cache_path: List[str], max_size_bytes: int = 256 * 1024 * 1024):
+        """
+        Parameters
+        ----------
+        cache_path : List[str]
+            Path of the directory the cached images are stored in.
+
+        max_size_bytes : int
+            Maximum size of all cached images together.
+        """
+
+        self._cache_location = os.path.join(os.getcwd(), *cache_path)
+        self.__max_size_bytes = max_size_bytes
+        self.__lock = threading.Lock()
+
+        os.makedirs(self._cache_location, exist_ok=True)
+
+
+    @classmethod
+    def get_key(cls, fig_json: str) -> str:
+        """ Hash of the serialized figure, used as the cache key. """
+        return hashlib.sha256(fig_json.encode('utf-8')).hexdigest()
+
+
+    def get_entry_path_name(self, key: str, extension: str = 'png') -> str:
+        """ Path of the cached image with the given key. """
+        return os.path.join(self._cache_location, "{}.{}".format(key, extension))
+
+
+    def link_cached(self, key: str, path_name: str, extension: str = 'png') -> bool:
+        """
+        Linking the cached image with the given key to the given path, if it is cached.
+        Marks the image as recently used.
+
+        Returns
+        -------
+        bool
+            whether the image was cached or not
+        """
+
+        entry_path_name = self.get_entry_path_name(key, extension)
+        try:
+            os.utime(entry_path_name)
+            link_file(entry_path_name, path_name)
+        except FileNotFoundError:
+            # not cached or evicted in the meantime
+            return False
+        return True
+
+
+    def evict(self):
+        """ Removing the least recently used images until the cache is small enough again. """
+
+        with self.__lock:
+            entries = []
+            total_size = 0
+            with os.scandir(self._cache_location) as it:
+                for dir_entry in it:
+                    if not dir_entry.is_file() or dir_entry.name.endswith('.tmp'):
+                        continue
+                    stat = dir_entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, dir_entry.path))
+                    total_size += stat.st_size
+
+            if total_size <= self.__max_size_bytes:
+                return
+
+            # oldest first
+            for _, size, entry_path_name in sorted(entries):
+                try:
+                    os.remove(entry_path_name)
+                except FileNotFoundError:
+                    pass
+                total_size -= size
+                if total_size <= self.__max_size_bytes:
+                    break
@@ -0,0 +1,113 @@
+from typing import Tuple
+
+import numpy as np
+
+
+def rolling_statistics(values: np.array, window: int, min_periods: int = None, ddof: int = 1) -> Tuple[np.array, np.array, np.array]:
+    """
+    Rolling mean, standard deviation and number of values over the trailing window of each day,
+    including the day itself. NaN values are ignored.
+    All statistics are computed in O(n) with cumulative sums, for all columns of a 2-D array at once.
+
+    Parameters
+    ----------
+    values : np.array
+        One value per day, either one dimensional or two dimensional with one column per measurement.
+
+    window : int
+        Number of days in each window.
+
+    min_periods : int
+        Minimum number of non-NaN values in a window, otherwise the statistics of that day are NaN.
+        Defaults to half of the window.
+
+    ddof : int
+        Delta degrees of freedom of the standard deviation.
+
+    Returns
+    --------
+    Tuple
+        np.array of the rolling means,
+        np.array of the rolling standard deviations,
+        np.array of the number of values in each window
+    """
+
+    if window < 1:
+        raise ValueError("The window must contain at least one day")
+    if min_periods is None:
+        min_periods = max(1, window // 2)
+
+    values = np.asarray(values, dtype=float)
+    one_dimensional = values.ndim == 1
+    if one_dimensional:
+        values = values[:, np.newaxis]
+
+    n = values.shape[0]
+    finite = np.isfinite(values)
+
+    # centering each column keeps the cumulative sums of squares numerically stable
+    counts_per_column = finite.sum(axis=0)
+    center = np.where(counts_per_column > 0, np.where(finite, values, 0.0).sum(axis=0) / np.maximum(counts_per_column, 1), 0.0)
+    centered = np.where(finite, values - center, 0.0)
+
+    zeros = np.zeros((1, values.shape[1]))
+    cumulative_counts = np.concatenate((zeros, np.cumsum(finite, axis=0)))
+    cumulative_sums = np.concatenate((zeros, np.cumsum(centered, axis=0)))
+    cumulative_squares = np.concatenate((zeros, np.cumsum(centered ** 2, axis=0)))
+
+    # the window of day i covers the days from i - window + 1 until i
+    upper = np.arange(1, n + 1)
+    lower = np.maximum(upper - window, 0)
+
+    counts = cumulative_counts[upper] - cumulative_counts[lower]
+    sums = cumulative_sums[upper] - cumulative_sums[lower]
+    squares = cumulative_squares[upper] - cumulative_squares[lower]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        centered_means = sums / counts
+        variances = (squares - sums * centered_means) / (counts - ddof)
+
+    means = centered_means + center
+    stds = np.sqrt(np.maximum(variances, 0.0))
+
+    too_few = (counts < min_periods) | (counts <= 0)
+    means[too_few] = np.nan
+    stds[too_few | (counts - ddof <= 0)] = np.nan
+
+    if one_dimensional:
+        return means[:, 0], stds[:, 0], counts[:, 0]
+    return means, stds, counts
+
+
+def rolling_mean(values: np.array, window: int, min_periods: int = None) -> np.array:
+    """ Rolling mean over the trailing window of each day, including the day itself. """
+    means, _, _ = rolling_statistics(values, window, min_periods)
+    return means
+
+
+def rolling_std(values: np.array, window: int, min_periods: int = None) -> np.array:
+    """ Rolling standard deviation over the trailing window of each day, including the day itself. """
+    _, stds, _ = rolling_statistics(values, window, min_periods)
+    return stds
+
+
+def rolling_baseline(values: np.array, window: int, min_periods: int = None) -> Tuple[np.array, np.array]:
+    """
+    Baseline of each day, which is the mean and standard deviation of the window of days before it.
+    The day itself is excluded, so a single deviating day does not shift its own baseline.
+
+    Returns
+    --------
+    Tuple
+        np.array of the baseline means,
+        np.array of the baseline standard deviations
+    """
+
+    means, stds, _ = rolling_statistics(values, window, min_periods)
+
+    baseline_means = np.full_like(means, np.nan)
+    baseline_stds = np.full_like(stds, np.nan)
+    baseline_means[1:] = means[:-1]
+    baseline_stds[1:] = stds[:-1]
+
+    return baseline_means, baseline_stds
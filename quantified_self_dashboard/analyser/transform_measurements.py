@@ -1,39 +1,17 @@
-import math
-import datetime
 from typing import Callable
 from common.constants import *
 
 
 identity = lambda x: x
-seconds_to_hours = lambda x: x / 3600 if x else None 
+seconds_to_hours = lambda x: x / 3600 if x is not None else None 
 
-seconds_to_hours_in_relation_to_midnight = lambda x: 24 + seconds_to_hours(x) if x else None
-
-
-def seconds_to_datetime(x):
-    time_in_hours = seconds_to_hours(x)
-    return time_to_datetime(time_in_hours)
-
-
-def seconds_to_datetime_in_relation_to_midnight(x):
-    time_in_hours = seconds_to_hours_in_relation_to_midnight(x)
-    return time_to_datetime(time_in_hours)
-
-
-def time_to_datetime(x):
-
-    hours = math.floor(x)
-    minutes = math.floor( (x - hours) * 60 )
-
-    if hours >= 24:
-        hours -= 24
-
-    datetime_obj = datetime.time(hours, minutes, 0)
-    return datetime_obj
+seconds_to_hours_in_relation_to_midnight = lambda x: 24 + seconds_to_hours(x) if x is not None else None
 
 
 
 # attribute_name: [display_transform x->x, original_type, transformed_type, original_unit: str, transformed_unit: str, title: str]
+# measurements with the transformed unit Unit.time_of_day are seconds relative to midnight,
+# they are averaged with circular statistics as they wrap around midnight
 sleep_transform = {
 
     "total": [seconds_to_hours, int, float, Unit.seconds, Unit.hours, "Total Sleep Time", True],
@@ -44,7 +22,7 @@ sleep_transform = {
     "duration": [seconds_to_hours, int, float, Unit.seconds, Unit.hours, "Sleep Duration", True],
 
     "bedtime_end_delta": [seconds_to_hours, int, float, Unit.seconds, Unit.hours, "End of Sleep Period", True],
-    "bedtime_start_delta": [seconds_to_hours_in_relation_to_midnight, int, float, Unit.seconds, Unit.hours, "Start of Sleep Period", True],
+    "bedtime_start_delta": [seconds_to_hours_in_relation_to_midnight, int, float, Unit.seconds, Unit.time_of_day, "Start of Sleep Period", True],
     "midpoint_at_delta": [seconds_to_hours, int, float, Unit.seconds, Unit.hours, "Sleep Midpoint Delta", True],
     "midpoint_time": [seconds_to_hours, int, float, Unit.seconds, Unit.hours, "Sleep Mindpoint", True],
 
@@ -61,9 +39,9 @@ sleep_transform = {
     "rmssd": [identity, int, int, Unit.raw_data, Unit.raw_data, "RMSSD", True],
     "hr_average": [identity, float, float, Unit.raw_data, Unit.raw_data, "Average Heart Rate", True],
     "hr_lowest": [identity, int, int, Unit.raw_data, Unit.raw_data, "Lowest Heart Rate", True],
-    "temperature_delta": [identity, int, int, Unit.celsius, Unit.celsius, "Temperature Delta", True],
-    "temperature_deviation": [identity, int, int, Unit.celsius, Unit.celsius, "Temperature Deviation", True],
-    "temperature_trend_deviation": [identity, int, int, Unit.raw_data, Unit.raw_data, "Temperature Trend Deviation", True],
+    "temperature_delta": [identity, float, float, Unit.celsius, Unit.celsius, "Temperature Delta", True],
+    "temperature_deviation": [identity, float, float, Unit.celsius, Unit.celsius, "Temperature Deviation", True],
+    "temperature_trend_deviation": [identity, float, float, Unit.raw_data, Unit.raw_data, "Temperature Trend Deviation", True],
     "breath_average": [identity, float, float, Unit.raw_data, Unit.raw_data, "Breath Average", True],
 
 }
@@ -100,8 +78,8 @@ activity_transform = {
 
 
 bedtime_transform = {
-    "bedtime_window_start": [seconds_to_datetime_in_relation_to_midnight, int, datetime.time, Unit.seconds, Unit.hours, "Bedtime Window Start Time", False],
-    "bedtime_window_end": [seconds_to_datetime_in_relation_to_midnight, int, datetime.time, Unit.seconds, Unit.hours, "Bedtime Window End Time", False],
+    "bedtime_window_start": [seconds_to_hours_in_relation_to_midnight, int, float, Unit.seconds, Unit.time_of_day, "Bedtime Window Start Time", False],
+    "bedtime_window_end": [seconds_to_hours_in_relation_to_midnight, int, float, Unit.seconds, Unit.time_of_day, "Bedtime Window End Time", False],
 }
 
 
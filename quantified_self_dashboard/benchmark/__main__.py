@@ -0,0 +1,182 @@
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import statistics
+import subprocess
+import tracemalloc
+
+import numpy as np
+
+from benchmark.benchmarks import all_benchmarks, startup_modules, import_time_budget_seconds, measure_import_time
+
+
+# Benchmarks of the load, query, save and analyse paths on synthetic data.
+# Run from the quantified_self_dashboard directory:
+#
+#   python -m benchmark --years 5 --save-baseline before
+#   ... change something ...
+#   python -m benchmark --years 5 --compare before
+#
+# The exit code is 1 if a benchmark got slower than the threshold allows compared to the baseline
+# or the import time budget is exceeded.
+
+baselines_directory = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+
+def get_git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def get_metadata(years: int, repeat: int) -> dict:
+    import pandas
+
+    return {
+        'git_commit': get_git_commit(),
+        'created_at': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': np.__version__,
+        'pandas': pandas.__version__,
+        'years': years,
+        'repeat': repeat,
+    }
+
+
+def run_benchmark(benchmark, years: int, repeat: int, directory: str) -> dict:
+    """
+    Running the benchmark repeat times, each time after a fresh setup, and once more while tracing the memory.
+
+    Returns
+    --------
+    dict
+        with the minimum and median seconds of the runs and the peak of the memory allocated during a run in bytes
+    """
+
+    setup, run = benchmark(years, directory)
+
+    seconds = []
+    for _ in range(repeat):
+        state = setup()
+        start = time.perf_counter()
+        run(state)
+        seconds.append(time.perf_counter() - start)
+
+    # separate run, as tracing the memory slows everything down
+    state = setup()
+    tracemalloc.start()
+    run(state)
+    _, peak_memory_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {'min_seconds': min(seconds), 'median_seconds': statistics.median(seconds), 'peak_memory_bytes': peak_memory_bytes}
+
+
+def run_import_time_check() -> dict:
+    seconds, imported_deferred_modules = measure_import_time(startup_modules)
+    return {
+        'seconds': seconds,
+        'budget_seconds': import_time_budget_seconds,
+        'imported_deferred_modules': imported_deferred_modules,
+        'passed': seconds <= import_time_budget_seconds and len(imported_deferred_modules) == 0,
+    }
+
+
+def compare_with_baseline(results: dict, baseline: dict, threshold: float) -> list:
+    """
+    Comparing the minimum seconds of each benchmark with the baseline.
+
+    Returns
+    --------
+    list
+        of the names of the benchmarks, which are slower than threshold times the baseline
+    """
+
+    if baseline['metadata']['years'] != results['metadata']['years']:
+        print("warning: baseline was measured with {} years, not {}".format(baseline['metadata']['years'], results['metadata']['years']))
+
+    print()
+    print("compared to baseline of commit {}".format(baseline['metadata']['git_commit']))
+    print("{:<26} {:>12} {:>12} {:>8}".format("benchmark", "baseline [s]", "now [s]", "ratio"))
+
+    regressions = []
+    for name, result in results['benchmarks'].items():
+        if name not in baseline['benchmarks'].keys():
+            continue
+        baseline_seconds = baseline['benchmarks'][name]['min_seconds']
+        ratio = result['min_seconds'] / baseline_seconds if baseline_seconds > 0 else float('inf')
+        marker = ""
+        if ratio > threshold:
+            regressions.append(name)
+            marker = "  slower"
+        print("{:<26} {:>12.4f} {:>12.4f} {:>8.2f}{}".format(name, baseline_seconds, result['min_seconds'], ratio, marker))
+
+    return regressions
+
+
+def main(arguments=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmark", description="Benchmarks of the load, query, save and analyse paths on synthetic data.")
+    parser.add_argument("--years", type=int, default=5, help="years of synthetic history, between 1 and 20")
+    parser.add_argument("--repeat", type=int, default=5, help="number of measured runs of each benchmark")
+    parser.add_argument("--only", nargs="+", choices=list(all_benchmarks.keys()), help="names of the benchmarks to run, all by default")
+    parser.add_argument("--output", help="path name of a json file for the results")
+    parser.add_argument("--save-baseline", metavar="NAME", help="saving the results as baseline with this name")
+    parser.add_argument("--compare", metavar="NAME", help="comparing the results with the baseline with this name")
+    parser.add_argument("--threshold", type=float, default=1.2, help="ratio to the baseline from which on a benchmark counts as slower")
+    args = parser.parse_args(arguments)
+
+    if not 1 <= args.years <= 20:
+        parser.error("--years has to be between 1 and 20")
+    if args.repeat < 1:
+        parser.error("--repeat has to be at least 1")
+
+    baseline = None
+    if args.compare:
+        baseline_path_name = os.path.join(baselines_directory, args.compare + ".json")
+        if not os.path.exists(baseline_path_name):
+            parser.error("no baseline named {}".format(args.compare))
+        with open(baseline_path_name) as f:
+            baseline = json.load(f)
+
+    names = args.only if args.only else list(all_benchmarks.keys())
+    results = {'metadata': get_metadata(args.years, args.repeat), 'benchmarks': dict()}
+
+    print("{:<26} {:>12} {:>12} {:>12}".format("benchmark", "min [s]", "median [s]", "peak [MB]"))
+    with tempfile.TemporaryDirectory() as directory:
+        for name in names:
+            result = run_benchmark(all_benchmarks[name], args.years, args.repeat, directory)
+            results['benchmarks'][name] = result
+            print("{:<26} {:>12.4f} {:>12.4f} {:>12.1f}".format(name, result['min_seconds'], result['median_seconds'], result['peak_memory_bytes'] / 2**20))
+
+    import_time = run_import_time_check()
+    results['import_time'] = import_time
+    print()
+    print("import time {:.3f} s of {:.3f} s budget".format(import_time['seconds'], import_time['budget_seconds']))
+    if len(import_time['imported_deferred_modules']) > 0:
+        print("imported at startup: {}".format(", ".join(import_time['imported_deferred_modules'])))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=4)
+
+    if args.save_baseline:
+        os.makedirs(baselines_directory, exist_ok=True)
+        with open(os.path.join(baselines_directory, args.save_baseline + ".json"), 'w') as f:
+            json.dump(results, f, indent=4)
+
+    failed = not import_time['passed']
+    if baseline is not None:
+        regressions = compare_with_baseline(results, baseline, args.threshold)
+        failed = failed or len(regressions) > 0
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,336 @@
+import os
+import sys
+import shutil
+import subprocess
+from typing import Callable, List, Tuple
+
+from common.constants import SummaryType, AnalysisType
+from common.date_helper import date_string_n_days_ago, all_date_strings_between_dates
+from summary.summary_container import SummaryContainer
+from connector.csv_storage_connector import CsvStorageConnector
+from storage.csv_storage import CsvStorage
+from storage.array_storage import ArrayStorage
+from benchmark.synthetic_data import SyntheticConnector
+
+
+# Each benchmark gets the number of years of synthetic history and a working directory.
+# It returns a setup function, which prepares a fresh state and is not measured,
+# and a run function, which gets the state and is measured.
+
+# measurements read by the get_values benchmark
+get_values_measurements = [
+    (SummaryType.sleep, "score"),
+    (SummaryType.sleep, "total"),
+    (SummaryType.sleep, "bedtime_start_delta"),
+    (SummaryType.sleep, "hr_lowest"),
+    (SummaryType.sleep, "rmssd"),
+    (SummaryType.readiness, "score"),
+    (SummaryType.activity, "score"),
+    (SummaryType.activity, "daily_movement"),
+    (SummaryType.bedtime, "bedtime_window_start"),
+    (SummaryType.subjective, "b"),
+]
+
+# analyses of the analyse benchmark, covering all plot types
+analyse_analysis_types = [
+    AnalysisType.scores_daily,
+    AnalysisType.scores_weekly,
+    AnalysisType.sleep_durations_monthly,
+    AnalysisType.bedtimes_weekly,
+    AnalysisType.sleep_score_distribution,
+    AnalysisType.scores_rolling,
+    AnalysisType.correlation_matrix,
+    AnalysisType.sleep_score_weekly_by_year,
+]
+
+# modules imported at startup and the maximum seconds for importing them
+startup_modules = ['main', 'cli']
+import_time_budget_seconds = 0.25
+
+# modules which must not be imported at startup
+deferred_modules = ['pandas', 'plotly', 'requests', 'wx', 'kaleido']
+
+
+def get_starting_date(years: int) -> str:
+    """ Starting date of a history of the given number of years until today. """
+    return date_string_n_days_ago(int(round(years * 365.25)) - 1)
+
+
+def create_container(years: int, seed: int = 0) -> SummaryContainer:
+    """ Container with a synthetic connector for all summary types, which is preloaded but not loaded yet. """
+    starting_date = get_starting_date(years)
+    today = date_string_n_days_ago(0)
+
+    container = SummaryContainer(starting_date, containing_sleep=True, containing_readiness=True, containing_activity=True, containing_bedtime=True, containing_subjective=True)
+    container.add_api_connector(SyntheticConnector(starting_date, today, seed))
+    container.preload()
+    return container
+
+
+def create_loaded_container(years: int, seed: int = 0) -> SummaryContainer:
+    container = create_container(years, seed)
+    container.load()
+    return container
+
+
+def get_csv_path_name(years: int, directory: str, extension: str = ".csv") -> str:
+    """ Csv storage file with the synthetic history of the given number of years, written only once per directory. """
+    path_name = os.path.join(directory, "synthetic_{}_years{}".format(years, extension))
+    if not os.path.exists(path_name):
+        CsvStorage([path_name]).save(create_loaded_container(years))
+    return path_name
+
+
+def csv_preload(years: int, directory: str) -> Tuple[Callable, Callable]:
+    path_name = get_csv_path_name(years, directory)
+
+    def setup():
+        return CsvStorageConnector([path_name])
+
+    def run(connector):
+        connector.preload()
+
+    return setup, run
+
+
+def csv_preload_chunked(years: int, directory: str) -> Tuple[Callable, Callable]:
+    path_name = get_csv_path_name(years, directory)
+
+    def setup():
+        return CsvStorageConnector([path_name], chunksize=1000)
+
+    def run(connector):
+        connector.preload()
+
+    return setup, run
+
+
+def csv_preload_gzip(years: int, directory: str) -> Tuple[Callable, Callable]:
+    path_name = get_csv_path_name(years, directory, ".csv.gz")
+
+    def setup():
+        return CsvStorageConnector([path_name])
+
+    def run(connector):
+        connector.preload()
+
+    return setup, run
+
+
+def csv_get_summary_data(years: int, directory: str) -> Tuple[Callable, Callable]:
+    path_name = get_csv_path_name(years, directory)
+    dates = all_date_strings_between_dates(get_starting_date(years), date_string_n_days_ago(0))
+
+    def setup():
+        connector = CsvStorageConnector([path_name])
+        connector.preload()
+        return connector
+
+    def run(connector):
+        for summary_type in connector.supported_summary_types:
+            for date in dates:
+                connector.get_summary_data(summary_type, date)
+
+    return setup, run
+
+
+def container_load(years: int, directory: str) -> Tuple[Callable, Callable]:
+
+    def setup():
+        return create_container(years)
+
+    def run(container):
+        container.load()
+
+    return setup, run
+
+
+def container_load_from_csv(years: int, directory: str) -> Tuple[Callable, Callable]:
+    path_name = get_csv_path_name(years, directory)
+
+    def setup():
+        container = SummaryContainer(get_starting_date(years), containing_sleep=True, containing_readiness=True, containing_activity=True, containing_bedtime=True, containing_subjective=True)
+        container.add_storage_connector(CsvStorageConnector([path_name]))
+        return container
+
+    def run(container):
+        container.preload()
+        container.load()
+
+    return setup, run
+
+
+def container_load_with_arrays(years: int, directory: str) -> Tuple[Callable, Callable]:
+    """
+    Starting a container whose arrays already contain the stored days and reading the latest days of the measurements,
+    so only the arrays are read and the memory does not depend on the length of the history, unlike container_load_from_csv.
+    """
+
+    path_name = get_csv_path_name(years, directory)
+    arrays_path_name = os.path.join(directory, "loaded_arrays_{}_years".format(years))
+    start, end = date_string_n_days_ago(89), date_string_n_days_ago(0)
+
+    if ArrayStorage([arrays_path_name]).get_date_range()[1] != end:
+        if os.path.exists(arrays_path_name):
+            shutil.rmtree(arrays_path_name)
+        ArrayStorage([arrays_path_name]).save(create_loaded_container(years))
+
+    def setup():
+        container = SummaryContainer(get_starting_date(years), containing_sleep=True, containing_readiness=True, containing_activity=True, containing_bedtime=True, containing_subjective=True)
+        container.add_storage_connector(CsvStorageConnector([path_name], chunksize=1000))
+        container.set_measurement_arrays(ArrayStorage([arrays_path_name]))
+        return container
+
+    def run(container):
+        container.preload()
+        container.load()
+        for summary_type, measurement_name in get_values_measurements:
+            container.get_values(start, end, summary_type, measurement_name)
+
+    return setup, run
+
+
+def get_values(years: int, directory: str) -> Tuple[Callable, Callable]:
+    container = create_loaded_container(years)
+    start, end = get_starting_date(years), date_string_n_days_ago(0)
+
+    def setup():
+        return container
+
+    def run(container):
+        for summary_type, measurement_name in get_values_measurements:
+            container.get_values(start, end, summary_type, measurement_name)
+
+    return setup, run
+
+
+def get_values_from_arrays(years: int, directory: str) -> Tuple[Callable, Callable]:
+    container = create_loaded_container(years)
+    start, end = get_starting_date(years), date_string_n_days_ago(0)
+
+    arrays_path_name = os.path.join(directory, "arrays_{}_years".format(years))
+    arrays = ArrayStorage([arrays_path_name])
+    if arrays.get_date_range() != (start, end):
+        arrays.save(container)
+    container.set_measurement_arrays(arrays)
+
+    def setup():
+        return container
+
+    def run(container):
+        for summary_type, measurement_name in get_values_measurements:
+            container.get_values(start, end, summary_type, measurement_name)
+
+    return setup, run
+
+
+def array_save(years: int, directory: str) -> Tuple[Callable, Callable]:
+    container = create_loaded_container(years)
+    path_name = os.path.join(directory, "saved_arrays_{}_years".format(years))
+
+    def setup():
+        # saving into a new directory
+        if os.path.exists(path_name):
+            shutil.rmtree(path_name)
+        return ArrayStorage([path_name])
+
+    def run(storage):
+        storage.save(container)
+
+    return setup, run
+
+
+def get_dict_of_bundles(years: int, directory: str) -> Tuple[Callable, Callable]:
+    container = create_loaded_container(years)
+
+    def setup():
+        return container
+
+    def run(container):
+        container.get_dict_of_bundles()
+
+    return setup, run
+
+
+def csv_save(years: int, directory: str) -> Tuple[Callable, Callable]:
+    container = create_loaded_container(years)
+    path_name = os.path.join(directory, "saved_{}_years.csv".format(years))
+
+    def setup():
+        # saving into a new file, not merging with an existing one
+        if os.path.exists(path_name):
+            os.remove(path_name)
+        return CsvStorage([path_name])
+
+    def run(storage):
+        storage.save(container)
+
+    return setup, run
+
+
+def analyse(years: int, directory: str) -> Tuple[Callable, Callable]:
+    from analyser.plotly_analyser import PlotlyAnalyser
+
+    container = create_loaded_container(years)
+    start, end = get_starting_date(years), date_string_n_days_ago(0)
+    output_path = os.path.join(directory, "output")
+    os.makedirs(output_path, exist_ok=True)
+
+    # the first image export starts the renderer, which is not part of the measurement
+    warm_up_analyser = PlotlyAnalyser([output_path], container)
+    for future in warm_up_analyser.analyse(end, end, AnalysisType.scores_daily):
+        future.result()
+
+    def setup():
+        return PlotlyAnalyser([output_path], container)
+
+    def run(analyser):
+        for analysis_type in analyse_analysis_types:
+            for future in analyser.analyse(start, end, analysis_type):
+                future.result()
+
+    return setup, run
+
+
+# name: benchmark function
+all_benchmarks = {
+    "csv_preload": csv_preload,
+    "csv_preload_chunked": csv_preload_chunked,
+    "csv_preload_gzip": csv_preload_gzip,
+    "csv_get_summary_data": csv_get_summary_data,
+    "container_load": container_load,
+    "container_load_from_csv": container_load_from_csv,
+    "container_load_with_arrays": container_load_with_arrays,
+    "get_values": get_values,
+    "get_values_from_arrays": get_values_from_arrays,
+    "get_dict_of_bundles": get_dict_of_bundles,
+    "csv_save": csv_save,
+    "array_save": array_save,
+    "analyse": analyse,
+}
+
+
+def measure_import_time(modules: List[str]) -> Tuple[float, List[str]]:
+    """
+    Importing the given modules in a new interpreter.
+
+    Returns
+    --------
+    Tuple
+        seconds needed for the imports,
+        List of the deferred modules which got imported anyway
+    """
+
+    code = "\n".join([
+        "import sys, time",
+        "start = time.perf_counter()",
+        "import {}".format(", ".join(modules)),
+        "print(time.perf_counter() - start)",
+        "print(','.join(m for m in {} if m in sys.modules))".format(repr(deferred_modules)),
+    ])
+    working_directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run([sys.executable, "-c", code], cwd=working_directory, capture_output=True, text=True, check=True).stdout.splitlines()
+
+    seconds = float(output[0])
+    imported_deferred_modules = [m for m in output[1].split(",") if m] if len(output) > 1 else []
+    return seconds, imported_deferred_modules
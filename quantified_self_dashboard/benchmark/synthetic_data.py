@@ -0,0 +1,600 @@
+import os
+import csv
+import gzip
+import json
+import argparse
+from typing import Tuple, List, Union, Iterator
+
+import numpy as np
+
+from common.constants import SummaryType, SubjectiveMeasurementType, SUMMARY_DATE
+from common.date_helper import date_string_to_ordinal, ordinals_to_date_strings, date_string_n_days_ago
+from connector.abstract_connector import AbstractConnector
+
+
+# Synthetic but realistic summaries for testing and benchmarking at scale:
+# decades of days, many users and gaps, with the correlations of the real data,
+# e.g. sleep stages adding up to the total sleep, later bedtimes on weekends,
+# readiness following the sleep and the heart rate variability.
+# All values are in the units of the oura api, e.g. seconds and seconds relative to midnight.
+
+# measurement names of each summary type in the order they are written
+synthetic_measurement_names = {
+    SummaryType.sleep: [
+        "total", "awake", "rem", "light", "deep", "duration",
+        "bedtime_start_delta", "bedtime_end_delta", "midpoint_at_delta", "midpoint_time",
+        "efficiency", "score", "score_alignment", "score_deep", "score_disturbances",
+        "score_efficiency", "score_latency", "score_rem", "score_total",
+        "rmssd", "hr_average", "hr_lowest",
+        "temperature_delta", "temperature_deviation", "temperature_trend_deviation", "breath_average",
+    ],
+    SummaryType.readiness: [
+        "score", "score_activity_balance", "score_hrv_balance", "score_previous_day", "score_previous_night",
+        "score_recovery_index", "score_resting_hr", "score_sleep_balance", "score_temperature",
+    ],
+    SummaryType.activity: [
+        "score", "average_met", "cal_active", "cal_total", "daily_movement",
+        "high", "inactive", "low", "medium", "inactivity_alerts",
+    ],
+    SummaryType.bedtime: [
+        "bedtime_window_start", "bedtime_window_end",
+    ],
+}
+
+# measurements which are integers in the oura api, all other measurements are floats
+integer_measurement_names = {
+    SummaryType.sleep: [name for name in synthetic_measurement_names[SummaryType.sleep] if name not in ["hr_average", "temperature_delta", "temperature_deviation", "temperature_trend_deviation", "breath_average"]],
+    SummaryType.readiness: synthetic_measurement_names[SummaryType.readiness],
+    SummaryType.activity: [name for name in synthetic_measurement_names[SummaryType.activity] if name != "average_met"],
+    SummaryType.bedtime: synthetic_measurement_names[SummaryType.bedtime],
+}
+
+
+# subjective input structure used if none is given, the same as in main.py
+default_subjective_input_structure = [('a', SubjectiveMeasurementType.bool), ('b', SubjectiveMeasurementType.number), ('c', SubjectiveMeasurementType.percentage)]
+
+# summary types measured by the ring, which are all missing while it is not worn
+ring_summary_types = [SummaryType.sleep, SummaryType.readiness, SummaryType.activity, SummaryType.bedtime]
+
+# order of the summary types in the csv storage, the same as in the SummaryContainer
+csv_summary_types = [SummaryType.sleep, SummaryType.readiness, SummaryType.activity, SummaryType.bedtime, SummaryType.subjective]
+
+# number of days generated at once, which bounds the memory of streaming output
+default_chunk_days = 366
+
+
+def exponential_moving_average(values: np.array, alpha: float, initial: float) -> np.array:
+    """ Exponential moving average of the values, starting from the initial value. """
+    averages = np.empty(len(values))
+    average = initial
+    for index, value in enumerate(values):
+        average += alpha * (value - average)
+        averages[index] = average
+    return averages
+
+
+def generate_gaps(uniform: np.array, gap_ratio: float, mean_gap_length: float, missing: bool) -> np.array:
+    """
+    Missing days as a two state markov chain, so the gaps are runs of days of geometric length.
+    On average gap_ratio of all days are missing.
+
+    Parameters
+    ----------
+    uniform : np.array
+        One uniformly distributed random number per day.
+
+    gap_ratio : float
+        Share of missing days, between 0 and 1.
+
+    mean_gap_length : float
+        Average number of days of a gap, at least 1.
+
+    missing : bool
+        Whether the day before the first day is missing.
+
+    Returns
+    --------
+    np.array
+        of bools, True for each missing day
+    """
+
+    if gap_ratio <= 0:
+        return np.zeros(len(uniform), dtype=bool)
+
+    probability_gap_end = 1 / mean_gap_length
+    probability_gap_start = min(1.0, gap_ratio * probability_gap_end / max(1 - gap_ratio, 1e-9))
+
+    gaps = np.empty(len(uniform), dtype=bool)
+    for index, value in enumerate(uniform):
+        missing = value >= probability_gap_end if missing else value < probability_gap_start
+        gaps[index] = missing
+    return gaps
+
+
+class SyntheticDataGenerator:
+    """
+    Generating reproducible synthetic summaries of one user chunk by chunk,
+    continuing all slowly changing states like baselines and gaps from one chunk to the next.
+    The same seed, user and chunk size result in the same summaries.
+    """
+
+    def __init__(self, seed: int = 0, user: int = 0, gap_ratio: float = 0.03, mean_gap_length: float = 3.0,
+                 subjective_gap_ratio: float = 0.1, subjective_input_structure: List[Tuple[str, SubjectiveMeasurementType]] = None):
+        """
+        Parameters
+        ----------
+        seed : int
+            Seed of the random number generator.
+
+        user : int
+            Index of the user, each user gets different summaries for the same seed.
+
+        gap_ratio : float
+            Share of the days without ring summaries, e.g. when the ring was not worn.
+
+        mean_gap_length : float
+            Average number of consecutive days without summaries.
+
+        subjective_gap_ratio : float
+            Share of the days without subjective inputs.
+
+        subjective_input_structure : List[Tuple[str, SubjectiveMeasurementType]]
+            Names and types of the subjective inputs.
+        """
+
+        if not 0 <= gap_ratio < 1 or not 0 <= subjective_gap_ratio < 1:
+            raise ValueError("Gap ratios must be between 0 and 1")
+        if mean_gap_length < 1:
+            raise ValueError("Mean gap length must be at least one day")
+
+        self.__seed = seed
+        self.__user = user
+        self.__gap_ratio = gap_ratio
+        self.__mean_gap_length = mean_gap_length
+        self.__subjective_gap_ratio = subjective_gap_ratio
+        self.__subjective_input_structure = subjective_input_structure if subjective_input_structure is not None else default_subjective_input_structure
+
+        for _, input_type in self.__subjective_input_structure:
+            if input_type not in [SubjectiveMeasurementType.bool, SubjectiveMeasurementType.number, SubjectiveMeasurementType.percentage]:
+                raise ValueError("Invalid Subjective Tracking Type")
+
+
+    @property
+    def subjective_input_structure(self) -> List[Tuple[str, SubjectiveMeasurementType]]:
+        return self.__subjective_input_structure
+
+
+    def get_measurement_names(self, summary_type: SummaryType) -> List[str]:
+        if summary_type == SummaryType.subjective:
+            return [name for name, _ in self.__subjective_input_structure]
+        return synthetic_measurement_names[summary_type]
+
+
+    def generate(self, start: str, end: str, chunk_days: int = default_chunk_days) -> Iterator[Tuple[np.array, dict, dict]]:
+        """
+        Generating the summaries of all days from start to end in chunks.
+
+        Parameters
+        ----------
+        start : str
+            First day in YYYY-MM-DD format.
+
+        end : str
+            Last day in YYYY-MM-DD format.
+
+        chunk_days : int
+            Maximum number of days of each chunk.
+
+        Returns
+        --------
+        Iterator
+            of Tuples of the day ordinals of the chunk,
+            a dict of the summary types to dicts of the measurement names to np.arrays of the values,
+            and a dict of the summary types to np.arrays of bools whether the summary of the day is available
+        """
+
+        first_ordinal = date_string_to_ordinal(start)
+        last_ordinal = date_string_to_ordinal(end)
+
+        # the states continued from one day to the next
+        self.__state = {
+            'rmssd_baseline': 55.0,
+            'rmssd_average': 55.0,
+            'sleep_balance': 80.0,
+            'activity_balance': 80.0,
+            'bedtime_average': -1800.0,
+            'previous_activity_score': 80.0,
+            'ring_missing': False,
+            'subjective_missing': False,
+        }
+
+        for chunk_start in range(first_ordinal, last_ordinal + 1, chunk_days):
+            ordinals = np.arange(chunk_start, min(chunk_start + chunk_days, last_ordinal + 1))
+            yield (ordinals,) + self.__generate_days(ordinals)
+
+
+    def __generate_days(self, ordinals: np.array) -> Tuple[dict, dict]:
+        rng = np.random.default_rng([self.__seed, self.__user, int(ordinals[0])])
+        state = self.__state
+        n_days = len(ordinals)
+
+        def normal(mean, std):
+            return rng.normal(mean, std, n_days)
+
+        # python weekday of the ordinal, 0 is monday, later nights from friday to sunday
+        weekday = (ordinals - 1) % 7
+        weekend_night = (weekday == 4) | (weekday == 5)
+        # +1 in summer, -1 in winter
+        season = np.sin(2 * np.pi * (ordinals - 80) / 365.25)
+
+        measurements = dict()
+
+        # sleep
+        rmssd_baseline = np.empty(n_days)
+        baseline = state['rmssd_baseline']
+        for index, noise in enumerate(normal(0, 1.5)):
+            baseline = 55 + 0.97 * (baseline - 55) + noise
+            rmssd_baseline[index] = baseline
+        state['rmssd_baseline'] = baseline
+
+        bedtime_start_delta = np.clip(-1800 + 2700 * weekend_night + 900 * season + normal(0, 2400), -18000, 14400)
+        total = np.clip(25200 - 0.25 * bedtime_start_delta + 1800 * weekend_night - 900 * season + normal(0, 2400), 10800, 39600)
+        awake = np.clip(normal(2700, 900), 300, 9000)
+        deep_ratio = np.clip(normal(0.2, 0.04), 0.05, 0.4)
+        rem_ratio = np.clip(normal(0.22, 0.04), 0.05, 0.4)
+        deep = total * deep_ratio
+        rem = total * rem_ratio
+        light = total - deep - rem
+        duration = total + awake
+        efficiency = 100 * total / duration
+        midpoint = bedtime_start_delta + duration / 2
+        rmssd = np.clip(rmssd_baseline + normal(0, 8), 10, 200)
+        hr_lowest = np.clip(62 - 0.25 * rmssd + normal(0, 2.5), 35, 90)
+        temperature_deviation = np.clip(normal(0, 0.25), -2, 2)
+
+        score_total = np.clip(100 - (27000 - total) / 126, 1, 100)
+        score_efficiency = np.clip(100 - 3 * (95 - efficiency), 1, 100)
+        score_deep = np.clip(100 - (5400 - deep) / 45, 1, 100)
+        score_rem = np.clip(100 - (6300 - rem) / 50, 1, 100)
+        score_latency = np.clip(normal(78, 12), 1, 100)
+        score_disturbances = np.clip(100 - awake / 90 + normal(0, 5), 1, 100)
+        score_alignment = np.clip(100 - np.abs(midpoint - 12600) / 90, 1, 100)
+        sleep_score = np.clip(0.35 * score_total + 0.1 * score_efficiency + 0.1 * score_deep + 0.1 * score_rem
+                              + 0.1 * score_latency + 0.15 * score_disturbances + 0.1 * score_alignment, 1, 100)
+
+        measurements[SummaryType.sleep] = {
+            "total": np.round(total),
+            "awake": np.round(awake),
+            "rem": np.round(rem),
+            "light": np.round(light),
+            "deep": np.round(deep),
+            "duration": np.round(duration),
+            "bedtime_start_delta": np.round(bedtime_start_delta),
+            "bedtime_end_delta": np.round(bedtime_start_delta + duration),
+            "midpoint_at_delta": np.round(midpoint),
+            "midpoint_time": np.round(duration / 2),
+            "efficiency": np.round(efficiency),
+            "score": np.round(sleep_score),
+            "score_alignment": np.round(score_alignment),
+            "score_deep": np.round(score_deep),
+            "score_disturbances": np.round(score_disturbances),
+            "score_efficiency": np.round(score_efficiency),
+            "score_latency": np.round(score_latency),
+            "score_rem": np.round(score_rem),
+            "score_total": np.round(score_total),
+            "rmssd": np.round(rmssd),
+            "hr_average": np.round(hr_lowest + 6 + np.abs(normal(0, 2)), 2),
+            "hr_lowest": np.round(hr_lowest),
+            "temperature_delta": np.round(temperature_deviation + normal(0, 0.05), 2),
+            "temperature_deviation": np.round(temperature_deviation, 2),
+            "temperature_trend_deviation": np.round(exponential_moving_average(temperature_deviation, 1 / 3, 0.0), 2),
+            "breath_average": np.round(np.clip(normal(14.5, 0.8), 10, 22), 1),
+        }
+
+        # activity of the day, readiness of the next morning refers to it as the previous day
+        daily_movement = np.clip(np.exp(normal(np.log(8500), 0.35)) * (1 + 0.15 * season), 300, 40000)
+        cal_active = np.clip(0.06 * daily_movement + normal(0, 60), 20, 3000)
+        medium = np.clip(daily_movement / 150 + normal(0, 15), 0, 400)
+        high = np.clip(rng.exponential(15, n_days) * daily_movement / 9000, 0, 300)
+        low = np.clip(240 + daily_movement / 100 + normal(0, 40), 30, 700)
+        inactive = np.clip(1440 - duration / 60 - low - medium - high, 60, 1200)
+        activity_score = np.clip(60 + 20 * np.log2(daily_movement / 6000) + normal(0, 6), 1, 100)
+
+        measurements[SummaryType.activity] = {
+            "score": np.round(activity_score),
+            "average_met": np.round(1.2 + cal_active / 1400, 2),
+            "cal_active": np.round(cal_active),
+            "cal_total": np.round(1750 + cal_active + normal(0, 50)),
+            "daily_movement": np.round(daily_movement),
+            "high": np.round(high),
+            "inactive": np.round(inactive),
+            "low": np.round(low),
+            "medium": np.round(medium),
+            "inactivity_alerts": rng.poisson(np.maximum(0, (inactive - 500) / 150)).astype(float),
+        }
+
+        # readiness
+        previous_activity_score = np.concatenate([[state['previous_activity_score']], activity_score[:-1]])
+        state['previous_activity_score'] = activity_score[-1]
+
+        rmssd_average = exponential_moving_average(rmssd, 1 / 30, state['rmssd_average'])
+        state['rmssd_average'] = rmssd_average[-1]
+        sleep_balance = exponential_moving_average(score_total, 1 / 14, state['sleep_balance'])
+        state['sleep_balance'] = sleep_balance[-1]
+        activity_balance = exponential_moving_average(activity_score, 1 / 14, state['activity_balance'])
+        state['activity_balance'] = activity_balance[-1]
+
+        score_hrv_balance = np.clip(78 + 1.5 * (rmssd - rmssd_average) + normal(0, 4), 1, 100)
+        score_resting_hr = np.clip(100 - 3 * (hr_lowest - 44) + normal(0, 3), 1, 100)
+        score_temperature = np.clip(100 - 60 * np.abs(temperature_deviation), 1, 100)
+        score_recovery_index = np.clip(normal(85, 10), 1, 100)
+        readiness_score = np.clip(0.2 * sleep_score + 0.15 * sleep_balance + 0.15 * score_hrv_balance + 0.15 * score_resting_hr
+                                  + 0.1 * score_temperature + 0.1 * score_recovery_index + 0.075 * previous_activity_score
+                                  + 0.075 * activity_balance, 1, 100)
+
+        measurements[SummaryType.readiness] = {
+            "score": np.round(readiness_score),
+            "score_activity_balance": np.round(np.clip(activity_balance, 1, 100)),
+            "score_hrv_balance": np.round(score_hrv_balance),
+            "score_previous_day": np.round(previous_activity_score),
+            "score_previous_night": np.round(sleep_score),
+            "score_recovery_index": np.round(score_recovery_index),
+            "score_resting_hr": np.round(score_resting_hr),
+            "score_sleep_balance": np.round(np.clip(sleep_balance, 1, 100)),
+            "score_temperature": np.round(score_temperature),
+        }
+
+        # ideal bedtime window of one hour around the usual bedtime, in steps of 15 minutes
+        bedtime_average = exponential_moving_average(bedtime_start_delta, 1 / 14, state['bedtime_average'])
+        state['bedtime_average'] = bedtime_average[-1]
+        bedtime_window_start = np.round(bedtime_average / 900) * 900 - 1800
+
+        measurements[SummaryType.bedtime] = {
+            "bedtime_window_start": bedtime_window_start,
+            "bedtime_window_end": bedtime_window_start + 3600,
+        }
+
+        # subjective inputs, loosely following how the day went
+        subjective = dict()
+        for name, input_type in self.__subjective_input_structure:
+            if input_type == SubjectiveMeasurementType.bool:
+                probability = 1 / (1 + np.exp(-(sleep_score - 77) / 8))
+                subjective[name] = rng.random(n_days) < probability
+            elif input_type == SubjectiveMeasurementType.percentage:
+                subjective[name] = np.round(np.clip(50 + 1.5 * (readiness_score - 78) + normal(0, 15), 0, 100))
+            else:
+                subjective[name] = np.round(np.clip(5 + (activity_score - 75) / 10 + normal(0, 2), 0, None))
+        measurements[SummaryType.subjective] = subjective
+
+        # gaps
+        ring_missing = generate_gaps(rng.random(n_days), self.__gap_ratio, self.__mean_gap_length, state['ring_missing'])
+        subjective_missing = generate_gaps(rng.random(n_days), self.__subjective_gap_ratio, self.__mean_gap_length, state['subjective_missing'])
+        state['ring_missing'] = bool(ring_missing[-1])
+        state['subjective_missing'] = bool(subjective_missing[-1])
+
+        available = {summary_type: ~ring_missing for summary_type in ring_summary_types}
+        available[SummaryType.subjective] = ~subjective_missing
+
+        return measurements, available
+
+
+def get_measurement_lists(measurements: dict, summary_type: SummaryType) -> dict:
+    """ Measurement values of the summary type as lists of python ints, floats or bools, like they are parsed from json. """
+
+    lists = dict()
+    for name, values in measurements[summary_type].items():
+        if values.dtype == bool:
+            lists[name] = values.tolist()
+        elif name in integer_measurement_names.get(summary_type, []) or summary_type == SummaryType.subjective:
+            # subjective numbers and percentages are entered as whole numbers
+            lists[name] = values.astype(np.int64).tolist()
+        else:
+            lists[name] = values.tolist()
+    return lists
+
+
+def get_summaries_of_chunk(ordinals: np.array, measurements: dict, available: dict, summary_type: SummaryType) -> List[dict]:
+    """ Available summaries of the summary type of one chunk as dictionaries, like the connectors return them. """
+
+    dates = ordinals_to_date_strings(ordinals)
+    lists = get_measurement_lists(measurements, summary_type)
+    names = list(lists.keys())
+
+    summaries = []
+    for index in np.flatnonzero(available[summary_type]):
+        summary = {SUMMARY_DATE: dates[index]}
+        for name in names:
+            summary[name] = lists[name][index]
+        summaries.append(summary)
+    return summaries
+
+
+class SyntheticConnector(AbstractConnector):
+    """
+    Connector generating reproducible synthetic summaries for all days from start to end,
+    like they would be retrieved from the oura api and the subjective inputs.
+    Used to benchmark and test everything without the oura service.
+    """
+
+    supported_summary_types = [SummaryType.sleep, SummaryType.readiness, SummaryType.activity, SummaryType.bedtime, SummaryType.subjective]
+
+    def __init__(self, start: str, end: str, seed: int = 0, gap_ratio: float = 0.03, **kwargs):
+        """
+        Parameters
+        ----------
+        start : str
+            First day with summaries in YYYY-MM-DD format.
+
+        end : str
+            Last day with summaries in YYYY-MM-DD format.
+
+        seed : int
+            Seed of the random number generator, the same seed results in the same summaries.
+
+        gap_ratio : float
+            Share of the days without ring summaries, e.g. when the ring was not worn.
+
+        kwargs
+            Further arguments of the SyntheticDataGenerator.
+        """
+
+        self.__start = start
+        self.__end = end
+        self.__generator = SyntheticDataGenerator(seed, gap_ratio=gap_ratio, **kwargs)
+        self.__data = dict()
+
+
+    def preload(self, **kwargs):
+        """ Generating all summaries. """
+
+        self.__data = {summary_type: dict() for summary_type in self.supported_summary_types}
+        for ordinals, measurements, available in self.__generator.generate(self.__start, self.__end):
+            for summary_type in self.supported_summary_types:
+                for summary in get_summaries_of_chunk(ordinals, measurements, available, summary_type):
+                    self.__data[summary_type][summary[SUMMARY_DATE]] = summary
+
+
+    def get_summary_data(self, summary_type: SummaryType, date: str) -> Tuple[bool, dict]:
+        if summary_type not in self.supported_summary_types:
+            raise ValueError("Summary Type not supported")
+
+        summaries_of_type = self.__data.get(summary_type, dict())
+        if date in summaries_of_type.keys():
+            return True, dict(summaries_of_type[date])
+        return False, dict()
+
+
+    def get_earliest_and_latest_vailable_summary_date(self) -> Tuple[Union[str, None], Union[str, None]]:
+        return self.__start, self.__end
+
+
+def write_api_json(generator: SyntheticDataGenerator, start: str, end: str, directory: str) -> List[str]:
+    """
+    Writing the summaries like the responses of the oura v1 api, one file per summary type,
+    e.g. sleep.json containing {"sleep": [...]} and bedtime.json containing {"ideal_bedtimes": [...]}.
+    The files are written chunk by chunk, so the memory does not grow with the number of days.
+
+    Returns
+    --------
+    List[str]
+        path names of the written files
+    """
+
+    path_names = [os.path.join(directory, "{}.json".format(summary_type.name)) for summary_type in ring_summary_types]
+    files = [open(path_name, 'w') for path_name in path_names]
+    try:
+        for summary_type, f in zip(ring_summary_types, files):
+            key = "ideal_bedtimes" if summary_type == SummaryType.bedtime else summary_type.name
+            f.write('{{"{}": [\n'.format(key))
+
+        # whether nothing is written to the file yet, which decides about the separator
+        empty = [True] * len(files)
+        for ordinals, measurements, available in generator.generate(start, end):
+            for index, summary_type in enumerate(ring_summary_types):
+                summaries = get_summaries_of_chunk(ordinals, measurements, available, summary_type)
+                if summary_type == SummaryType.bedtime:
+                    summaries = [to_ideal_bedtime(summary) for summary in summaries]
+                if len(summaries) == 0:
+                    continue
+                separator = "" if empty[index] else ",\n"
+                files[index].write(separator + ",\n".join(json.dumps(summary) for summary in summaries))
+                empty[index] = False
+
+        for f in files:
+            f.write('\n]}\n')
+    finally:
+        for f in files:
+            f.close()
+
+    return path_names
+
+
+def to_ideal_bedtime(summary: dict) -> dict:
+    """ Bedtime summary in the format of the ideal_bedtimes of the oura v1 api, which make_uniform of the OuraApiConnector reverts. """
+    return {
+        'date': summary[SUMMARY_DATE],
+        'bedtime_window': {'start': summary['bedtime_window_start'], 'end': summary['bedtime_window_end']},
+        'status': "IDEAL_BEDTIME_AVAILABLE",
+    }
+
+
+def write_storage_csv(generator: SyntheticDataGenerator, start: str, end: str, path_name: str):
+    """
+    Writing the summaries like the semicolon separated csv file of the CsvStorage,
+    one row per day with at least one summary, missing summaries as empty fields.
+    The file is written chunk by chunk, so the memory does not grow with the number of days.
+    Paths ending with .gz are gzip compressed.
+    """
+
+    columns = [(summary_type, name) for summary_type in csv_summary_types for name in generator.get_measurement_names(summary_type)]
+
+    open_file = gzip.open if path_name.endswith('.gz') else open
+    with open_file(path_name, 'wt', newline='') as f:
+        writer = csv.writer(f, delimiter=';')
+        writer.writerow([SUMMARY_DATE] + ["{}_{}".format(summary_type.name, name) for summary_type, name in columns])
+
+        for ordinals, measurements, available in generator.generate(start, end):
+            dates = ordinals_to_date_strings(ordinals)
+            lists = {summary_type: get_measurement_lists(measurements, summary_type) for summary_type in csv_summary_types}
+            available_lists = {summary_type: available[summary_type].tolist() for summary_type in csv_summary_types}
+
+            for index, date in enumerate(dates):
+                if not any(available_lists[summary_type][index] for summary_type in csv_summary_types):
+                    continue
+                row = [date]
+                for summary_type, name in columns:
+                    row.append(lists[summary_type][name][index] if available_lists[summary_type][index] else "")
+                writer.writerow(row)
+
+
+def write_subjective_inputs(generator: SyntheticDataGenerator, start: str, end: str, path_name: str):
+    """
+    Writing the subjective inputs as json lines, one dictionary per day like they are given to
+    add_subjective_input of the GuiInputConnector, with bools, numbers and percentages from 0 to 100
+    according to the SubjectiveMeasurementType of each input.
+    """
+
+    with open(path_name, 'w') as f:
+        for ordinals, measurements, available in generator.generate(start, end):
+            for summary in get_summaries_of_chunk(ordinals, measurements, available, SummaryType.subjective):
+                f.write(json.dumps(summary) + "\n")
+
+
+# output format: function writing it and the name of the output of one user
+output_formats = {
+    'api': (write_api_json, "user_{}"),
+    'csv': (write_storage_csv, "user_{}.csv"),
+    'csv_gz': (write_storage_csv, "user_{}.csv.gz"),
+    'subjective': (write_subjective_inputs, "user_{}_subjective.jsonl"),
+}
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmark.synthetic_data", description="Generating synthetic oura and subjective data sets.")
+    parser.add_argument("output", help="directory of the generated files")
+    parser.add_argument("--format", choices=list(output_formats.keys()), default='csv', help="api json responses, csv storage file, gzip compressed csv storage file or subjective inputs")
+    parser.add_argument("--years", type=float, default=5, help="years of history until --end")
+    parser.add_argument("--end", default=None, help="last day in YYYY-MM-DD format, today by default")
+    parser.add_argument("--users", type=int, default=1, help="number of users, each one gets own files")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--gap-ratio", type=float, default=0.03, help="share of days without ring summaries")
+    parser.add_argument("--mean-gap-length", type=float, default=3.0, help="average number of days of a gap")
+    parser.add_argument("--subjective-gap-ratio", type=float, default=0.1, help="share of days without subjective inputs")
+    args = parser.parse_args(arguments)
+
+    end = args.end if args.end else date_string_n_days_ago(0)
+    start = ordinals_to_date_strings([date_string_to_ordinal(end) - int(round(args.years * 365.25)) + 1])[0]
+    write, output_name_template = output_formats[args.format]
+
+    os.makedirs(args.output, exist_ok=True)
+    for user in range(args.users):
+        generator = SyntheticDataGenerator(args.seed, user, args.gap_ratio, args.mean_gap_length, args.subjective_gap_ratio)
+        output = os.path.join(args.output, output_name_template.format(user))
+        if args.format == 'api':
+            os.makedirs(output, exist_ok=True)
+        write(generator, start, end, output)
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+import os
+import sys
+import argparse
+import configparser
+from typing import List, Tuple, Union
+
+from summary.summary_container import SummaryContainer
+from connector.oura_api_connector import OuraApiConnector
+from connector.csv_storage_connector import CsvStorageConnector
+from storage.csv_storage import CsvStorage
+from storage.array_storage import ArrayStorage
+from common.constants import AnalysisType
+from common.date_helper import date_string_n_days_ago, date_string_to_ordinal
+from analyser.analysis_type_configurations import OutputFormat, HtmlBundle
+from common import instrumentation
+
+
+# Headless entry point for syncing, saving and creating analyses without the GUI,
+# e.g. in cron jobs and containers without a display. It must never import wx.
+#
+# Examples
+# --------
+# python -m cli
+# python -m cli --no-sync --analyses scores_weekly bedtimes_monthly --range 2021-03-01:2021-12-31
+# python -m cli --analyses all --last-days 90 --output-format png_and_html --workers 4
+
+# starting date of the container, if none is configured, the same as in main.py
+default_starting_date = "2021-03-01"
+
+
+def parse_date_range(date_range: str) -> Tuple[str, str]:
+    """ Date range in START:END format with both dates in YYYY-MM-DD format. """
+
+    try:
+        start, end = date_range.split(":")
+        if date_string_to_ordinal(start) > date_string_to_ordinal(end):
+            raise ValueError()
+    except ValueError:
+        raise argparse.ArgumentTypeError("invalid date range {}, expected START:END with dates in YYYY-MM-DD format".format(date_range))
+    return start, end
+
+
+def parse_analysis_types(names: List[str]) -> List[AnalysisType]:
+    if 'all' in names:
+        return list(AnalysisType)
+
+    analysis_types = []
+    for name in names:
+        if name not in AnalysisType.__members__.keys():
+            raise ValueError("Unknown analysis type {}".format(name))
+        analysis_types.append(AnalysisType[name])
+    return analysis_types
+
+
+def get_arrays_path(arrays: Union[str, None], config: configparser.ConfigParser) -> Union[List[str], None]:
+    """
+    Path of the directory of the memory mapped measurement arrays,
+    from the command line or the arrays key of the storage.filename section of the config. None if neither is given.
+    """
+
+    if arrays:
+        return [arrays]
+    if config.has_section('storage.filename') and config['storage.filename'].get('arrays'):
+        return ["quantified_self_dashboard", "data", config['storage.filename'].get('arrays')]
+    return None
+
+
+def create_argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m cli", description="Syncing, saving and analysing without the GUI.")
+    parser.add_argument("--config", default="config.ini", help="path of the config file")
+    parser.add_argument("--storage", help="path of the csv storage file, by default from the config")
+    parser.add_argument("--arrays", metavar="DIRECTORY", help="directory of memory mapped measurement arrays the analyses read from, by default from the config")
+    parser.add_argument("--output", default="output", help="directory of the analysis outputs")
+    parser.add_argument("--starting-date", help="first day of the data in YYYY-MM-DD format")
+    parser.add_argument("--no-sync", action="store_true", help="only using the storage file, without requesting the oura api")
+    parser.add_argument("--no-save", action="store_true", help="not saving the synced data into the storage file")
+    parser.add_argument("--analyses", nargs="+", default=[], metavar="ANALYSIS_TYPE", help="names of the analysis types to create, or all")
+    parser.add_argument("--range", dest="ranges", action="append", type=parse_date_range, metavar="START:END", help="date range of the analyses, can be given multiple times")
+    parser.add_argument("--last-days", type=int, help="date range of the analyses from this many days ago until today")
+    parser.add_argument("--output-format", choices=list(OutputFormat.__members__.keys()), default=None, help="format of the analysis outputs")
+    parser.add_argument("--html-bundle", choices=list(HtmlBundle.__members__.keys()), default=None, help="how html outputs include plotly.js")
+    parser.add_argument("--workers", type=int, default=None, help="number of image exporter processes, 0 for exporting in this process, by default the number of cores")
+    parser.add_argument("--render-cache", action="store_true", help="linking unchanged images from the render cache instead of rendering them again")
+    parser.add_argument("--instrumentation", metavar="REPORT", help="writing an instrumentation report to this path, as json if it ends with .json")
+    parser.add_argument("--quiet", action="store_true", help="not printing the written output paths")
+    return parser
+
+
+def main(arguments: List[str] = None) -> int:
+    """
+    Running the sync, the save and the analyses given by the command line arguments.
+
+    Returns
+    -------
+    int
+        exit code, 1 if an analysis failed
+    """
+
+    parser = create_argument_parser()
+    args = parser.parse_args(arguments)
+
+    try:
+        analysis_types = parse_analysis_types(args.analyses)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.workers is not None and args.workers < 0:
+        parser.error("--workers must not be negative")
+    if args.last_days is not None and args.last_days < 1:
+        parser.error("--last-days must be at least 1")
+
+    config = configparser.ConfigParser()
+    config.read(args.config)
+
+    if args.instrumentation:
+        instrumentation.enable(args.instrumentation)
+    elif config.has_section('instrumentation') and config['instrumentation'].getboolean('enabled', fallback=False):
+        instrumentation.enable(config['instrumentation'].get('report', fallback="instrumentation_report.txt"))
+
+    if args.storage:
+        storage_file_path = [args.storage]
+    else:
+        storage_file_name = config['storage.filename'].get('filename') if config.has_section('storage.filename') else "data.csv"
+        storage_file_path = ["quantified_self_dashboard", "data", storage_file_name]
+    storage_chunksize = config['storage.filename'].getint('chunksize', fallback=None) if config.has_section('storage.filename') else None
+
+    starting_date = args.starting_date if args.starting_date else default_starting_date
+    today = date_string_n_days_ago(0)
+
+    # data ----------------------------------------------------------------
+    container = SummaryContainer(starting_date, containing_sleep=True, containing_readiness=True, containing_activity=True, containing_bedtime=True, containing_subjective=True)
+
+    conn_storage = CsvStorageConnector(storage_file_path, storage_chunksize)
+    if os.path.exists(conn_storage._filename):
+        container.add_storage_connector(conn_storage)
+    elif args.no_sync:
+        print("No storage file {}".format(conn_storage._filename), file=sys.stderr)
+        return 1
+    # otherwise it is the first sync, the storage file gets created when saving
+
+    if not args.no_sync:
+        if not config.has_section('oura.auth') or not config['oura.auth'].get('access-token'):
+            parser.error("no access-token in the oura.auth section of {}, use --no-sync to only use the storage file".format(args.config))
+        container.add_api_connector(OuraApiConnector(config['oura.auth'].get('access-token')))
+
+    # the load writes the loaded days into the arrays
+    arrays_path = get_arrays_path(args.arrays, config)
+    if arrays_path is not None:
+        container.set_measurement_arrays(ArrayStorage(arrays_path))
+
+    container.preload()
+    container.load()
+
+    if not args.no_sync and not args.no_save:
+        with instrumentation.span("save"):
+            CsvStorage(storage_file_path).save(container)
+
+    if len(analysis_types) == 0:
+        return 0
+
+    # analyses ------------------------------------------------------------
+    if args.ranges:
+        date_ranges = args.ranges
+    elif args.last_days is not None:
+        date_ranges = [(date_string_n_days_ago(args.last_days - 1), today)]
+    else:
+        date_ranges = [(starting_date, today)]
+
+    analyse_kwargs = dict()
+    if args.output_format:
+        analyse_kwargs['output_format'] = OutputFormat[args.output_format]
+    if args.html_bundle:
+        analyse_kwargs['html_bundle'] = HtmlBundle[args.html_bundle]
+
+    return run_analyses(container, [args.output], analysis_types, date_ranges, analyse_kwargs, args.workers, args.render_cache, args.quiet)
+
+
+def run_analyses(container: SummaryContainer, output_path: List[str], analysis_types: List[AnalysisType], date_ranges: List[Tuple[str, str]],
+                 analyse_kwargs: dict, workers: int, use_render_cache: bool, quiet: bool) -> int:
+    """
+    Creating all analyses for all date ranges, the images are exported by a pool of exporter processes.
+
+    Returns
+    -------
+    int
+        exit code, 1 if an analysis failed
+    """
+
+    # the analyser only gets imported when analyses are requested
+    from analyser.plotly_analyser import PlotlyAnalyser
+    from analyser.image_export import ImageExportPool
+    from analyser.render_cache import RenderCache
+
+    os.makedirs(os.path.join(os.getcwd(), *output_path), exist_ok=True)
+    export_pool = ImageExportPool(workers) if workers != 0 else None
+    render_cache = RenderCache(output_path + [".render_cache"]) if use_render_cache else None
+    analyser = PlotlyAnalyser(output_path, container, export_pool, render_cache)
+
+    # creating all figures first, so the exporter processes work in parallel
+    futures = []
+    failed = False
+    for start, end in date_ranges:
+        for analysis_type in analysis_types:
+            try:
+                futures.extend([(analysis_type, future) for future in analyser.analyse(start, end, analysis_type, **analyse_kwargs)])
+            except (AttributeError, ValueError) as e:
+                print("{} from {} until {} failed: {}".format(analysis_type.name, start, end, e), file=sys.stderr)
+                failed = True
+
+    for analysis_type, future in futures:
+        try:
+            path_name = future.result()
+            if not quiet:
+                print(path_name)
+        except Exception as e:
+            print("{} failed: {}".format(analysis_type.name, e), file=sys.stderr)
+            failed = True
+
+    if export_pool is not None:
+        export_pool.shutdown()
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
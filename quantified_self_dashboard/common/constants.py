@@ -92,6 +92,23 @@ AnalysisType = Enum(
         ("sleep_score_distribution", 17),
         ("readiness_score_distribution", 18),
         ("activity_score_distribution", 19),
+        ("scores_rolling", 20),
+        ("recovery_indicators_rolling", 21),
+        ("correlation_matrix", 22),
+        ("scores_yearly", 23),
+        ("sleep_durations_yearly", 24),
+        ("bedtimes_yearly", 25),
+        ("recovery_indicators_yearly", 26),
+        ("sleep_score_weekly_by_year", 27),
+        ("readiness_score_weekly_by_year", 28),
+        ("rmssd_weekly_by_year", 29),
+        ("bedtime_windows_weekly", 30),
+        ("bedtime_windows_monthly", 31),
+        ("bedtime_windows_weekdays", 32),
+        ("sleep_score_distribution_by_year", 33),
+        ("readiness_score_distribution_by_year", 34),
+        ("activity_score_distribution_by_year", 35),
+        ("scores_cumulative_distribution", 36),
     ]
 )
 
@@ -115,6 +132,23 @@ all_analysis_types = [
     AnalysisType.sleep_score_distribution,
     AnalysisType.readiness_score_distribution,
     AnalysisType.activity_score_distribution,
+    AnalysisType.scores_rolling,
+    AnalysisType.recovery_indicators_rolling,
+    AnalysisType.correlation_matrix,
+    AnalysisType.scores_yearly,
+    AnalysisType.sleep_durations_yearly,
+    AnalysisType.bedtimes_yearly,
+    AnalysisType.recovery_indicators_yearly,
+    AnalysisType.sleep_score_weekly_by_year,
+    AnalysisType.readiness_score_weekly_by_year,
+    AnalysisType.rmssd_weekly_by_year,
+    AnalysisType.bedtime_windows_weekly,
+    AnalysisType.bedtime_windows_monthly,
+    AnalysisType.bedtime_windows_weekdays,
+    AnalysisType.sleep_score_distribution_by_year,
+    AnalysisType.readiness_score_distribution_by_year,
+    AnalysisType.activity_score_distribution_by_year,
+    AnalysisType.scores_cumulative_distribution,
 ]
 
 
@@ -129,3 +163,17 @@ SubjectiveMeasurementType = Enum(
     ]
 )
 
+
+
+# AnalysisJobStates ------------------------------
+
+AnalysisJobState = Enum(
+    value = 'AnalysisJobState',
+    names = [
+        ('queued', 0),
+        ('running', 1),
+        ('finished', 2),
+        ('failed', 3),
+        ('cancelled', 4),
+    ]
+)
@@ -1,8 +1,17 @@
 from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import List
 
+import numpy as np
 
 
-# TODO: improve all date handling, exchange with pandas functionality
+
+# Internally dates are day ordinals, the number of days since 0001-01-01 as in datetime.toordinal.
+# Date strings in YYYY-MM-DD format are only used at the boundaries, e.g. files, the API and the GUI.
+# The string helpers below convert to ordinals instead of parsing with strptime on every call.
+
+# ordinal of 1970-01-01, the epoch of np.datetime64 values
+epoch_ordinal = datetime(1970, 1, 1).toordinal()
 
 
 def datetime_to_simple_iso(datetime_obj: datetime):
@@ -47,50 +56,65 @@ def date_string_n_days_ago(n_days):
     return datetime_to_simple_iso( date_n_days_ago(n_days) )
 
 
-def all_date_strings_between_dates(start, end):
-    # start and end days are inclusive
-    
-    d1 = simple_string_to_datetime(start)
-    d2 = simple_string_to_datetime(end)
-    diff = d2 - d1
+@lru_cache(maxsize=2**16)
+def date_string_to_ordinal(date: str) -> int:
+    # YYYY-MM-DD to day ordinal, without strptime
+    return datetime(int(date[0:4]), int(date[5:7]), int(date[8:10])).toordinal()
 
-    date_strings = []
-    for i in range(diff.days+1):
-        datetime_in_between = d1 + timedelta(days=i)
-        datetime_str = datetime_to_simple_iso(datetime_in_between)
-        date_strings.append(datetime_str)
 
-    return date_strings
+@lru_cache(maxsize=2**16)
+def ordinal_to_date_string(ordinal: int) -> str:
+    # day ordinal to YYYY-MM-DD
+    return datetime.fromordinal(ordinal).date().isoformat()
 
 
-def is_date_within_range(date, start, end):
-    wanted = simple_string_to_datetime(date)
+def date_strings_to_ordinals(dates: List[str]) -> np.array:
+    # YYYY-MM-DD strings to an array of day ordinals, all at once
+    return np.asarray(dates, dtype='datetime64[D]').astype(np.int64) + epoch_ordinal
+
+
+def ordinals_to_date_strings(ordinals: np.array) -> List[str]:
+    # array of day ordinals to YYYY-MM-DD strings, all at once
+    return (np.asarray(ordinals, dtype=np.int64) - epoch_ordinal).astype('datetime64[D]').astype(str).tolist()
+
+
+def ordinals_between_dates(start: str, end: str) -> np.array:
+    # start and end days are inclusive
+    return np.arange(date_string_to_ordinal(start), date_string_to_ordinal(end) + 1)
+
+
+def all_date_strings_between_dates(start, end):
+    # start and end days are inclusive
+    return ordinals_to_date_strings(ordinals_between_dates(start, end))
 
-    start_time = simple_string_to_datetime(start)
-    end_time = simple_string_to_datetime(end)
 
-    return start_time <= wanted <= end_time
+def is_date_within_range(date, start, end):
+    return date_string_to_ordinal(start) <= date_string_to_ordinal(date) <= date_string_to_ordinal(end)
 
 
 def is_date_before_another_date(date, another_date):
-    d1 = simple_string_to_datetime(date)
-    d2 = simple_string_to_datetime(another_date)
+    return date_string_to_ordinal(date) < date_string_to_ordinal(another_date)
 
-    return d1 < d2
 
 def get_day_before(date):
-    d1 = simple_string_to_datetime(date)
-    d2 = d1 - timedelta(days=1)
-    return datetime_to_simple_iso(d2)
+    return ordinal_to_date_string(date_string_to_ordinal(date) - 1)
+
+
+def get_day_after(date):
+    return ordinal_to_date_string(date_string_to_ordinal(date) + 1)
+
+
+def get_n_days_before(date, n_days):
+    return ordinal_to_date_string(date_string_to_ordinal(date) - n_days)
+
+
+def get_n_days_after(date, n_days):
+    return ordinal_to_date_string(date_string_to_ordinal(date) + n_days)
 
 
 def get_one_week_before(date):
-    d1 = simple_string_to_datetime(date)
-    week_prior = d1 - timedelta(weeks=1)
-    return datetime_to_simple_iso(week_prior)
+    return ordinal_to_date_string(date_string_to_ordinal(date) - 7)
+
 
 def get_one_week_after(date):
-    d1 = simple_string_to_datetime(date)
-    week_prior = d1 + timedelta(weeks=1)
-    return datetime_to_simple_iso(week_prior)
-    
\ No newline at end of file
+    return ordinal_to_date_string(date_string_to_ordinal(date) + 7)
@@ -0,0 +1,201 @@
+import sys
+import json
+import time
+import atexit
+import threading
+from typing import List
+
+try:
+    # not available on windows
+    import resource
+except ImportError:
+    resource = None
+
+
+# Lightweight instrumentation of the pipeline stages: nested timed spans,
+# counters and memory high-water marks.
+# Everything is disabled by default, then span() returns one shared object
+# which does nothing and count() returns immediately.
+#
+# Example
+# -------
+# with span("preload"):
+#     with span("csv"):
+#         ...
+#     count("http_requests")
+
+_enabled = False
+_lock = threading.Lock()
+_local = threading.local()
+
+# "parent/child" span path: [number of calls, total seconds, max seconds, max rss in bytes]
+_spans = dict()
+_counters = dict()
+_started_at = None
+
+
+class _NoOpSpan:
+    """ Span used while the instrumentation is disabled. """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+_no_op_span = _NoOpSpan()
+
+
+class _Span:
+    """ Span measuring the time between entering and leaving it, nested into the currently open span of the thread. """
+
+    def __init__(self, name: str):
+        self.__name = name
+
+    def __enter__(self):
+        stack = _get_span_stack()
+        stack.append(self.__name)
+        self.__path = "/".join(stack)
+        self.__start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        duration = time.perf_counter() - self.__start
+        _get_span_stack().pop()
+        rss = get_max_rss_bytes()
+
+        with _lock:
+            if self.__path not in _spans.keys():
+                _spans[self.__path] = [0, 0.0, 0.0, None]
+            record = _spans[self.__path]
+            record[0] += 1
+            record[1] += duration
+            record[2] = max(record[2], duration)
+            if rss is not None:
+                record[3] = rss if record[3] is None else max(record[3], rss)
+        return False
+
+
+def _get_span_stack() -> List[str]:
+    """ Names of the open spans of the current thread. """
+    if not hasattr(_local, 'stack'):
+        _local.stack = []
+    return _local.stack
+
+
+def enable(report_path_name: str = None):
+    """
+    Enabling the instrumentation from now on.
+    If a report path name is given, the report is written there when the program exits,
+    as JSON if it ends with .json and as text otherwise.
+    """
+
+    global _enabled, _started_at
+    _enabled = True
+    _started_at = time.perf_counter()
+
+    if report_path_name:
+        atexit.register(write_report, report_path_name)
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset():
+    """ Removing all recorded spans and counters. """
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+
+
+def span(name: str):
+    """ Context manager timing the enclosed code as a span with the given name, nested into the open span. """
+    if not _enabled:
+        return _no_op_span
+    return _Span(name)
+
+
+def count(name: str, value: int = 1):
+    """ Adding the value to the counter with the given name, e.g. number of days loaded or bytes received. """
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def get_max_rss_bytes():
+    """ High-water mark of the resident memory of this process in bytes, None if not available. """
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on linux, bytes on macOS
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+
+def get_report() -> dict:
+    """
+    Returning all recorded spans and counters as a dictionary.
+    The spans are ordered by their path, so children directly follow their parent.
+    """
+
+    with _lock:
+        spans = [
+            {
+                'path': path,
+                'calls': record[0],
+                'total_seconds': record[1],
+                'max_seconds': record[2],
+                'max_rss_bytes': record[3],
+            }
+            for path, record in sorted(_spans.items(), key=lambda item: item[0].split("/"))
+        ]
+        counters = dict(sorted(_counters.items()))
+
+    wall_seconds = time.perf_counter() - _started_at if _started_at is not None else None
+    return {'wall_seconds': wall_seconds, 'max_rss_bytes': get_max_rss_bytes(), 'spans': spans, 'counters': counters}
+
+
+def format_report_as_text(report: dict) -> str:
+    """ Formatting the report as an indented table of the spans followed by the counters. """
+
+    lines = []
+    if report['wall_seconds'] is not None:
+        lines.append("wall time: {:.3f} s".format(report['wall_seconds']))
+    if report['max_rss_bytes'] is not None:
+        lines.append("max rss: {:.1f} MB".format(report['max_rss_bytes'] / 2**20))
+
+    lines.append("")
+    lines.append("{:<50} {:>7} {:>11} {:>11} {:>12}".format("span", "calls", "total [s]", "max [s]", "max rss [MB]"))
+    for span_report in report['spans']:
+        depth = span_report['path'].count("/")
+        name = "  " * depth + span_report['path'].split("/")[-1]
+        rss = "" if span_report['max_rss_bytes'] is None else "{:.1f}".format(span_report['max_rss_bytes'] / 2**20)
+        lines.append("{:<50} {:>7} {:>11.4f} {:>11.4f} {:>12}".format(name, span_report['calls'], span_report['total_seconds'], span_report['max_seconds'], rss))
+
+    if len(report['counters']) > 0:
+        lines.append("")
+        lines.append("{:<50} {:>12}".format("counter", "value"))
+        for name, value in report['counters'].items():
+            lines.append("{:<50} {:>12}".format(name, value))
+
+    return "\n".join(lines) + "\n"
+
+
+def write_report(path_name: str):
+    """ Writing the report as JSON if the path name ends with .json and as text otherwise. """
+
+    report = get_report()
+    if path_name.endswith('.json'):
+        content = json.dumps(report, indent=4)
+    else:
+        content = format_report_as_text(report)
+
+    with open(path_name, 'w') as f:
+        f.write(content)
@@ -0,0 +1,27 @@
+import importlib
+
+
+class LazyModule:
+    """
+    Placeholder for a module, which is only imported at the first access of one of its attributes.
+    Used for heavy libraries like pandas and plotly, so code paths
+    which never need them, do not pay for importing them.
+
+    Example
+    -------
+    go = LazyModule('plotly.graph_objects')
+    fig = go.Figure()  # plotly.graph_objects is imported here
+    """
+
+    def __init__(self, module_name: str):
+        self.__module_name = module_name
+        self.__module = None
+
+    def __getattr__(self, name: str):
+        if self.__module is None:
+            self.__module = importlib.import_module(self.__module_name)
+        return getattr(self.__module, name)
+
+    def __repr__(self):
+        state = "imported" if self.__module is not None else "not imported yet"
+        return "<LazyModule '{}', {}>".format(self.__module_name, state)
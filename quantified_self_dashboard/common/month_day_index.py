@@ -0,0 +1,118 @@
+import bisect
+import datetime
+import threading
+from typing import Iterable, List, Tuple, Union
+
+
+class MonthDayIndex:
+    """
+    Set of days, stored as one bitset per year and month with bit d - 1 set for day d of the month.
+    Querying the days of a month only touches that month, independent of how many days are indexed,
+    e.g. for highlighting the days of the month shown by a calendar.
+    """
+
+    def __init__(self, ordinals: Iterable[int] = ()):
+        """
+        Parameters
+        ----------
+        ordinals : Iterable[int]
+            Day ordinals which are initially contained.
+        """
+
+        # (year, month): bitset of the days
+        self.__bitsets = dict()
+        # sorted (year, month) keys of the bitsets, for searching the following months
+        self.__keys = []
+        self.__n_days = 0
+        self.__lock = threading.Lock()
+        self.add_ordinals(ordinals)
+
+
+    @classmethod
+    def __get_key_and_bit(cls, ordinal: int) -> Tuple[Tuple[int, int], int]:
+        date = datetime.date.fromordinal(int(ordinal))
+        return (date.year, date.month), 1 << (date.day - 1)
+
+
+    def add_ordinals(self, ordinals: Iterable[int]):
+        with self.__lock:
+            for ordinal in ordinals:
+                key, bit = self.__get_key_and_bit(ordinal)
+                bitset = self.__bitsets.get(key, 0)
+                if bitset & bit:
+                    continue
+                if bitset == 0:
+                    bisect.insort(self.__keys, key)
+                self.__bitsets[key] = bitset | bit
+                self.__n_days += 1
+
+
+    def remove_ordinals(self, ordinals: Iterable[int]):
+        with self.__lock:
+            for ordinal in ordinals:
+                key, bit = self.__get_key_and_bit(ordinal)
+                bitset = self.__bitsets.get(key, 0)
+                if not bitset & bit:
+                    continue
+                bitset &= ~bit
+                if bitset == 0:
+                    del self.__bitsets[key]
+                    del self.__keys[bisect.bisect_left(self.__keys, key)]
+                else:
+                    self.__bitsets[key] = bitset
+                self.__n_days -= 1
+
+
+    def contains_ordinal(self, ordinal: int) -> bool:
+        key, bit = self.__get_key_and_bit(ordinal)
+        return self.__bitsets.get(key, 0) & bit != 0
+
+
+    def get_bitset(self, year: int, month: int) -> int:
+        """ Bitset of the contained days of the month, bit d - 1 is set for day d. """
+        return self.__bitsets.get((year, month), 0)
+
+
+    def get_days(self, year: int, month: int) -> List[int]:
+        """ Returns the sorted contained days of the month, e.g. [1, 2, 17]. """
+        bitset = self.get_bitset(year, month)
+        return [day for day in range(1, 32) if bitset & (1 << (day - 1))]
+
+
+    def count_days(self, year: int, month: int) -> int:
+        return bin(self.get_bitset(year, month)).count("1")
+
+
+    def count_all_days(self) -> int:
+        return self.__n_days
+
+
+    def get_next_ordinal(self, ordinal: int) -> Union[int, None]:
+        """ Returns the first contained day ordinal at or after the given one, None if there is none. """
+
+        date = datetime.date.fromordinal(int(ordinal))
+        with self.__lock:
+            position = bisect.bisect_left(self.__keys, (date.year, date.month))
+            # ignoring the days of the first month before the given day
+            skipped_bits = (1 << (date.day - 1)) - 1
+            for year, month in self.__keys[position:]:
+                bitset = self.__bitsets[(year, month)]
+                if (year, month) == (date.year, date.month):
+                    bitset &= ~skipped_bits
+                if bitset != 0:
+                    # lowest set bit
+                    day = (bitset & -bitset).bit_length()
+                    return datetime.date(year, month, day).toordinal()
+        return None
+
+
+    def get_ordinals(self) -> List[int]:
+        """ Returns all contained day ordinals in ascending order. """
+
+        with self.__lock:
+            keys = list(self.__keys)
+        ordinals = []
+        for year, month in keys:
+            first_ordinal = datetime.date(year, month, 1).toordinal()
+            ordinals.extend(first_ordinal + day - 1 for day in self.get_days(year, month))
+        return ordinals
@@ -0,0 +1,88 @@
+import threading
+from contextlib import contextmanager
+
+
+class ReadWriteLock:
+    """
+    Lock which is held by any number of reading threads or by one writing thread.
+    Both sides are reentrant, and the writing thread may also read, e.g. a load reading the container it writes.
+    Waiting writers hold off new readers, so a stream of reads does not keep a writer waiting forever.
+    """
+
+    def __init__(self):
+        self.__condition = threading.Condition(threading.Lock())
+        self.__n_readers = 0
+        self.__n_waiting_writers = 0
+
+        # ident of the writing thread and its number of nested writes
+        self.__writer = None
+        self.__n_writes = 0
+
+        # number of nested reads of each thread, and whether its outermost read counts as a reader
+        self.__local = threading.local()
+
+
+    def acquire_read(self):
+        depth = getattr(self.__local, 'depth', 0)
+        if depth == 0:
+            self.__local.counted = self.__writer != threading.get_ident()
+            if self.__local.counted:
+                with self.__condition:
+                    while self.__writer is not None or self.__n_waiting_writers > 0:
+                        self.__condition.wait()
+                    self.__n_readers += 1
+        self.__local.depth = depth + 1
+
+
+    def release_read(self):
+        self.__local.depth -= 1
+        if self.__local.depth == 0 and self.__local.counted:
+            with self.__condition:
+                self.__n_readers -= 1
+                if self.__n_readers == 0:
+                    self.__condition.notify_all()
+
+
+    def acquire_write(self):
+        ident = threading.get_ident()
+        with self.__condition:
+            if self.__writer == ident:
+                self.__n_writes += 1
+                return
+            if getattr(self.__local, 'depth', 0) > 0:
+                raise RuntimeError("A reading thread can not start writing")
+
+            self.__n_waiting_writers += 1
+            try:
+                while self.__writer is not None or self.__n_readers > 0:
+                    self.__condition.wait()
+            finally:
+                self.__n_waiting_writers -= 1
+            self.__writer = ident
+            self.__n_writes = 1
+
+
+    def release_write(self):
+        with self.__condition:
+            self.__n_writes -= 1
+            if self.__n_writes == 0:
+                self.__writer = None
+                self.__condition.notify_all()
+
+
+    @contextmanager
+    def reading(self):
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+
+    @contextmanager
+    def writing(self):
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
@@ -1,11 +1,17 @@
-import re
 import os
 from typing import Tuple, List, Union
 
-import pandas as pd
+import numpy as np
 
 from common.constants import SummaryType, SUMMARY_DATE
+from common.date_helper import date_string_to_ordinal, date_strings_to_ordinals
+from common.lazy_import import LazyModule
+from common import instrumentation
 from connector.abstract_connector import AbstractConnector
+from storage.storage_schema import read_storage_csv_chunks, get_storage_csv_compression, storage_csv_compressions
+
+# only imported when the csv file gets read
+pd = LazyModule('pandas')
 
 
 class CsvStorageConnector(AbstractConnector):
@@ -17,7 +23,7 @@ class CsvStorageConnector(AbstractConnector):
     # delimiter of the csv file
     __delimiter = ';'
 
-    def __init__(self, file_path: List[str]):
+    def __init__(self, file_path: List[str], chunksize: int = None):
         """
         Preparing the csv file content for loading.
 
@@ -25,21 +31,111 @@ class CsvStorageConnector(AbstractConnector):
         ----------
         file_path : List[str]
             The file path to where the csv file with the data can be found.
+            Files ending with .csv.gz or .csv.zst are compressed.
+
+        chunksize : int
+            If given, the file is read in chunks of this many rows,
+            so the memory peak of the preload does not grow with the parser buffers of the whole file.
         """
 
         self._filename = os.path.join(os.getcwd(), *file_path)
-        if not self._filename.endswith('.csv'):
-            raise ValueError("Filename for CsvStorageConnector must end with .csv")
+        try:
+            get_storage_csv_compression(self._filename)
+        except ValueError:
+            raise ValueError("Filename for CsvStorageConnector must end with {}".format(", ".join(storage_csv_compressions.keys())))
+
+        if chunksize is not None and chunksize < 1:
+            raise ValueError("chunksize must be at least 1")
+        self.__chunksize = chunksize
+
+
+    def preload(self, start: str = None, **kwargs):
+        """
+        Reading the csv file and indexing its rows by day ordinal.
+        The columns are read with the dtypes of the storage schema instead of inferring them.
+        Only the value arrays of the columns are kept, the DataFrames of the chunks are released after indexing.
+
+        Parameters
+        ----------
+        start : str
+            If given, only the rows from this day on in YYYY-MM-DD format are kept,
+            e.g. the days after the measurement arrays of the container.
+        """
+
+        self.__rows_by_ordinal = dict()
+        self.__dates = []
+        self.__start = start
 
+        # column name: value arrays of the chunks
+        column_chunks = dict()
 
-    def preload(self, **kwargs):
-        """ Loading the csv file into a pandas DataFrame. """
         try:
-            self.__data = pd.read_csv(self._filename, sep=self.__delimiter)
+            with instrumentation.span("read_csv"):
+                for chunk in read_storage_csv_chunks(self._filename, self.__delimiter, self.__chunksize):
+                    self.__index_rows(chunk, column_chunks)
+            instrumentation.count("csv_bytes", os.path.getsize(self._filename))
         except IOError:
             raise ValueError("Could not open file. Please close it first.")
         except pd.errors.EmptyDataError:
-            self.__data = pd.DataFrame()
+            column_chunks = dict()
+        instrumentation.count("csv_rows", len(self.__dates))
+
+        with instrumentation.span("index_columns"):
+            self.__index_columns(column_chunks)
+
+
+    def __index_rows(self, chunk: 'pd.DataFrame', column_chunks: dict):
+        """
+        Adding the rows of the chunk to the dictionary from the day ordinal of each date to its row,
+        and collecting the value arrays of its columns.
+        The latest row of a day replaces the earlier ones, as saving changed days appends their rows.
+        """
+
+        if SUMMARY_DATE not in chunk.columns:
+            return
+
+        if self.__start is not None:
+            # YYYY-MM-DD strings are ordered like their days
+            chunk = chunk[chunk[SUMMARY_DATE].astype(str) >= self.__start]
+
+        first_row = len(self.__dates)
+        dates = chunk[SUMMARY_DATE].astype(str).tolist()
+        ordinals = date_strings_to_ordinals(dates)
+        for row, ordinal in enumerate(ordinals.tolist(), start=first_row):
+            self.__rows_by_ordinal[ordinal] = row
+        self.__dates.extend(dates)
+
+        for column_name in chunk.columns:
+            if column_name == SUMMARY_DATE:
+                continue
+            values = chunk[column_name].values
+            # copying, so the values do not keep the whole block of the chunk alive
+            column_chunks.setdefault(column_name, []).append(values if self.__chunksize is None else values.copy())
+
+
+    def __index_columns(self, column_chunks: dict):
+        """
+        Joining the value arrays of the chunks of each column
+        and collecting the columns of each summary type,
+        so retrieving a summary does not need to search the whole file content.
+        """
+
+        columns_by_name = dict()
+        for column_name in list(column_chunks.keys()):
+            # releasing the chunks of each column as soon as it is joined
+            columns_by_name[column_name] = concatenate_column_chunks(column_chunks.pop(column_name))
+
+        self.__columns_by_summary_type = dict()
+        for summary_type in self.supported_summary_types:
+            summary_type_prefix = "{}_".format(summary_type.name)
+
+            # columns relevant for this summary type as (measurement name, values)
+            # only removing the prefix, e.g. bedtime_bedtime_window_start is bedtime_window_start
+            columns = []
+            for column_name, values in columns_by_name.items():
+                if column_name.startswith(summary_type_prefix):
+                    columns.append((column_name[len(summary_type_prefix):], values))
+            self.__columns_by_summary_type[summary_type] = columns
 
 
     def get_summary_data(self, summary_type: SummaryType, date: str) -> Tuple[bool, dict]:
@@ -66,45 +162,31 @@ class CsvStorageConnector(AbstractConnector):
         if summary_type not in self.supported_summary_types:
             raise ValueError("Summary Type not supported")
 
-        # preparing regex
-        summary_type_column_identifier_re = r'{}_.*'.format(summary_type.name)
-        summary_type_suffix_re = r'{}_'.format(summary_type.name)
-
-        try:
-            # searching for the date row in the DataFrame
-            date_entry = self.__data.loc[self.__data[SUMMARY_DATE] == date]
-        except KeyError:
-            # date is not in the DataFrame
-            return False, dict()
-
-        if date_entry.empty:
+        ordinal = date_string_to_ordinal(date)
+        if ordinal not in self.__rows_by_ordinal.keys():
             # date is not in the DataFrame
             return False, dict()
 
-        if len(date_entry.index) >= 2:
-            raise AttributeError("Invalid File Content. Too many date entries in one file.")
-
-        # filtering out columns relevant for this summary type
-        summary_date_entries = date_entry.loc[:, date_entry.columns.str.match(summary_type_column_identifier_re)]
-        if summary_date_entries.empty:
+        # columns relevant for this summary type
+        row = self.__rows_by_ordinal[ordinal]
+        columns = self.__columns_by_summary_type[summary_type]
+        if len(columns) == 0:
             return False, dict()
 
-        if summary_date_entries.isnull().values.all():
+        if all(pd.isnull(values[row]) for _, values in columns):
             return False, dict()
 
-        # transforming DataFrame into dict
+        # transforming the row into dict
         data = dict()
         data[SUMMARY_DATE] = date
-        for column_name in summary_date_entries:
-            summary_entry = re.sub(summary_type_suffix_re, '', column_name)
-            value = summary_date_entries[column_name].values[0]
-            data[summary_entry] = value
+        for summary_entry, values in columns:
+            data[summary_entry] = values[row]
 
         return True, data
 
 
     def get_earliest_and_latest_vailable_summary_date(self) -> Tuple[Union[str, None], Union[str, None]]:
-        available_dates = self.__data[SUMMARY_DATE].tolist()
+        available_dates = self.__dates
 
         earliest = min(available_dates)
         latest = max(available_dates)
@@ -113,5 +195,24 @@ class CsvStorageConnector(AbstractConnector):
 
 
     def is_empty(self):
-        return this.__data.empty
-        
\ No newline at end of file
+        return len(self.__dates) == 0
+        
+
+
+def concatenate_column_chunks(chunks: list) -> Union['np.ndarray', 'pd.Categorical']:
+    """
+    Joining the value arrays of the chunks of one column.
+    Chunks with different inferred dtypes, e.g. only NaN in one chunk and booleans in another,
+    are joined as objects, the same way as reading the whole column at once.
+    """
+
+    if len(chunks) == 1:
+        return chunks[0]
+
+    if all(isinstance(chunk, pd.Categorical) for chunk in chunks):
+        return pd.api.types.union_categoricals(chunks)
+
+    chunks = [np.asarray(chunk) for chunk in chunks]
+    if len(set(chunk.dtype for chunk in chunks)) == 1 or all(chunk.dtype.kind in 'iuf' for chunk in chunks):
+        return np.concatenate(chunks)
+    return np.concatenate([chunk.astype(object) for chunk in chunks])
\ No newline at end of file
@@ -4,17 +4,31 @@ from typing import Tuple, List, Union
 from common.constants import SummaryType, SubjectiveMeasurementType, SUMMARY_DATE
 from connector.abstract_connector import AbstractConnector
 from summary.summary import Subjective
+from storage.subjective_journal import SubjectiveJournal
 
 
 class GuiInputConnector(AbstractConnector):
 
     supported_summary_types = [SummaryType.subjective]
 
-    def __init__(self, subjective_tracking_items: List[Tuple[str, str]]):
+    def __init__(self, subjective_tracking_items: List[Tuple[str, str]], journal: SubjectiveJournal = None):
+        """
+        Parameters
+        ----------
+        subjective_tracking_items : List[Tuple[str, str]]
+            Names and types of the subjective inputs.
+
+        journal : SubjectiveJournal
+            If given, its inputs which are not in the storage file yet are replayed,
+            and each new input is appended to it.
+        """
         # TODO: reconsider this
 
 
         self.__input_data_sets = dict()
+        self.__journal = journal
+        if journal is not None:
+            self.__input_data_sets.update(journal.read())
 
         self.__subjective_tracking_attr_types = dict()
         self.__subjective_tracking_attributes = []
@@ -47,6 +61,8 @@ class GuiInputConnector(AbstractConnector):
         # TODO: add checks
         input_data[SUMMARY_DATE] = summary_date
         self.__input_data_sets[summary_date] = input_data
+        if self.__journal is not None:
+            self.__journal.append(summary_date, input_data)
    
     def preload(self, **kwargs):
         # preloading process is passively done through the gui
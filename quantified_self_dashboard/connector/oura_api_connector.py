@@ -1,14 +1,19 @@
-import requests
+from __future__ import annotations
+
 import json
+from datetime import datetime
 
 from typing import Tuple, List, Union
 
-import pandas as pd
-
 from common.constants import SummaryType, SUMMARY_DATE
+from common.lazy_import import LazyModule
+from common import instrumentation
 from connector.abstract_connector import AbstractConnector
 
-from common.date_helper import *
+from common.date_helper import datetime_to_simple_iso, get_day_before, get_day_after, get_one_week_before, get_one_week_after
+
+# only imported when the api gets requested
+requests = LazyModule('requests')
 
 
 class OuraApiConnector(AbstractConnector):
@@ -21,15 +26,21 @@ class OuraApiConnector(AbstractConnector):
     __oura_api_request_template = 'https://api.ouraring.com/v1/{}'
 
 
-    def __init__(self, access_token: str):
+    def __init__(self, access_token: str, session: requests.Session = None):
         """
         Parameters
         ----------
         access_token : str
             The access token is necessary to get permission to access 
             the personal data from the oura ring API.        
+
+        session : requests.Session
+            Session whose connection pool is used for the requests, 
+            e.g. shared by the connectors of many profiles.
+            If None, each request opens its own connection.
         """
         self.__access_token = access_token
+        self.__session = session
 
 
     def __request_summary(self, summary_type: SummaryType, start: str=None, end:str =None) -> requests.Response:
@@ -72,7 +83,13 @@ class OuraApiConnector(AbstractConnector):
         params_str = param_template.format(*params)
         
         request_str = OuraApiConnector.__oura_api_request_template.format(params_str)
-        resp = requests.get(request_str)
+        with instrumentation.span("http_request"):
+            if self.__session is not None:
+                resp = self.__session.get(request_str)
+            else:
+                resp = requests.get(request_str)
+        instrumentation.count("http_requests")
+        instrumentation.count("http_bytes", len(resp.content))
       
         return resp
 
@@ -144,12 +161,21 @@ class OuraApiConnector(AbstractConnector):
     
 
     def preload(self, **kwargs):
+        """
+        Requesting the summaries, depending on the keyword arguments:
+        everything=True requests all available summaries,
+        start and optionally end request only the summaries of these days, e.g. the latest days,
+        otherwise the summaries around and in between the already available ones are requested.
+        """
         everything = False
         if 'everything' in kwargs.keys():
             everything = kwargs['everything']
 
         if everything:
             self.__preload_everything()
+        elif 'start' in kwargs.keys():
+            end = kwargs['end'] if 'end' in kwargs.keys() else None
+            self.__preload_range(kwargs['start'], end)
         else: 
             earliest = kwargs['earliest_available_date']
             latest = kwargs['latest_available_date']
@@ -207,6 +233,12 @@ class OuraApiConnector(AbstractConnector):
         
                 
 
+    def __preload_range(self, start: str, end: str = None):
+        """ Requesting the summaries from start until end, or until today if end is None, with one request per summary type. """
+        current_data, _ = self.__load_data(start, end)
+        self.__merging_and_saving_list_of_dict_bundles([current_data])
+
+
     def __preload_considering_missing_data(self, missing_data_before_date: str, missing_data_after_date: str, missing_after_in_between: List[str]):
         """
         TODO
@@ -0,0 +1,391 @@
+import os
+import sys
+import json
+import time
+import signal
+import argparse
+import threading
+import configparser
+from typing import List, Tuple
+
+import numpy as np
+
+from summary.summary_container import SummaryContainer
+from connector.abstract_connector import AbstractConnector
+from connector.oura_api_connector import OuraApiConnector
+from connector.csv_storage_connector import CsvStorageConnector
+from storage.csv_storage import CsvStorage
+from common.constants import AnalysisType, SummaryType
+from common.date_helper import date_string_n_days_ago, date_string_to_ordinal, ordinal_to_date_string, ordinals_to_date_strings, all_date_strings_between_dates, get_day_after
+from analyser.analysis_type_configurations import OutputFormat, HtmlBundle, analysis_type_summary_type_measurement_tuples
+from common import instrumentation
+from storage.array_storage import ArrayStorage
+from cli import parse_date_range, parse_analysis_types, get_arrays_path, default_starting_date
+
+
+# Long running mode keeping the container and the connectors loaded.
+# Each cycle polls only the latest days from the api, merges them into the container,
+# saves the changed days and renders the analyses whose data or date range changed.
+#
+# Example
+# -------
+# python -m daemon --interval 3600 --analyses scores_weekly bedtimes_monthly --last-days 90 --report cycles.jsonl
+
+# summary types polled from the api
+polled_summary_types = [SummaryType.sleep, SummaryType.readiness, SummaryType.activity, SummaryType.bedtime]
+
+
+def get_poll_start(container: SummaryContainer, starting_date: str, today: str, sync_days: int) -> str:
+    """ First day to poll: sync_days before today, or the day after the latest loaded summary if that is earlier. """
+
+    poll_start_ordinal = date_string_to_ordinal(today) - sync_days + 1
+
+    latest_dates = [container.get_latest_summary_date(summary_type) for summary_type in polled_summary_types]
+    latest_dates = [date for date in latest_dates if date is not None]
+    if len(latest_dates) == 0:
+        # nothing loaded yet
+        poll_start_ordinal = date_string_to_ordinal(starting_date)
+    else:
+        poll_start_ordinal = min(poll_start_ordinal, date_string_to_ordinal(get_day_after(max(latest_dates))))
+
+    poll_start_ordinal = max(poll_start_ordinal, date_string_to_ordinal(starting_date))
+    return ordinal_to_date_string(poll_start_ordinal)
+
+
+class SyncDaemon:
+    """
+    Syncing a loaded container incrementally and rendering its analyses in cycles.
+    The container, the connectors, the analyser and its exporter processes stay alive between the cycles.
+    """
+
+    def __init__(self, container: SummaryContainer, api_connector: AbstractConnector, storage: CsvStorage, starting_date: str,
+                 sync_days: int = 7, analyser=None, analysis_types: List[AnalysisType] = (), date_ranges: List[Tuple[str, str]] = (),
+                 last_days: int = None, analyse_kwargs: dict = None):
+        """
+        Parameters
+        ----------
+        container : SummaryContainer
+            Loaded container, which gets updated in each cycle.
+
+        api_connector : AbstractConnector
+            Connector polled for the latest days, preloaded with the start and end keyword arguments.
+
+        storage : CsvStorage
+            Storage the changed days are saved into. If None, nothing is saved.
+
+        starting_date : str
+            First day of the container in YYYY-MM-DD format.
+
+        sync_days : int
+            Number of the latest days polled in each cycle, as the summaries of the last days still change.
+            If the latest loaded summary is older, all days since then are polled.
+
+        analyser : PlotlyAnalyser
+            Analyser rendering the analyses of the container.
+
+        analysis_types : List[AnalysisType]
+            Analyses rendered in each cycle, if their data or date range changed.
+
+        date_ranges : List[Tuple[str, str]]
+            Fixed date ranges of the analyses.
+
+        last_days : int
+            Date range of the analyses from this many days ago until today, used if no fixed date ranges are given.
+            If neither is given, the analyses range from the starting date until today.
+
+        analyse_kwargs : dict
+            Additional keyword arguments of the analyses, e.g. the output format.
+        """
+
+        if sync_days < 1:
+            raise ValueError("At least the latest day has to be synced")
+        if last_days is not None and last_days < 1:
+            raise ValueError("The date range of the analyses needs at least the latest day")
+
+        self.__container = container
+        self.__api_connector = api_connector
+        self.__storage = storage
+        self.__starting_date = starting_date
+        self.__sync_days = sync_days
+        self.__analyser = analyser
+        self.__analysis_types = list(analysis_types)
+        self.__date_ranges = list(date_ranges)
+        self.__last_days = last_days
+        self.__analyse_kwargs = analyse_kwargs if analyse_kwargs is not None else dict()
+
+        # (analysis type, start, end) of the analyses rendered with the current data
+        self.__rendered = set()
+        self.__cycle = 0
+        self.__stop_event = threading.Event()
+
+
+    def get_poll_start(self, today: str) -> str:
+        return get_poll_start(self.__container, self.__starting_date, today, self.__sync_days)
+
+
+    def get_date_ranges(self, today: str) -> List[Tuple[str, str]]:
+        if len(self.__date_ranges) > 0:
+            return self.__date_ranges
+        if self.__last_days is not None:
+            return [(date_string_n_days_ago(self.__last_days - 1), today)]
+        return [(self.__starting_date, today)]
+
+
+    @classmethod
+    def is_analysis_changed(cls, analysis_type: AnalysisType, start: str, end: str, changes: dict) -> bool:
+        """ Whether any measurement the analysis is made of changed on a day within its date range. """
+
+        if len(changes) == 0:
+            return False
+        if analysis_type not in analysis_type_summary_type_measurement_tuples.keys():
+            return True
+
+        start_ordinal, end_ordinal = date_string_to_ordinal(start), date_string_to_ordinal(end)
+        for summary_type_measurement_tuple in analysis_type_summary_type_measurement_tuples[analysis_type]:
+            if summary_type_measurement_tuple not in changes.keys():
+                continue
+            changed_ordinals = changes[summary_type_measurement_tuple]
+            if np.any((changed_ordinals >= start_ordinal) & (changed_ordinals <= end_ordinal)):
+                return True
+        return False
+
+
+    def run_cycle(self) -> dict:
+        """
+        Polling the latest days, merging them into the container, saving the changed days
+        and rendering the changed analyses.
+
+        Returns
+        -------
+        dict
+            report of the cycle with its latency, cpu time and work done
+        """
+
+        self.__cycle += 1
+        report = {'cycle': self.__cycle, 'started_at': time.strftime("%Y-%m-%dT%H:%M:%S")}
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+
+        today = date_string_n_days_ago(0)
+        poll_start = self.get_poll_start(today)
+        dates = all_date_strings_between_dates(poll_start, today)
+
+        with instrumentation.span("cycle"):
+            phase_start = time.perf_counter()
+            with instrumentation.span("poll"):
+                self.__api_connector.preload(start=poll_start, end=today)
+            report['poll_seconds'] = time.perf_counter() - phase_start
+
+            phase_start = time.perf_counter()
+            with instrumentation.span("merge"):
+                changes = self.__container.update(self.__api_connector, dates)
+            report['merge_seconds'] = time.perf_counter() - phase_start
+
+            changed_ordinals = np.unique(np.concatenate(list(changes.values()))) if len(changes) > 0 else np.array([], dtype=np.int64)
+            changed_dates = ordinals_to_date_strings(changed_ordinals)
+            report['days_polled'] = len(dates)
+            report['days_changed'] = len(changed_dates)
+            report['measurements_changed'] = int(sum(len(changed) for changed in changes.values()))
+
+            phase_start = time.perf_counter()
+            if self.__storage is not None and len(changed_dates) > 0:
+                with instrumentation.span("save"):
+                    # the changed rows are appended, or the whole file is rewritten when it gets compacted
+                    report['rows_saved'] = self.__storage.save(self.__container, dates=changed_dates)
+            else:
+                report['rows_saved'] = 0
+            report['save_seconds'] = time.perf_counter() - phase_start
+
+            phase_start = time.perf_counter()
+            with instrumentation.span("render"):
+                rendered, skipped, failed = self.__render(today, changes)
+            report['analyses_rendered'] = rendered
+            report['analyses_skipped'] = skipped
+            report['analyses_failed'] = failed
+            report['render_seconds'] = time.perf_counter() - phase_start
+
+        report['wall_seconds'] = time.perf_counter() - wall_start
+        # without the cpu time of the exporter processes
+        report['cpu_seconds'] = time.process_time() - cpu_start
+        return report
+
+
+    def __render(self, today: str, changes: dict) -> Tuple[int, int, int]:
+        """ Rendering the analyses whose data or date range changed, returning the number of rendered, skipped and failed ones. """
+
+        if self.__analyser is None:
+            return 0, 0, 0
+
+        analyses = [(analysis_type, start, end) for start, end in self.get_date_ranges(today) for analysis_type in self.__analysis_types]
+        # forgetting analyses of previous date ranges
+        self.__rendered &= set(analyses)
+
+        futures = []
+        rendered, skipped, failed = 0, 0, 0
+        for analysis in analyses:
+            analysis_type, start, end = analysis
+            if analysis in self.__rendered and not self.is_analysis_changed(analysis_type, start, end, changes):
+                skipped += 1
+                continue
+
+            self.__rendered.discard(analysis)
+            try:
+                futures.append((analysis, self.__analyser.analyse(start, end, analysis_type, **self.__analyse_kwargs)))
+            except (AttributeError, ValueError) as e:
+                print("{} from {} until {} failed: {}".format(analysis_type.name, start, end, e), file=sys.stderr)
+                failed += 1
+
+        for analysis, analysis_futures in futures:
+            try:
+                for future in analysis_futures:
+                    future.result()
+                self.__rendered.add(analysis)
+                rendered += 1
+            except Exception as e:
+                print("{} failed: {}".format(analysis[0].name, e), file=sys.stderr)
+                failed += 1
+
+        return rendered, skipped, failed
+
+
+    def run(self, interval_seconds: float, cycles: int = None, report_path_name: str = None):
+        """
+        Running cycles every interval seconds until stop is called, or the given number of cycles ran.
+        Each cycle report is printed and appended as a json line to the report file, if given.
+        A failing cycle is reported and the next cycle runs as scheduled.
+        """
+
+        while not self.__stop_event.is_set():
+            cycle_start = time.monotonic()
+            try:
+                report = self.run_cycle()
+                print(format_cycle_report(report), flush=True)
+            except Exception as e:
+                report = {'cycle': self.__cycle, 'started_at': time.strftime("%Y-%m-%dT%H:%M:%S"), 'error': repr(e)}
+                print("cycle {} failed: {!r}".format(self.__cycle, e), file=sys.stderr, flush=True)
+
+            if report_path_name:
+                with open(report_path_name, 'a') as f:
+                    f.write(json.dumps(report) + "\n")
+
+            if cycles is not None and self.__cycle >= cycles:
+                break
+            self.__stop_event.wait(max(0.0, cycle_start + interval_seconds - time.monotonic()))
+
+
+    def stop(self):
+        """ Stopping after the running cycle, can be called from other threads and signal handlers. """
+        self.__stop_event.set()
+
+
+def format_cycle_report(report: dict) -> str:
+    return ("cycle {cycle}: {wall_seconds:.2f} s, {cpu_seconds:.2f} s cpu"
+            " (poll {poll_seconds:.2f} s, merge {merge_seconds:.2f} s, save {save_seconds:.2f} s, render {render_seconds:.2f} s),"
+            " {days_polled} days polled, {days_changed} changed, {rows_saved} rows saved,"
+            " {analyses_rendered} analyses rendered, {analyses_skipped} skipped, {analyses_failed} failed").format(**report)
+
+
+def main(arguments: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m daemon", description="Syncing the latest days and rendering the changed analyses on a schedule.")
+    parser.add_argument("--config", default="config.ini", help="path of the config file")
+    parser.add_argument("--storage", help="path of the csv storage file, by default from the config")
+    parser.add_argument("--arrays", metavar="DIRECTORY", help="directory of memory mapped measurement arrays the analyses read from, by default from the config")
+    parser.add_argument("--output", default="output", help="directory of the analysis outputs")
+    parser.add_argument("--starting-date", help="first day of the data in YYYY-MM-DD format")
+    parser.add_argument("--interval", type=float, default=3600, help="seconds from the start of one cycle to the start of the next one")
+    parser.add_argument("--sync-days", type=int, default=7, help="number of the latest days polled in each cycle")
+    parser.add_argument("--cycles", type=int, default=None, help="stopping after this many cycles, running until interrupted by default")
+    parser.add_argument("--analyses", nargs="+", default=[], metavar="ANALYSIS_TYPE", help="names of the analysis types to render, or all")
+    parser.add_argument("--range", dest="ranges", action="append", type=parse_date_range, metavar="START:END", help="fixed date range of the analyses, can be given multiple times")
+    parser.add_argument("--last-days", type=int, help="date range of the analyses from this many days ago until today")
+    parser.add_argument("--output-format", choices=list(OutputFormat.__members__.keys()), default=None, help="format of the analysis outputs")
+    parser.add_argument("--html-bundle", choices=list(HtmlBundle.__members__.keys()), default=None, help="how html outputs include plotly.js")
+    parser.add_argument("--workers", type=int, default=None, help="number of image exporter processes, by default the number of cores")
+    parser.add_argument("--render-cache", action="store_true", help="linking unchanged images from the render cache instead of rendering them again")
+    parser.add_argument("--report", metavar="PATH", help="appending the report of each cycle as a json line to this file")
+    parser.add_argument("--instrumentation", metavar="REPORT", help="writing an instrumentation report to this path at exit")
+    args = parser.parse_args(arguments)
+
+    try:
+        analysis_types = parse_analysis_types(args.analyses)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.last_days is not None and args.last_days < 1:
+        parser.error("--last-days must be at least 1")
+
+    config = configparser.ConfigParser()
+    config.read(args.config)
+
+    if args.instrumentation:
+        instrumentation.enable(args.instrumentation)
+
+    if not config.has_section('oura.auth') or not config['oura.auth'].get('access-token'):
+        parser.error("no access-token in the oura.auth section of {}".format(args.config))
+
+    if args.storage:
+        storage_file_path = [args.storage]
+    else:
+        storage_file_name = config['storage.filename'].get('filename') if config.has_section('storage.filename') else "data.csv"
+        storage_file_path = ["quantified_self_dashboard", "data", storage_file_name]
+    storage_chunksize = config['storage.filename'].getint('chunksize', fallback=None) if config.has_section('storage.filename') else None
+
+    starting_date = args.starting_date if args.starting_date else default_starting_date
+
+    # loading the stored data once, the api is only polled by the cycles
+    container = SummaryContainer(starting_date, containing_sleep=True, containing_readiness=True, containing_activity=True, containing_bedtime=True, containing_subjective=True)
+    conn_storage = CsvStorageConnector(storage_file_path, storage_chunksize)
+    if os.path.exists(conn_storage._filename):
+        container.add_storage_connector(conn_storage)
+
+    # the load writes the loaded days and each cycle the changed days into the arrays
+    arrays_path = get_arrays_path(args.arrays, config)
+    if arrays_path is not None:
+        container.set_measurement_arrays(ArrayStorage(arrays_path))
+
+    container.preload()
+    container.load()
+
+    analyser, export_pool = None, None
+    if len(analysis_types) > 0:
+        from analyser.plotly_analyser import PlotlyAnalyser
+        from analyser.image_export import ImageExportPool
+        from analyser.render_cache import RenderCache
+
+        os.makedirs(os.path.join(os.getcwd(), args.output), exist_ok=True)
+        export_pool = ImageExportPool(args.workers)
+        render_cache = RenderCache([args.output, ".render_cache"]) if args.render_cache else None
+        analyser = PlotlyAnalyser([args.output], container, export_pool, render_cache)
+
+    analyse_kwargs = dict()
+    if args.output_format:
+        analyse_kwargs['output_format'] = OutputFormat[args.output_format]
+    if args.html_bundle:
+        analyse_kwargs['html_bundle'] = HtmlBundle[args.html_bundle]
+
+    daemon = SyncDaemon(
+        container,
+        OuraApiConnector(config['oura.auth'].get('access-token')),
+        CsvStorage(storage_file_path),
+        starting_date,
+        sync_days=args.sync_days,
+        analyser=analyser,
+        analysis_types=analysis_types,
+        date_ranges=args.ranges if args.ranges else [],
+        last_days=args.last_days,
+        analyse_kwargs=analyse_kwargs,
+    )
+
+    # finishing the running cycle on termination
+    signal.signal(signal.SIGTERM, lambda signum, frame: daemon.stop())
+    signal.signal(signal.SIGINT, lambda signum, frame: daemon.stop())
+
+    daemon.run(args.interval, args.cycles, args.report)
+
+    if export_pool is not None:
+        export_pool.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
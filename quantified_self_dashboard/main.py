@@ -1,19 +1,16 @@
 
 import configparser
-import json
-from summary.summary import *
 from summary.summary_container import SummaryContainer
 from connector import oura_api_connector, gui_input_connector, csv_storage_connector
-from common.date_helper import *
-from common.constants import *
+from common.constants import SubjectiveMeasurementType
 from storage.csv_storage import CsvStorage
-from analyser import abstract_analyser, plotly_analyser
-import pandas as pd
-
-import wx
-
-from ui.main_frame import MainFrame
-from ui.callback_wrappers import *
+from storage.subjective_journal import SubjectiveJournal
+from storage.array_storage import ArrayStorage
+from analyser import plotly_analyser
+from analyser.image_export import ImageExportPool
+from analyser.render_cache import RenderCache
+from ui.callback_wrappers import SubjectiveInputCallbackWrapper, MainTabCallbackWrapper, AnalysisTabCallbackWrapper
+from common import instrumentation
 
 
 
@@ -24,43 +21,79 @@ if __name__ == "__main__":
     # TODO: improve config structure
     config = configparser.ConfigParser()
     config.read("config.ini")
-    access_token = config["oura.auth"].get('access-token')
 
-    subj_conf = config['subective.summary.data']
-    # subjective_input_structure = list(subj_conf.items())
+    # timing the startup stages, the report is written at exit
+    if config.has_section('instrumentation') and config['instrumentation'].getboolean('enabled', fallback=False):
+        instrumentation.enable(config['instrumentation'].get('report', fallback="instrumentation_report.txt"))
+
+    with instrumentation.span("startup"):
+
+        with instrumentation.span("config"):
+            access_token = config["oura.auth"].get('access-token')
+
+            subj_conf = config['subective.summary.data']
+            # subjective_input_structure = list(subj_conf.items())
 
-    # TODO check config subjective input
-    # transform into constants
-    subjective_input_structure = [('a', SubjectiveMeasurementType.bool), ('b', SubjectiveMeasurementType.number), ('c', SubjectiveMeasurementType.percentage)]
+            # TODO check config subjective input
+            # transform into constants
+            subjective_input_structure = [('a', SubjectiveMeasurementType.bool), ('b', SubjectiveMeasurementType.number), ('c', SubjectiveMeasurementType.percentage)]
 
-    storage_file_name = config['storage.filename'].get('filename')
-    storage_file_path = ["quantified_self_dashboard", "data", storage_file_name]
+            storage_file_name = config['storage.filename'].get('filename')
+            storage_file_path = ["quantified_self_dashboard", "data", storage_file_name]
+            storage_chunksize = config['storage.filename'].getint('chunksize', fallback=None)
+            journal_file_name = config['storage.filename'].get('journal', fallback="subjective_journal.jsonl")
+            journal_file_path = ["quantified_self_dashboard", "data", journal_file_name]
+            # optional directory of memory mapped measurement arrays the analyses read from
+            arrays_directory_name = config['storage.filename'].get('arrays', fallback=None)
 
-    output_location = ["output"]
+            output_location = ["output"]
 
-    # TODO get through config
-    starting_date = "2021-03-01"
+            # TODO get through config
+            starting_date = "2021-03-01"
 
-    conn_oura = oura_api_connector.OuraApiConnector(access_token)
-    conn_sub = gui_input_connector.GuiInputConnector(subjective_input_structure)
-    conn_storage = csv_storage_connector.CsvStorageConnector(storage_file_path)
+        conn_oura = oura_api_connector.OuraApiConnector(access_token)
+        # subjective inputs which were not saved into the storage file yet
+        journal = SubjectiveJournal(journal_file_path)
+        conn_sub = gui_input_connector.GuiInputConnector(subjective_input_structure, journal)
+        conn_storage = csv_storage_connector.CsvStorageConnector(storage_file_path, storage_chunksize)
 
-    container = SummaryContainer(starting_date, containing_sleep=True, containing_readiness=True, containing_activity=True, containing_bedtime=True, containing_subjective=True)
-    container.add_storage_connector(conn_storage)
-    container.add_api_connector(conn_oura)
-    container.add_user_connector(conn_sub)
+        container = SummaryContainer(starting_date, containing_sleep=True, containing_readiness=True, containing_activity=True, containing_bedtime=True, containing_subjective=True)
+        container.add_storage_connector(conn_storage)
+        container.add_api_connector(conn_oura)
+        container.add_user_connector(conn_sub)
+        if arrays_directory_name:
+            # the loads write the loaded days into the arrays
+            container.set_measurement_arrays(ArrayStorage(["quantified_self_dashboard", "data", arrays_directory_name]))
 
-    container.preload()
-    container.load()
+        container.preload()
+        container.load()
 
-    storage = CsvStorage(storage_file_path)
-    analyser = plotly_analyser.PlotlyAnalyser(output_location, container)
+        with instrumentation.span("storage"):
+            storage = CsvStorage(storage_file_path)
 
-    subjective_input_callback_wrapper = SubjectiveInputCallbackWrapper(conn_sub, container, storage, subjective_input_structure, analyser)
-    main_tab_callback_wrapper = MainTabCallbackWrapper(container, storage)
-    analysis_tab_callbak_wrapperr = AnalysisTabCallbackWrapper(analyser, starting_date)
+        with instrumentation.span("analyser"):
+            export_pool = ImageExportPool()
+            render_cache = RenderCache(output_location + [".render_cache"])
+            analyser = plotly_analyser.PlotlyAnalyser(output_location, container, export_pool, render_cache)
+
+        with instrumentation.span("callback_wrappers"):
+            subjective_input_callback_wrapper = SubjectiveInputCallbackWrapper(conn_sub, container, storage, subjective_input_structure, analyser)
+            main_tab_callback_wrapper = MainTabCallbackWrapper(container, storage, journal)
+            analysis_tab_callbak_wrapperr = AnalysisTabCallbackWrapper(analyser, starting_date, container)
+
+        with instrumentation.span("gui"):
+            # the GUI toolkit is only needed once the window gets created
+            import wx
+            from ui.main_frame import MainFrame
+
+            app = wx.App()
+            m = MainFrame(subjective_input_callback_wrapper, main_tab_callback_wrapper, analysis_tab_callbak_wrapperr)
+            m.Show()
 
-    app = wx.App()
-    m = MainFrame(subjective_input_callback_wrapper, main_tab_callback_wrapper, analysis_tab_callbak_wrapperr)
-    m.Show()
     app.MainLoop()
+
+    # a save requested before closing the window is still written
+    main_tab_callback_wrapper.wait_for_save()
+    analysis_tab_callbak_wrapperr.shutdown()
+    export_pool.shutdown()
+    journal.close()
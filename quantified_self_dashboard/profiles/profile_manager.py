@@ -0,0 +1,606 @@
+from __future__ import annotations
+
+import os
+import re
+import time
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List, Tuple
+
+import numpy as np
+
+from common.constants import SubjectiveMeasurementType
+from common.date_helper import date_string_n_days_ago, all_date_strings_between_dates, ordinals_to_date_strings
+from common.lazy_import import LazyModule
+from common import instrumentation
+from summary.summary_container import SummaryContainer
+from connector.abstract_connector import AbstractConnector
+from connector.oura_api_connector import OuraApiConnector
+from connector.gui_input_connector import GuiInputConnector
+from connector.csv_storage_connector import CsvStorageConnector
+from storage.csv_storage import CsvStorage
+from storage.subjective_journal import SubjectiveJournal
+from storage.array_storage import ArrayStorage
+from analyser.plotly_analyser import PlotlyAnalyser
+from analyser.image_export import ImageExportPool
+from analyser.render_cache import RenderCache
+from daemon import get_poll_start
+
+# only imported when a profile syncs with the oura api
+requests = LazyModule('requests')
+
+
+# names of profiles are used as directory names
+profile_name_re = re.compile(r'^[A-Za-z0-9_.-]+$')
+
+# subjective input structure of profiles, if none is given
+default_subjective_input_structure = [('a', SubjectiveMeasurementType.bool), ('b', SubjectiveMeasurementType.number), ('c', SubjectiveMeasurementType.percentage)]
+
+
+class Profile:
+    """
+    Everything of one ring wearer: the container with its connectors, the csv storage and the analyser.
+    All files of the profile are in its own directory, the storage file data.csv, the journal of subjective inputs
+    which are not saved yet subjective_journal.jsonl, the output directory and optionally the measurement arrays.
+    The container is only built when the profile gets loaded and dropped again when it gets unloaded.
+    Using an unloaded profile raises a ValueError, so only its profile manager loads it and keeps track of it.
+    Loading only reads the storage file and the journal, syncing requests only the latest days from the api.
+    """
+
+    def __init__(self, name: str, profile_path: List[str], starting_date: str, subjective_input_structure: List[Tuple[str, SubjectiveMeasurementType]],
+                 api_connector_factory: Callable[[], AbstractConnector], export_pool: ImageExportPool = None, render_cache: RenderCache = None,
+                 measurement_arrays: bool = False):
+        """
+        Parameters
+        ----------
+        name : str
+            Name of the profile.
+
+        profile_path : List[str]
+            Path of the directory of the profile.
+
+        starting_date : str
+            First day of the container in YYYY-MM-DD format.
+
+        subjective_input_structure : List[Tuple[str, SubjectiveMeasurementType]]
+            Names and types of the subjective inputs.
+
+        api_connector_factory : Callable[[], AbstractConnector]
+            Creating the api connector of the profile when it gets loaded. If None, the profile has no api connector.
+
+        export_pool : ImageExportPool
+            Exporter processes of the analyser, shared by all profiles.
+
+        render_cache : RenderCache
+            Cache of rendered images of the analyser, shared by all profiles.
+
+        measurement_arrays : bool
+            Whether the analyser reads from memory mapped measurement arrays in the arrays directory of the profile.
+        """
+
+        self.__name = name
+        self.__profile_path = profile_path
+        self.__starting_date = starting_date
+        self.__subjective_input_structure = subjective_input_structure
+        self.__api_connector_factory = api_connector_factory
+        self.__export_pool = export_pool
+        self.__render_cache = render_cache
+        self.__measurement_arrays = measurement_arrays
+
+        # held while loading, syncing, saving or unloading
+        self.__lock = threading.RLock()
+        self.__last_used = time.monotonic()
+
+        # whether the container has data which is not saved yet
+        self.__changed = False
+        self.__container = None
+        self.__api_connector = None
+        self.__conn_sub = None
+        self.__journal = None
+        # days of subjective inputs, which are loaded into the container with the next save
+        self.__pending_subjective_dates = set()
+        self.__storage = None
+        self.__analyser = None
+
+        storage_path = profile_path + ["data.csv"]
+        self.__storage_path = storage_path
+        self.__storage_path_name = os.path.join(os.getcwd(), *storage_path)
+
+
+    @property
+    def name(self) -> str:
+        return self.__name
+
+    @property
+    def last_used(self) -> float:
+        """ time.monotonic() of the last use of the profile """
+        return self.__last_used
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.__container is not None
+
+    @property
+    def has_unsaved_changes(self) -> bool:
+        return self.__changed
+
+    @property
+    def container(self) -> SummaryContainer:
+        return self.__get_loaded(self.__container)
+
+    @property
+    def analyser(self) -> PlotlyAnalyser:
+        return self.__get_loaded(self.__analyser)
+
+    @property
+    def storage(self) -> CsvStorage:
+        return self.__get_loaded(self.__storage)
+
+
+    def __get_loaded(self, value):
+        """ Returns the given attribute of the loaded profile, raises a ValueError if the profile is not loaded. """
+        if value is None:
+            raise ValueError("Profile {} is not loaded, get it from its profile manager again".format(self.__name))
+        return value
+
+
+    def locked(self) -> threading.RLock:
+        """
+        Lock held while loading, syncing, saving or unloading the profile,
+        e.g. so a profile manager can register and load it without an eviction in between.
+        """
+        return self.__lock
+
+
+    def touch(self):
+        """ Marking the profile as used now. """
+        self.__last_used = time.monotonic()
+
+
+    def __build(self):
+        """ Creating the connectors, the container, the storage and the analyser of the profile. """
+
+        output_path = self.__profile_path + ["output"]
+        os.makedirs(os.path.join(os.getcwd(), *output_path), exist_ok=True)
+
+        container = SummaryContainer(self.__starting_date, containing_sleep=True, containing_readiness=True, containing_activity=True, containing_bedtime=True, containing_subjective=True)
+
+        # new profiles do not have a storage file yet
+        if os.path.exists(self.__storage_path_name):
+            container.add_storage_connector(CsvStorageConnector(self.__storage_path))
+
+        # not added to the container, so loading does not request the whole history, only sync() polls it
+        self.__api_connector = self.__api_connector_factory() if self.__api_connector_factory is not None else None
+
+        # journaled inputs are replayed by the connector and loaded with the storage file
+        journal = SubjectiveJournal(self.__profile_path + ["subjective_journal.jsonl"])
+        conn_sub = GuiInputConnector(self.__subjective_input_structure, journal)
+        container.add_user_connector(conn_sub)
+        self.__pending_subjective_dates = set(journal.read().keys())
+
+        if self.__measurement_arrays:
+            # the loads write the loaded days into the arrays
+            container.set_measurement_arrays(ArrayStorage(self.__profile_path + ["arrays"]))
+
+        self.__container = container
+        self.__conn_sub = conn_sub
+        self.__journal = journal
+        self.__storage = CsvStorage(self.__storage_path)
+        self.__analyser = PlotlyAnalyser(output_path, container, self.__export_pool, self.__render_cache)
+
+
+    def load(self):
+        """ Loading the summaries of the profile from its storage file and its journal, if it is not loaded yet. """
+
+        with self.__lock:
+            self.touch()
+            if self.__container is not None:
+                return
+            with instrumentation.span("load_profile"):
+                self.__build()
+                self.__container.preload()
+                self.__container.load()
+            # journaled subjective inputs are not in the storage file yet
+            self.__changed = self.__changed or len(self.__pending_subjective_dates) > 0
+
+
+    def save(self, dates: List[str] = None):
+        """
+        Loading the pending subjective inputs into the container and saving it into the storage file of the profile.
+
+        Parameters
+        ----------
+        dates : List[str]
+            If given, only these days and the days of the pending subjective inputs are saved,
+            e.g. the days changed by a sync. Otherwise all days are saved.
+        """
+
+        with self.__lock:
+            if self.__container is None:
+                return
+            with instrumentation.span("save_profile"):
+                journal_position = self.__journal.get_position()
+                subjective_dates = sorted(self.__pending_subjective_dates)
+                if len(subjective_dates) > 0:
+                    self.__container.update(self.__conn_sub, subjective_dates)
+                if dates is not None:
+                    dates = sorted(set(dates) | set(subjective_dates))
+                if dates is None or len(dates) > 0:
+                    self.__storage.save(self.__container, dates=dates)
+                self.__journal.discard_until(journal_position)
+            self.__pending_subjective_dates = set()
+            self.__changed = False
+
+
+    def sync(self, sync_days: int = 7) -> dict:
+        """
+        Polling the latest days from the api, merging them into the container
+        and saving the changed days and the pending subjective inputs.
+        Only the first sync of a profile without stored summaries requests its whole history.
+
+        Parameters
+        ----------
+        sync_days : int
+            Number of the latest days polled, as the summaries of the last days still change.
+
+        Returns
+        -------
+        dict
+            of the (summary type, measurement name) tuples whose values changed
+            to np.arrays of the day ordinals they changed at
+        """
+
+        with self.__lock:
+            self.__get_loaded(self.__container)
+
+            changes = dict()
+            if self.__api_connector is not None:
+                today = date_string_n_days_ago(0)
+                poll_start = get_poll_start(self.__container, self.__starting_date, today, sync_days)
+                with instrumentation.span("poll"):
+                    self.__api_connector.preload(start=poll_start, end=today)
+                changes = self.__container.update(self.__api_connector, all_date_strings_between_dates(poll_start, today))
+
+            changed_ordinals = np.unique(np.concatenate(list(changes.values()))) if len(changes) > 0 else np.array([], dtype=np.int64)
+            if len(changed_ordinals) > 0 or self.__changed:
+                self.save(dates=ordinals_to_date_strings(changed_ordinals))
+            return changes
+
+
+    def add_subjective_input(self, summary_date: str, data: dict):
+        """
+        Adding the subjective input of the day to the journal,
+        it is loaded into the container and saved with the next save.
+        """
+        with self.__lock:
+            self.__get_loaded(self.__container)
+            self.__conn_sub.add_subjective_input(summary_date, data)
+            self.__container.discard_missing_subjective_data_days([summary_date])
+            self.__pending_subjective_dates.add(summary_date)
+            self.__changed = True
+
+
+    def unload(self):
+        """ Saving unsaved changes and dropping the container, so its memory can be freed. """
+
+        with self.__lock:
+            if self.__changed:
+                # only the pending subjective inputs are not saved yet
+                self.save(dates=[])
+            if self.__journal is not None:
+                self.__journal.close()
+            self.__container = None
+            self.__api_connector = None
+            self.__conn_sub = None
+            self.__journal = None
+            self.__pending_subjective_dates = set()
+            self.__storage = None
+            self.__analyser = None
+
+
+class ProfileManager:
+    """
+    Managing the profiles of many ring wearers in one process.
+    All profiles share one http connection pool for the oura api, the image exporter processes and the render cache.
+    Only a limited number of profiles is kept loaded, the least recently used ones and inactive ones get unloaded.
+    Syncing runs on a bounded pool of threads, so many profiles can sync concurrently.
+
+    Example
+    -------
+    manager = ProfileManager(["profiles"], "2021-03-01")
+    manager.add_profile("alice", access_token)
+    manager.add_profile("bob", access_token)
+    for future in manager.sync_all():
+        future.result()
+    manager.get_profile("alice").analyser.analyse(start, end, AnalysisType.scores_weekly)
+    """
+
+    def __init__(self, profiles_path: List[str], starting_date: str, subjective_input_structure: List[Tuple[str, SubjectiveMeasurementType]] = None,
+                 max_loaded_profiles: int = 16, max_idle_seconds: float = None, max_sync_workers: int = 4,
+                 export_pool: ImageExportPool = None, render_cache: RenderCache = None, measurement_arrays: bool = False, sync_days: int = 7):
+        """
+        Parameters
+        ----------
+        profiles_path : List[str]
+            Path of the directory containing one directory per profile.
+
+        starting_date : str
+            First day of the containers in YYYY-MM-DD format, if not given per profile.
+
+        subjective_input_structure : List[Tuple[str, SubjectiveMeasurementType]]
+            Names and types of the subjective inputs, if not given per profile.
+
+        max_loaded_profiles : int
+            Maximum number of profiles kept loaded, the least recently used ones get unloaded first.
+
+        max_idle_seconds : float
+            Unloading profiles, which were not used for this many seconds. If None, only the number of profiles is limited.
+
+        max_sync_workers : int
+            Number of profiles syncing concurrently, also the size of the http connection pool.
+
+        export_pool : ImageExportPool
+            Exporter processes shared by the analysers of all profiles.
+            If None, the profile manager starts its own exporter processes.
+
+        render_cache : RenderCache
+            Cache of rendered images shared by the analysers of all profiles.
+            If None, a render cache in the profiles directory is used.
+
+        measurement_arrays : bool
+            Whether the analysers of the profiles read from memory mapped measurement arrays.
+
+        sync_days : int
+            Number of the latest days polled by each sync of a profile.
+        """
+
+        if max_loaded_profiles < 1 or max_sync_workers < 1:
+            raise ValueError("ProfileManager needs at least one loaded profile and one sync worker")
+
+        self.__profiles_path = profiles_path
+        self.__starting_date = starting_date
+        self.__subjective_input_structure = subjective_input_structure if subjective_input_structure is not None else default_subjective_input_structure
+        self.__max_loaded_profiles = max_loaded_profiles
+        self.__max_idle_seconds = max_idle_seconds
+        self.__max_sync_workers = max_sync_workers
+        self.__measurement_arrays = measurement_arrays
+        self.__sync_days = sync_days
+
+        self.__owns_export_pool = export_pool is None
+        self.__export_pool = export_pool if export_pool is not None else ImageExportPool()
+        self.__render_cache = render_cache if render_cache is not None else RenderCache(profiles_path + [".render_cache"])
+
+        # name: Profile, loaded or not, of all added profiles
+        self.__profiles = dict()
+        # names of the loaded profiles, the least recently used first
+        self.__loaded_names = OrderedDict()
+        self.__lock = threading.Lock()
+
+        # created at the first request to the oura api, by a loading profile holding its own lock
+        self.__session = None
+        self.__session_lock = threading.Lock()
+        self.__sync_executor = ThreadPoolExecutor(max_workers=max_sync_workers, thread_name_prefix="profile_sync")
+
+
+    def __get_session(self) -> requests.Session:
+        """ Http session shared by the api connectors of all profiles, with one pooled connection per sync worker. """
+
+        with self.__session_lock:
+            if self.__session is None:
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=self.__max_sync_workers)
+                session.mount("https://", adapter)
+                self.__session = session
+            return self.__session
+
+
+    def add_profile(self, name: str, access_token: str = None, api_connector_factory: Callable[[], AbstractConnector] = None,
+                    starting_date: str = None, subjective_input_structure: List[Tuple[str, SubjectiveMeasurementType]] = None) -> Profile:
+        """
+        Adding a profile without loading it.
+
+        Parameters
+        ----------
+        name : str
+            Name of the profile, which is also the name of its directory.
+
+        access_token : str
+            Access token of the oura api of the ring wearer.
+
+        api_connector_factory : Callable[[], AbstractConnector]
+            Creating another api connector instead of the oura api connector, e.g. for testing.
+
+        starting_date : str
+            First day of the container, the starting date of the profile manager if None.
+
+        subjective_input_structure : List[Tuple[str, SubjectiveMeasurementType]]
+            Names and types of the subjective inputs, the one of the profile manager if None.
+
+        Returns
+        -------
+        Profile
+        """
+
+        if not profile_name_re.match(name):
+            raise ValueError("Invalid profile name {}, only letters, digits, '_', '-' and '.' are allowed".format(name))
+        if access_token is not None and api_connector_factory is not None:
+            raise ValueError("Either an access token or an api connector factory can be given")
+
+        if access_token is not None:
+            api_connector_factory = lambda: OuraApiConnector(access_token, self.__get_session())
+
+        profile = Profile(
+            name,
+            self.__profiles_path + [name],
+            starting_date if starting_date is not None else self.__starting_date,
+            subjective_input_structure if subjective_input_structure is not None else self.__subjective_input_structure,
+            api_connector_factory,
+            self.__export_pool,
+            self.__render_cache,
+            self.__measurement_arrays,
+        )
+
+        with self.__lock:
+            if name in self.__profiles.keys():
+                raise ValueError("Profile {} already exists".format(name))
+            self.__profiles[name] = profile
+        return profile
+
+
+    def remove_profile(self, name: str):
+        """ Unloading and removing the profile from the profile manager, its files are kept. """
+
+        with self.__lock:
+            profile = self.__profiles.pop(name)
+            self.__loaded_names.pop(name, None)
+        profile.unload()
+
+
+    def get_profile_names(self) -> List[str]:
+        with self.__lock:
+            return list(self.__profiles.keys())
+
+
+    def get_loaded_profile_names(self) -> List[str]:
+        """ Names of the loaded profiles, the least recently used first. """
+        with self.__lock:
+            return list(self.__loaded_names.keys())
+
+
+    @contextmanager
+    def __using_profile(self, name: str):
+        """
+        Context manager registering the profile as the most recently used one and loading it, both under the lock of the profile,
+        which it holds until the end of the block. An eviction of the profile by another thread unloads it under the same lock,
+        so it can not happen between registering and loading, and each loaded profile stays registered.
+        The profiles which exceed the limits are unloaded after the block, when no lock is held.
+        """
+
+        with self.__lock:
+            if name not in self.__profiles.keys():
+                raise ValueError("No profile named {}".format(name))
+            profile = self.__profiles[name]
+
+        evicted_profiles = []
+        try:
+            # the lock of the profile is always taken before the one of the profile manager
+            with profile.locked():
+                with self.__lock:
+                    if self.__profiles.get(name) is not profile:
+                        raise ValueError("No profile named {}".format(name))
+                    profile.touch()
+                    self.__loaded_names[name] = True
+                    self.__loaded_names.move_to_end(name)
+                    evicted_profiles = self.__select_evicted_profiles(keep=name)
+                profile.load()
+                yield profile
+        finally:
+            for evicted_profile in evicted_profiles:
+                self.__unload_evicted(evicted_profile)
+            instrumentation.count("profiles_evicted", len(evicted_profiles))
+
+
+    def __unload_evicted(self, profile: Profile):
+        """ Unloading the evicted profile, unless another thread registered it again in the meantime. """
+
+        with profile.locked():
+            with self.__lock:
+                if profile.name in self.__loaded_names.keys():
+                    return
+            profile.unload()
+
+
+    def __select_evicted_profiles(self, keep: str = None) -> List[Profile]:
+        """ Removing the least recently used and the inactive profiles from the loaded ones and returning them. """
+
+        evicted_names = []
+        now = time.monotonic()
+        for name in self.__loaded_names.keys():
+            if name == keep:
+                continue
+            too_many = len(self.__loaded_names) - len(evicted_names) > self.__max_loaded_profiles
+            inactive = self.__max_idle_seconds is not None and now - self.__profiles[name].last_used > self.__max_idle_seconds
+            if too_many or inactive:
+                evicted_names.append(name)
+
+        for name in evicted_names:
+            del self.__loaded_names[name]
+        return [self.__profiles[name] for name in evicted_names]
+
+
+    def get_profile(self, name: str) -> Profile:
+        """ Returning the loaded profile with the given name, loading it if necessary. """
+
+        with self.__using_profile(name) as profile:
+            return profile
+
+
+    def evict_inactive_profiles(self) -> List[str]:
+        """
+        Unloading all profiles, which were not used for the maximum idle seconds.
+
+        Returns
+        -------
+        List[str]
+            names of the unloaded profiles
+        """
+
+        with self.__lock:
+            evicted_profiles = self.__select_evicted_profiles()
+        for profile in evicted_profiles:
+            self.__unload_evicted(profile)
+        return [profile.name for profile in evicted_profiles]
+
+
+    def __sync(self, name: str) -> str:
+        with instrumentation.span("sync_profile"), self.__using_profile(name) as profile:
+            profile.sync(self.__sync_days)
+        return name
+
+
+    def sync(self, name: str) -> Future:
+        """
+        Syncing the profile on one of the sync workers: polling the latest days and saving the changed ones.
+
+        Returns
+        -------
+        Future
+            resolving to the name of the profile once it is synced
+        """
+        if name not in self.get_profile_names():
+            raise ValueError("No profile named {}".format(name))
+        return self.__sync_executor.submit(self.__sync, name)
+
+
+    def sync_all(self, names: List[str] = None) -> List[Future]:
+        """ Syncing the profiles with the given names, all profiles if None, at most max_sync_workers at a time. """
+        if names is None:
+            names = self.get_profile_names()
+        return [self.sync(name) for name in names]
+
+
+    def shutdown(self, wait: bool = True):
+        """ Stopping the sync workers, unloading all profiles and stopping the exporter processes, if they were started by the profile manager. """
+
+        self.__sync_executor.shutdown(wait=wait)
+
+        with self.__lock:
+            loaded_profiles = [self.__profiles[name] for name in self.__loaded_names.keys()]
+            self.__loaded_names.clear()
+        for profile in loaded_profiles:
+            profile.unload()
+
+        if self.__owns_export_pool:
+            self.__export_pool.shutdown(wait=wait)
+        if self.__session is not None:
+            self.__session.close()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
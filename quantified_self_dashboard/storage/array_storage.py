@@ -0,0 +1,289 @@
+import os
+import re
+import json
+import threading
+from typing import List, Tuple, Union
+
+import numpy as np
+
+from storage.abstract_storage import AbstractStorage
+from summary.summary_container import SummaryContainer
+from common.constants import SummaryType, SUMMARY_DATE
+from common.date_helper import date_string_to_ordinal, date_strings_to_ordinals, ordinal_to_date_string
+from common import instrumentation
+from storage.storage_schema import get_measurement_dtype
+
+
+# dtypes of the measurement arrays by the dtype of the storage schema, missing values are NaN,
+# measurements without a float dtype in the schema, e.g. subjective ones, are stored as float64
+schema_dtype_array_dtypes = {
+    'float32': np.dtype('<f4'),
+    'float64': np.dtype('<f8'),
+}
+default_array_dtype = np.dtype('<f8')
+
+# name of the index file in the storage directory
+index_file_name = "index.json"
+
+
+def get_file_dtype(file_name: str) -> np.dtype:
+    """ Dtype of an array file by its extension, e.g. f4 for float32. """
+    return np.dtype('<' + file_name.rsplit('.', 1)[-1])
+
+
+class ArrayStorage(AbstractStorage):
+    """
+    Storing each numerical measurement as a flat array of the dtype of the storage schema in its own file,
+    with one value per day, at the position of its day ordinal minus the first ordinal of the storage.
+    The arrays are opened with np.memmap, so reading a date range only touches the pages of that range
+    and the memory does not depend on the length of the whole history.
+    Appending days only writes the new values at the end of the arrays.
+
+    Layout of the directory
+    -----------------------
+    index.json
+        {"first_ordinal": int, "measurements": {"sleep": {"score": "sleep.score.f4", ...}, ...}}
+    sleep.score.f4, ...
+        raw little endian values of the measurement, the extension is the dtype, e.g. f4 for float32,
+        its length is the number of stored days
+    """
+
+    def __init__(self, directory_path: List[str]):
+        """
+        Parameters
+        ----------
+        directory_path : List[str]
+            List of strings to the directory of the arrays, it is created if it does not exist.
+        """
+
+        super().__init__(directory_path)
+        self.__lock = threading.RLock()
+
+        # (summary type name, measurement name): np.memmap, opened at the first read
+        self.__memmaps = dict()
+
+        index_path_name = os.path.join(self._filename, index_file_name)
+        if os.path.exists(index_path_name):
+            with open(index_path_name) as f:
+                index = json.load(f)
+            self.__first_ordinal = index['first_ordinal']
+            self.__file_names = index['measurements']
+            for file_names in self.__file_names.values():
+                for file_name in file_names.values():
+                    if get_file_dtype(file_name) not in schema_dtype_array_dtypes.values():
+                        raise ValueError("Unsupported dtype of {} in the array storage".format(file_name))
+        else:
+            self.__first_ordinal = None
+            self.__file_names = dict()
+
+
+    def __write_index(self):
+        """ Writing the index into a temporary file first, so readers never see a partially written index. """
+
+        os.makedirs(self._filename, exist_ok=True)
+        index = {'first_ordinal': self.__first_ordinal, 'measurements': self.__file_names}
+        index_path_name = os.path.join(self._filename, index_file_name)
+        with open(index_path_name + ".tmp", 'w') as f:
+            json.dump(index, f, indent=4)
+        os.replace(index_path_name + ".tmp", index_path_name)
+
+
+    def __get_path_name(self, summary_type: SummaryType, measurement_name: str) -> str:
+        return os.path.join(self._filename, self.__file_names[summary_type.name][measurement_name])
+
+
+    def __get_dtype(self, summary_type: SummaryType, measurement_name: str) -> np.dtype:
+        return get_file_dtype(self.__file_names[summary_type.name][measurement_name])
+
+
+    def has_measurement(self, summary_type: SummaryType, measurement_name: str) -> bool:
+        return measurement_name in self.__file_names.get(summary_type.name, dict()).keys()
+
+
+    def get_measurement_names(self, summary_type: SummaryType) -> List[str]:
+        """ Returns the sorted names of all stored measurements of the summary type. """
+        return sorted(self.__file_names.get(summary_type.name, dict()).keys())
+
+
+    def get_date_range(self) -> Tuple[Union[str, None], Union[str, None]]:
+        """ First and last stored day in YYYY-MM-DD format, None if nothing is stored. """
+
+        if self.__first_ordinal is None:
+            return None, None
+        n_days = 0
+        for summary_type_name, file_names in self.__file_names.items():
+            for measurement_name in file_names.keys():
+                n_days = max(n_days, self.__get_length(SummaryType[summary_type_name], measurement_name))
+        if n_days == 0:
+            return None, None
+        return ordinal_to_date_string(self.__first_ordinal), ordinal_to_date_string(self.__first_ordinal + n_days - 1)
+
+
+    def get_available_ordinals(self, summary_type: SummaryType) -> np.array:
+        """ Sorted day ordinals with a value of any stored measurement of the summary type. """
+
+        available = None
+        for measurement_name in self.get_measurement_names(summary_type):
+            values = self.__get_memmap(summary_type, measurement_name)
+            if values is None:
+                continue
+            has_value = ~np.isnan(values)
+            if available is None:
+                available = has_value
+            else:
+                if len(has_value) > len(available):
+                    available, has_value = has_value, available
+                available[:len(has_value)] |= has_value
+
+        if available is None:
+            return np.array([], dtype=np.int64)
+        return np.flatnonzero(available).astype(np.int64) + self.__first_ordinal
+
+
+    def __get_length(self, summary_type: SummaryType, measurement_name: str) -> int:
+        """ Number of stored days of the measurement. """
+        return os.path.getsize(self.__get_path_name(summary_type, measurement_name)) // self.__get_dtype(summary_type, measurement_name).itemsize
+
+
+    def __get_memmap(self, summary_type: SummaryType, measurement_name: str) -> np.memmap:
+        """
+        Read only view of the whole array of the measurement, None if it is empty.
+        Callers trying to modify the returned values get a ValueError instead of changing the file.
+        """
+
+        key = (summary_type.name, measurement_name)
+        with self.__lock:
+            if key not in self.__memmaps.keys():
+                if self.__get_length(summary_type, measurement_name) == 0:
+                    return None
+                self.__memmaps[key] = np.memmap(self.__get_path_name(summary_type, measurement_name), dtype=self.__get_dtype(summary_type, measurement_name), mode='r')
+            return self.__memmaps[key]
+
+
+    def get_values(self, start: str, end: str, summary_type: SummaryType, measurement_name: str) -> np.array:
+        """
+        Returns one value for each date from start to end, NaN for days without a value.
+        If the date range is stored completely, the returned array is a read only slice of the memory mapped file
+        and nothing is copied.
+        """
+
+        if not self.has_measurement(summary_type, measurement_name):
+            raise AttributeError("No {}-{} avalable in the array storage".format(summary_type.name, measurement_name))
+
+        first = date_string_to_ordinal(start) - self.__first_ordinal
+        after_last = date_string_to_ordinal(end) - self.__first_ordinal + 1
+        n_days = after_last - first
+
+        values = self.__get_memmap(summary_type, measurement_name)
+        n_stored = len(values) if values is not None else 0
+
+        if 0 <= first and after_last <= n_stored:
+            return values[first:after_last].view(np.ndarray)
+
+        # partly outside of the stored days
+        padded = np.full(n_days, np.nan)
+        stored_first, stored_after_last = max(first, 0), min(after_last, n_stored)
+        if stored_first < stored_after_last:
+            padded[stored_first - first:stored_after_last - first] = values[stored_first:stored_after_last]
+        return padded
+
+
+    def save(self, container: SummaryContainer, dates: List[str] = None):
+        """
+        Writing the numerical measurements of the summaries in the container into the arrays.
+        Measurements which are not numerical, e.g. strings, are not stored.
+
+        Parameters
+        ----------
+        container : SummaryContainer
+            The summary container whos summaries will be saved.
+
+        dates : List[str]
+            If given, only the summaries of these days are written, e.g. the days changed by an update.
+            Otherwise all summaries are written.
+        """
+
+        with self.__lock, instrumentation.span("save_arrays"):
+            selected_ordinals = date_strings_to_ordinals(dates) if dates is not None else None
+
+            for summary_type in SummaryType:
+                summaries, ordinals = container.get_summaries_and_ordinals(summary_type)
+                if selected_ordinals is not None:
+                    selected = np.isin(ordinals, selected_ordinals)
+                    summaries = [summary for summary, is_selected in zip(summaries, selected) if is_selected]
+                    ordinals = ordinals[selected]
+                if len(summaries) == 0:
+                    continue
+
+                if self.__first_ordinal is None:
+                    self.__first_ordinal = int(ordinals[0])
+                elif ordinals[0] < self.__first_ordinal:
+                    self.__prepend_days(self.__first_ordinal - int(ordinals[0]))
+
+                measurement_names = set()
+                for summary in summaries:
+                    measurement_names.update(summary.measurement_attributes)
+                measurement_names.discard(SUMMARY_DATE)
+
+                positions = ordinals - self.__first_ordinal
+                for measurement_name in sorted(measurement_names):
+                    values = [getattr(summary, measurement_name, None) for summary in summaries]
+                    if not all(value is None or isinstance(value, (int, float, np.number)) for value in values):
+                        # e.g. strings
+                        continue
+                    self.__write_values(summary_type, measurement_name, positions, [np.nan if value is None else value for value in values])
+
+            self.__write_index()
+
+
+    def __write_values(self, summary_type: SummaryType, measurement_name: str, positions: np.array, values: List[float]):
+        """ Writing the values at the positions of the array of the measurement, extending it if necessary. """
+
+        if not self.has_measurement(summary_type, measurement_name):
+            dtype = schema_dtype_array_dtypes.get(get_measurement_dtype(summary_type, measurement_name), default_array_dtype)
+            file_name = "{}.{}.{}".format(summary_type.name, re.sub(r'[^A-Za-z0-9_-]', '_', measurement_name), dtype.str[1:])
+            self.__file_names.setdefault(summary_type.name, dict())[measurement_name] = file_name
+            os.makedirs(self._filename, exist_ok=True)
+            open(os.path.join(self._filename, file_name), 'wb').close()
+
+        path_name = self.__get_path_name(summary_type, measurement_name)
+        dtype = self.__get_dtype(summary_type, measurement_name)
+        values = np.array(values, dtype=dtype)
+        n_stored = self.__get_length(summary_type, measurement_name)
+        n_required = int(positions.max()) + 1
+
+        # the open memmap does not cover the changed file
+        self.__memmaps.pop((summary_type.name, measurement_name), None)
+
+        if n_required > n_stored:
+            # appending the new days, missing days in between are NaN
+            appended = np.full(n_required - n_stored, np.nan, dtype=dtype)
+            appending = positions >= n_stored
+            appended[positions[appending] - n_stored] = values[appending]
+            with open(path_name, 'ab') as f:
+                f.write(appended.tobytes())
+            positions, values = positions[~appending], values[~appending]
+
+        if len(positions) > 0:
+            stored = np.memmap(path_name, dtype=dtype, mode='r+')
+            stored[positions] = values
+            stored.flush()
+            del stored
+
+
+    def __prepend_days(self, n_days: int):
+        """ Moving the first ordinal n_days earlier, by rewriting all arrays with NaN in front. """
+
+        for summary_type_name, file_names in self.__file_names.items():
+            for measurement_name in file_names.keys():
+                path_name = self.__get_path_name(SummaryType[summary_type_name], measurement_name)
+                padding = np.full(n_days, np.nan, dtype=self.__get_dtype(SummaryType[summary_type_name], measurement_name)).tobytes()
+                with open(path_name, 'rb') as f:
+                    content = f.read()
+                with open(path_name + ".tmp", 'wb') as f:
+                    f.write(padding)
+                    f.write(content)
+                os.replace(path_name + ".tmp", path_name)
+
+        self.__memmaps.clear()
+        self.__first_ordinal -= n_days
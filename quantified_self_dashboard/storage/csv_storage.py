@@ -1,31 +1,52 @@
-from typing import List
-import pandas as pd
+import os
+from typing import List, Union
 from storage.abstract_storage import AbstractStorage
 from summary.summary_container import SummaryContainer
 from common.constants import SUMMARY_DATE
+from common.lazy_import import LazyModule
+from common import instrumentation
+from storage.storage_schema import read_storage_csv, get_storage_csv_compression, storage_csv_compressions
+
+# only imported when saving
+pd = LazyModule('pandas')
 
 
 class CsvStorage(AbstractStorage):
-    """ Class for saving data in a simple csv file. """
+    """
+    Class for saving data in a simple csv file, compressed by its extension, e.g. data.csv.gz.
+    Saving changed days of an uncompressed file appends their rows, the latest row of a day replaces the earlier ones.
+    The file is rewritten without the replaced rows, once it contains enough of them.
+    """
 
     # delimiter of the csv file
     __delimiter = ';'
 
-    def __init__(self, file_path: List[str]):
+    def __init__(self, file_path: List[str], compact_after_rows: int = 1000):
         """
         Parameters
         ----------
         file_path : List[str]
             List of strings to the filepath, where the 
             storage csv file is located.
+            Files ending with .csv.gz or .csv.zst are compressed.
+
+        compact_after_rows : int
+            Number of replaced rows in the file, after which the next save of changed days rewrites the whole file.
         """
 
         super().__init__(file_path)
-        if not self._filename.endswith('.csv'):
-            raise ValueError("Filename for CsvStorage must end with .csv")
+        try:
+            self.__compression = get_storage_csv_compression(self._filename)
+        except ValueError:
+            raise ValueError("Filename for CsvStorage must end with {}".format(", ".join(storage_csv_compressions.keys())))
 
+        self.__compact_after_rows = compact_after_rows
+        # upper bound of the replaced rows in the file, counted in the file at the first save of changed days,
+        # so restarts and new instances for the same file keep compacting it
+        self.__n_replaced_rows = None
 
-    def save(self, container: SummaryContainer, extend=True):
+
+    def save(self, container: SummaryContainer, extend=True, dates: List[str] = None) -> int:
         """
         Saving all data from the container in the csv file.
 
@@ -33,26 +54,110 @@ class CsvStorage(AbstractStorage):
         ----------
         container : SummaryContainer
             The summary container whos summaries will be saved.
+
+        dates : List[str]
+            If given, only the rows of these days are taken from the container,
+            replacing the stored values of these days, e.g. the days changed by an update.
+            They are appended to an uncompressed file, if it has columns for all their values.
+            Otherwise all days are taken, but the stored values are kept.
+
+        Returns
+        -------
+        int
+            number of rows written
         """
 
-        container_bundle = container.get_dict_of_bundles()
+        if dates is not None and len(dates) == 0:
+            return 0
+        if dates is not None and self.__n_replaced_rows is None:
+            self.__n_replaced_rows = self.__count_replaced_rows()
+        if dates is not None and self.__n_replaced_rows + len(dates) <= self.__compact_after_rows:
+            n_appended_rows = self.__append(container, dates)
+            if n_appended_rows is not None:
+                return n_appended_rows
+
+        if dates is None:
+            container_bundle = container.get_dict_of_bundles()
+        else:
+            container_bundle = {index: container.get_summary_bundle_of_date(date) for index, date in enumerate(dates)}
         container_data = pd.DataFrame.from_dict(container_bundle, orient='index')
         container_data.set_index(SUMMARY_DATE, inplace=True)
 
         try:
-            existing_data = pd.read_csv(self._filename, sep=self.__delimiter)
+            existing_data = read_storage_csv(self._filename, self.__delimiter)
+            # only keeping the latest appended row of each day
+            existing_data = existing_data.drop_duplicates(subset=SUMMARY_DATE, keep='last')
             existing_data.set_index(SUMMARY_DATE, inplace=True)
             
-            combined_data = existing_data.combine_first(container_data)
-        except:
+            if dates is None:
+                combined_data = existing_data.combine_first(container_data)
+            else:
+                combined_data = container_data.combine_first(existing_data)
+        except (FileNotFoundError, pd.errors.EmptyDataError):
+            # nothing stored yet, any other error would replace the stored days with only the given ones
             combined_data = container_data
 
         # removing unnamed columns
         # TODO: check this
         combined_data.loc[:,~combined_data.columns.str.match(r'Unnamed.*')]
 
-        # TODO: add try catch
-        combined_data.to_csv(self._filename, sep=self.__delimiter)
+        # writing a temporary file first, an interrupted write would make a whole compressed file unreadable
+        temporary_filename = self._filename + ".tmp"
+        combined_data.to_csv(temporary_filename, sep=self.__delimiter, compression=self.__compression)
+        os.replace(temporary_filename, self._filename)
+        self.__n_replaced_rows = 0
+        instrumentation.count("csv_rows_rewritten", len(combined_data))
+        return len(combined_data)
+
+
+    def __count_replaced_rows(self) -> int:
+        """ Number of rows in the file with a later row of the same day, only reading the date column. """
+
+        try:
+            dates = pd.read_csv(self._filename, sep=self.__delimiter, usecols=[SUMMARY_DATE], compression=self.__compression)[SUMMARY_DATE]
+        except (FileNotFoundError, pd.errors.EmptyDataError, ValueError):
+            return 0
+        return int(dates.duplicated().sum())
+
+
+    def __append(self, container: SummaryContainer, dates: List[str]) -> Union[int, None]:
+        """
+        Appending the rows of the days to the file, in the order of its columns.
+        Returns the number of appended rows, None if the file has to be rewritten instead:
+        if it is compressed, where an interrupted append would make the whole file unreadable,
+        if it does not exist yet or if it has no column for some value.
+        """
+
+        if self.__compression is not None or not os.path.exists(self._filename):
+            return None
+
+        try:
+            stored_columns = list(pd.read_csv(self._filename, sep=self.__delimiter, nrows=0).columns)
+        except (ValueError, pd.errors.EmptyDataError):
+            return None
+        if len(stored_columns) == 0 or stored_columns[0] != SUMMARY_DATE:
+            return None
+
+        rows = pd.DataFrame.from_dict({index: container.get_summary_bundle_of_date(date) for index, date in enumerate(dates)}, orient='index')
+        rows.set_index(SUMMARY_DATE, inplace=True)
+        if not set(rows.columns).issubset(stored_columns[1:]):
+            return None
+        rows = rows.reindex(columns=stored_columns[1:])
+
+        # completing a row torn by an interrupted append first, so the new rows do not get glued onto it
+        with open(self._filename, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            needs_line_break = f.read(1) != b"\n"
+
+        with open(self._filename, 'a', newline='') as f:
+            if needs_line_break:
+                f.write("\n")
+            rows.to_csv(f, sep=self.__delimiter, header=False)
+            f.flush()
+            os.fsync(f.fileno())
+        self.__n_replaced_rows += len(rows)
+        instrumentation.count("csv_rows_appended", len(rows))
+        return len(rows)
 
         
         
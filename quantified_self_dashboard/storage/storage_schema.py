@@ -0,0 +1,122 @@
+from typing import Iterator, Union
+
+from common.constants import SummaryType
+from common.lazy_import import LazyModule
+from common import instrumentation
+from analyser.transform_measurements import summary_type_transform
+
+# only imported when a storage file gets read
+pd = LazyModule('pandas')
+
+
+# extensions of storage csv files and the compression of their content,
+# zstd needs the optional zstandard package
+storage_csv_compressions = {
+    '.csv': None,
+    '.csv.gz': 'gzip',
+    '.csv.zst': 'zstd',
+}
+
+# Dtypes of the stored measurements, derived from the original types in the transform tables.
+# Integer measurements are stored as float32, which keeps NaN for missing days
+# and represents all integers up to 2**24 exactly, e.g. seconds of a day, steps or calories.
+# Float measurements stay float64, so their decimal values are written back unchanged.
+original_type_dtypes = {
+    int: 'float32',
+    float: 'float64',
+}
+
+# measurements which are not in the transform tables, but have a known dtype
+additional_measurement_dtypes = {
+    SummaryType.sleep: {
+        'timezone': 'float32',
+    },
+    SummaryType.bedtime: {
+        # only a few distinct strings
+        'status': 'category',
+    },
+}
+
+
+def get_storage_column_name(summary_type: SummaryType, measurement_name: str) -> str:
+    """ Name of the column of the measurement in storage files, e.g. sleep_score. """
+    return "{}_{}".format(summary_type.name, measurement_name)
+
+
+def get_measurement_dtype(summary_type: SummaryType, measurement_name: str) -> Union[str, None]:
+    """ Dtype of the stored measurement, None if it is unknown and has to be inferred. """
+
+    if measurement_name in additional_measurement_dtypes.get(summary_type, dict()).keys():
+        return additional_measurement_dtypes[summary_type][measurement_name]
+
+    transform = summary_type_transform.get(summary_type, dict())
+    if measurement_name not in transform.keys():
+        return None
+
+    original_type = transform[measurement_name][1]
+    return original_type_dtypes.get(original_type, None)
+
+
+def get_storage_column_dtypes() -> dict:
+    """
+    Dtypes of all storage columns with a known dtype, as used by pd.read_csv.
+    Columns which are not contained, e.g. subjective measurements, are inferred while reading.
+    """
+
+    column_dtypes = dict()
+    for summary_type, transform in summary_type_transform.items():
+        for measurement_name in list(transform.keys()) + list(additional_measurement_dtypes.get(summary_type, dict()).keys()):
+            dtype = get_measurement_dtype(summary_type, measurement_name)
+            if dtype is not None:
+                column_dtypes[get_storage_column_name(summary_type, measurement_name)] = dtype
+    return column_dtypes
+
+
+def get_storage_csv_compression(filename: str) -> Union[str, None]:
+    """ Compression of the storage csv file by its extension, None for an uncompressed file. """
+
+    for extension, compression in storage_csv_compressions.items():
+        if filename.endswith(extension):
+            return compression
+    raise ValueError("Filename of a storage csv file must end with {}".format(", ".join(storage_csv_compressions.keys())))
+
+
+def read_storage_csv(filename: str, delimiter: str) -> 'pd.DataFrame':
+    """
+    Reading a storage csv file with the dtypes of the storage schema.
+    If a column does not match its dtype, e.g. a value was edited by hand,
+    the file is read again with inferred dtypes.
+    """
+
+    compression = get_storage_csv_compression(filename)
+    try:
+        return pd.read_csv(filename, sep=delimiter, dtype=get_storage_column_dtypes(), compression=compression)
+    except (ValueError, TypeError):
+        instrumentation.count("csv_schema_mismatches", 1)
+        return pd.read_csv(filename, sep=delimiter, compression=compression)
+
+
+def read_storage_csv_chunks(filename: str, delimiter: str, chunksize: int = None) -> Iterator['pd.DataFrame']:
+    """
+    Reading a storage csv file the same way as read_storage_csv, but yielding DataFrames of at most chunksize rows.
+    Without a chunksize, the whole file is yielded as one DataFrame.
+    If a chunk does not match the dtypes, the remaining chunks are read again with inferred dtypes.
+    """
+
+    if chunksize is None:
+        yield read_storage_csv(filename, delimiter)
+        return
+
+    compression = get_storage_csv_compression(filename)
+    n_yielded = 0
+    try:
+        with pd.read_csv(filename, sep=delimiter, dtype=get_storage_column_dtypes(), compression=compression, chunksize=chunksize) as reader:
+            for chunk in reader:
+                yield chunk
+                n_yielded += 1
+    except (ValueError, TypeError):
+        instrumentation.count("csv_schema_mismatches", 1)
+        with pd.read_csv(filename, sep=delimiter, compression=compression, chunksize=chunksize) as reader:
+            for i, chunk in enumerate(reader):
+                if i >= n_yielded:
+                    yield chunk
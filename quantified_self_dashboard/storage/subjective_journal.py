@@ -0,0 +1,146 @@
+import os
+import json
+import zlib
+import threading
+from typing import Iterator, List, Tuple
+
+from common.constants import SUMMARY_DATE
+from common import instrumentation
+
+
+class SubjectiveJournal:
+    """
+    Append only journal of the subjective inputs of the GUI.
+    Each input is written to the disk as soon as it is made, without rewriting the storage file.
+    The storage file takes the inputs over with the next save, after which they are discarded from the journal.
+
+    Each line is one record, the crc32 of the json content as 8 hex digits, a space and the json content:
+    0f3c2a1b {"a":true,"b":3,"c":40,"summary_date":"2021-03-01"}
+    Records torn by a crash are detected by their checksum and skipped when reading,
+    later records of the same day replace earlier ones.
+    """
+
+    def __init__(self, file_path: List[str], fsync: bool = False):
+        """
+        Parameters
+        ----------
+        file_path : List[str]
+            List of strings to the journal file, it is created with the first input.
+
+        fsync : bool
+            Whether each record is synced to the disk before returning,
+            otherwise it is only flushed to the operating system, which survives crashes of the application.
+        """
+
+        self._filename = os.path.join(os.getcwd(), *file_path)
+        self.__fsync = fsync
+        self.__lock = threading.Lock()
+
+        # opened for appending with the first record
+        self.__file = None
+
+
+    def __open(self):
+        """ Opening the journal for appending, completing a torn last record with a line break first. """
+
+        os.makedirs(os.path.dirname(self._filename), exist_ok=True)
+        needs_line_break = False
+        if os.path.exists(self._filename) and os.path.getsize(self._filename) > 0:
+            with open(self._filename, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                needs_line_break = f.read(1) != b"\n"
+
+        self.__file = open(self._filename, 'a', encoding='utf-8')
+        if needs_line_break:
+            self.__file.write("\n")
+
+
+    def append(self, summary_date: str, input_data: dict):
+        """ Appending the subjective input of the day as one record. """
+
+        content = dict(input_data)
+        content[SUMMARY_DATE] = summary_date
+        payload = json.dumps(content, separators=(',', ':'), sort_keys=True)
+        record = "{:08x} {}\n".format(zlib.crc32(payload.encode('utf-8')), payload)
+
+        with self.__lock:
+            if self.__file is None:
+                self.__open()
+            self.__file.write(record)
+            self.__file.flush()
+            if self.__fsync:
+                os.fsync(self.__file.fileno())
+        instrumentation.count("journal_records", 1)
+
+
+    def __iterate_records(self) -> Iterator[Tuple[str, dict]]:
+        """ Yielding the summary date and the input of all valid records in the order they were written. """
+
+        if not os.path.exists(self._filename):
+            return
+
+        with open(self._filename, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    checksum, payload = line.rstrip("\n").split(" ", 1)
+                    if int(checksum, 16) != zlib.crc32(payload.encode('utf-8')):
+                        raise ValueError()
+                    content = json.loads(payload)
+                    summary_date = content[SUMMARY_DATE]
+                except (ValueError, KeyError, TypeError):
+                    # torn or damaged record
+                    instrumentation.count("journal_invalid_records", 1)
+                    continue
+                yield summary_date, content
+
+
+    def read(self) -> dict:
+        """ Returns the latest input of each day in the journal by its date in YYYY-MM-DD format. """
+
+        with self.__lock:
+            if self.__file is not None:
+                self.__file.flush()
+            return {summary_date: content for summary_date, content in self.__iterate_records()}
+
+
+    def get_position(self) -> int:
+        """ Position after the last written record, e.g. to discard the records up to it after a save. """
+
+        with self.__lock:
+            if self.__file is not None:
+                self.__file.flush()
+            return os.path.getsize(self._filename) if os.path.exists(self._filename) else 0
+
+
+    def discard_until(self, position: int):
+        """
+        Discarding all records before the position, after the storage file took them over.
+        Records written after the position are kept.
+        """
+
+        with self.__lock:
+            if self.__file is not None:
+                self.__file.close()
+                self.__file = None
+
+            if not os.path.exists(self._filename):
+                return
+
+            with open(self._filename, 'rb') as f:
+                f.seek(position)
+                remaining = f.read()
+
+            # replacing the file at once, so a crash never loses the remaining records
+            temporary_filename = self._filename + ".tmp"
+            with open(temporary_filename, 'wb') as f:
+                f.write(remaining)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporary_filename, self._filename)
+
+
+    def close(self):
+        with self.__lock:
+            if self.__file is not None:
+                self.__file.close()
+                self.__file = None
@@ -1,3 +1,6 @@
+import math
+from typing import List, Union
+
 from connector.abstract_connector import AbstractConnector
 from common.constants import SummaryType, SubjectiveMeasurementType, SUMMARY_DATE
 
@@ -112,4 +115,36 @@ def get_summary_class_from_type(summary_type: SummaryType):
         SummaryType.subjective: Subjective
     }
 
-    return str_to_class[summary_type]
\ No newline at end of file
+    return str_to_class[summary_type]
+
+def is_nan(value) -> bool:
+    """ Whether the value is NaN, including numpy floats, e.g. float32 values read from a storage file. """
+    try:
+        return math.isnan(value)
+    except TypeError:
+        return False
+
+
+def get_changed_measurement_names(old_summary: Union[Summary, None], new_summary: Summary) -> List[str]:
+    """
+    Names of the measurements whose values differ between the two summaries of the same day,
+    including measurements only one of them has. All measurements are changed, if there is no old summary.
+    NaN values are equal to each other, e.g. a missing value read from a csv file.
+    """
+
+    new_values = {name: getattr(new_summary, name) for name in new_summary.measurement_attributes if name != SUMMARY_DATE}
+    if old_summary is None:
+        return list(new_values.keys())
+
+    old_values = {name: getattr(old_summary, name) for name in old_summary.measurement_attributes if name != SUMMARY_DATE}
+
+    changed = []
+    for name in sorted(set(old_values.keys()) | set(new_values.keys())):
+        if name not in old_values.keys() or name not in new_values.keys():
+            changed.append(name)
+            continue
+        old_value, new_value = old_values[name], new_values[name]
+        both_nan = is_nan(old_value) and is_nan(new_value)
+        if old_value != new_value and not both_nan:
+            changed.append(name)
+    return changed
@@ -1,11 +1,14 @@
-from typing import List, Union
+from typing import Callable, List, Tuple, Union
 import datetime
 import numpy as np
 
-from summary.summary import Summary, get_summary_class_from_type
+from summary.summary import Summary, get_summary_class_from_type, get_changed_measurement_names
 from common.constants import SummaryType, SUMMARY_DATE
-from common.date_helper import all_date_strings_between_dates, is_date_within_range, datetime_to_simple_iso
+from common.date_helper import all_date_strings_between_dates, datetime_to_simple_iso, date_string_to_ordinal, date_strings_to_ordinals, ordinal_to_date_string, ordinals_to_date_strings
+from common.month_day_index import MonthDayIndex
+from common.read_write_lock import ReadWriteLock
 from connector.abstract_connector import AbstractConnector
+from common import instrumentation
 
 
 class SummaryContainer:
@@ -57,6 +60,19 @@ class SummaryContainer:
 
         self.__prepare_attributes(containing)
 
+        # optional memory mapped arrays of the numerical measurements, e.g. an ArrayStorage
+        self.__measurement_arrays = None
+        # last day of the arrays, and the sorted day ordinals with values in the arrays of each summary type
+        self.__array_end_ordinal = None
+        self.__array_ordinals = dict()
+
+        # called with the summary type and the day ordinals of newly added summaries
+        self.__load_listeners = []
+
+        # loads and updates replace the summaries and their ordinals while no reading method runs,
+        # so the summaries of a reader always match their ordinals, e.g. while the GUI saves on a background thread
+        self.__lock = ReadWriteLock()
+
 
     def add_storage_connector(self, conn):
         self.__storage_connectors.append(conn)
@@ -67,6 +83,63 @@ class SummaryContainer:
     def add_api_connector(self, conn):
         self.__api_connectors.append(conn)
 
+    def add_load_listener(self, listener: Callable[[SummaryType, np.array], None]):
+        """
+        Registering a function which is called with the summary type and the day ordinals
+        of the summaries added by each load or update, e.g. to keep an index of the available days up to date.
+        It is called from the thread loading the container.
+        """
+        self.__load_listeners.append(listener)
+
+    def __notify_load_listeners(self, summary_type: SummaryType, added_ordinals: np.array):
+        if len(added_ordinals) == 0:
+            return
+        for listener in self.__load_listeners:
+            listener(summary_type, added_ordinals)
+
+    def reading(self):
+        """
+        Context manager holding off loads and updates,
+        e.g. so all values of an analysis come from the same state of the container.
+        """
+        return self.__lock.reading()
+
+    def set_measurement_arrays(self, arrays):
+        """
+        Reading numerical values from the given arrays instead of the summary objects, e.g. an ArrayStorage.
+        load() writes the added days and update() the changed days into them,
+        so setting them before the first load fills them with all loaded days.
+
+        Days which already have values in the arrays are not loaded again,
+        so no summary objects are kept for them and their non numerical measurements, e.g. strings, are not available.
+        Storage connectors are only preloaded from the day after the last day of the arrays.
+        """
+
+        with self.__lock.writing():
+            self.__measurement_arrays = arrays
+            self.__array_end_ordinal = None
+            self.__array_ordinals = dict()
+            if arrays is None:
+                return
+
+            _, array_end = arrays.get_date_range()
+            if array_end is None:
+                return
+            self.__array_end_ordinal = date_string_to_ordinal(array_end)
+
+            for summary_type, required_dates_attr in zip(self.__contained_summaries, self.__summary_required_dates_attribute_names):
+                array_ordinals = arrays.get_available_ordinals(summary_type)
+                self.__array_ordinals[summary_type] = array_ordinals
+                if len(array_ordinals) == 0:
+                    continue
+
+                # only the days without values in the arrays are still required
+                stored = set(array_ordinals.tolist())
+                setattr(self, required_dates_attr, [date for date in getattr(self, required_dates_attr) if date_string_to_ordinal(date) not in stored])
+
+                if summary_type == SummaryType.subjective:
+                    self.__missing_subjective_data_days.remove_ordinals(array_ordinals.tolist())
+
     def __prepare_attributes(self, containing: List[bool]):
         """
         Preparing dynamic attributes depending on the containing summary types for loading.
@@ -107,11 +180,21 @@ class SummaryContainer:
         for container_attribute_name in self.__summary_container_attribute_names:
             setattr(self, container_attribute_name, [])   
 
+        # sorted day ordinals of the loaded summaries of each summary type, 
+        # in the same order as the summaries in the container attributes
+        self.__summary_ordinals = dict()
+        for summary_type in self.__contained_summaries:
+            self.__summary_ordinals[summary_type] = np.array([], dtype=np.int64)
+
         # filling the required dates helper atrributes with all dates from the starting date until today
         self.__dates = all_date_strings_between_dates(self.__starting_date, datetime_to_simple_iso(datetime.datetime.today()))
         for required_date_attribute_name in self.__summary_required_dates_attribute_names:
             setattr(self, required_date_attribute_name, self.__dates)   
 
+        # days without subjective data, kept up to date by each load and update
+        # instead of comparing all dates with the subjective summaries for each query
+        self.__missing_subjective_data_days = MonthDayIndex(date_strings_to_ordinals(self.__dates).tolist())
+
 
     def __load_via_connector(self, connector: AbstractConnector):
         """
@@ -163,18 +246,24 @@ class SummaryContainer:
             
             # updating required dates for the connector
             setattr(self, required_dates_attr, still_required_dates)
+            instrumentation.count("days_loaded.{}.{}".format(connector.__class__.__name__, summary_type.name), len(new_summary_objects))
 
             # adding newly loaded objects
             setattr(self, container_attr, new_summary_objects + old_summary_objects)
         
 
     def preload(self):
-        for storage_conn in self.__storage_connectors:
-            storage_conn.preload()
+        with instrumentation.span("preload"):
+            # the stored days until the end of the measurement arrays are not loaded again
+            storage_start = ordinal_to_date_string(self.__array_end_ordinal + 1) if self.__array_end_ordinal is not None else None
+            for storage_conn in self.__storage_connectors:
+                with instrumentation.span(storage_conn.__class__.__name__):
+                    storage_conn.preload(start=storage_start)
 
-        # TODO add threads
-        for api_conn in self.__api_connectors:
-            api_conn.preload(everything=True)
+            # TODO add threads
+            for api_conn in self.__api_connectors:
+                with instrumentation.span(api_conn.__class__.__name__):
+                    api_conn.preload(everything=True)
 
 
     def load(self) -> bool: 
@@ -190,17 +279,146 @@ class SummaryContainer:
 
         
 
-        # letting each connector try to load as many of the required summaries
-        for conn in self.__storage_connectors + self.__api_connectors + self.__user_connectors:
-            self.__load_via_connector(conn)
+        with self.__lock.writing():
+            # letting each connector try to load as many of the required summaries
+            with instrumentation.span("load"):
+                for conn in self.__storage_connectors + self.__api_connectors + self.__user_connectors:
+                    with instrumentation.span(conn.__class__.__name__):
+                        self.__load_via_connector(conn)
+
+            # sorting by date and indexing the summaries by their day ordinals
+            all_added_ordinals = []
+            for summary_type in self.__contained_summaries:
+                container_attr_name = self.__get_container_attribute_name(summary_type)
+                container_of_type = getattr(self, container_attr_name)
+
+                ordinals = date_strings_to_ordinals([s.summary_date for s in container_of_type])
+                order = np.argsort(ordinals, kind='stable')
+                setattr(self, container_attr_name, [container_of_type[i] for i in order])
+                added_ordinals = np.setdiff1d(ordinals, self.__summary_ordinals[summary_type])
+                self.__summary_ordinals[summary_type] = ordinals[order]
+
+                if summary_type == SummaryType.subjective:
+                    self.__missing_subjective_data_days.remove_ordinals(added_ordinals.tolist())
+                self.__notify_load_listeners(summary_type, added_ordinals)
+                all_added_ordinals.append(added_ordinals)
+
+            # loads only add summaries, so only the added days need to be written into the arrays
+            if self.__measurement_arrays is not None:
+                added_ordinals = np.unique(np.concatenate(all_added_ordinals)) if len(all_added_ordinals) > 0 else []
+                if len(added_ordinals) > 0:
+                    self.__measurement_arrays.save(self, dates=ordinals_to_date_strings(added_ordinals))
+
+
+    def update(self, connector: AbstractConnector, dates: List[str]) -> dict:
+        """
+        Loading the summaries of the given dates from the connector again and merging them into the loaded ones,
+        e.g. the latest days polled from the api while the container stays loaded.
+        Loaded summaries are replaced, summaries the connector does not have are kept.
+        Dates after the last day of the container extend it.
 
-        # sorting by date
-        # assuming the dates are ordered lexicographically
-        for summary_type in self.__contained_summaries:
-            container_attr_name = self.__get_container_attribute_name(summary_type)
-            container_of_type = getattr(self, container_attr_name)
-            sorted_container = sorted(container_of_type, key=lambda s: s.summary_date)
-            setattr(self, container_attr_name, sorted_container)
+        Parameters
+        ----------
+        connector : AbstractConnector
+            Preloaded connector to load the summaries from.
+
+        dates : List[str]
+            Days to load in YYYY-MM-DD format.
+
+        Returns
+        -------
+        dict
+            of the (summary type, measurement name) tuples whose values changed
+            to np.arrays of the day ordinals they changed at
+        """
+
+        with self.__lock.writing():
+            ordinals = date_strings_to_ordinals(dates)
+            if len(ordinals) == 0:
+                return dict()
+
+            # extending the days of the container until the last given day
+            last_ordinal = date_string_to_ordinal(self.__dates[-1]) if len(self.__dates) > 0 else date_string_to_ordinal(self.__starting_date) - 1
+            if ordinals.max() > last_ordinal:
+                new_dates = ordinals_to_date_strings(np.arange(last_ordinal + 1, ordinals.max() + 1))
+                self.__dates = self.__dates + new_dates
+                self.__missing_subjective_data_days.add_ordinals(range(last_ordinal + 1, ordinals.max() + 1))
+                for required_date_attribute_name in self.__summary_required_dates_attribute_names:
+                    setattr(self, required_date_attribute_name, getattr(self, required_date_attribute_name) + new_dates)
+
+            changes = dict()
+            for summary_type, container_attr, required_dates_attr in zip(self.__contained_summaries, self.__summary_container_attribute_names, self.__summary_required_dates_attribute_names):
+                if summary_type not in connector.supported_summary_types:
+                    continue
+
+                summary_class = get_summary_class_from_type(summary_type)
+                # replacing summaries in a copy, lists returned to readers before stay unchanged
+                summaries = list(getattr(self, container_attr))
+                summary_ordinals = self.__summary_ordinals[summary_type]
+
+                loaded_dates = []
+                added_summaries, added_ordinals = [], []
+                for date, ordinal in zip(dates, ordinals.tolist()):
+                    summary_obj = summary_class()
+                    if not summary_obj.load(connector, date):
+                        continue
+                    loaded_dates.append(date)
+
+                    position = np.searchsorted(summary_ordinals, ordinal)
+                    if position < len(summary_ordinals) and summary_ordinals[position] == ordinal:
+                        old_summary_obj = summaries[position]
+                        summaries[position] = summary_obj
+                    else:
+                        old_summary_obj = None
+                        added_summaries.append(summary_obj)
+                        added_ordinals.append(ordinal)
+
+                    for measurement_name in get_changed_measurement_names(old_summary_obj, summary_obj):
+                        changes.setdefault((summary_type, measurement_name), []).append(ordinal)
+
+                instrumentation.count("days_updated.{}.{}".format(connector.__class__.__name__, summary_type.name), len(loaded_dates))
+
+                if len(loaded_dates) > 0:
+                    loaded_dates = set(loaded_dates)
+                    setattr(self, required_dates_attr, [date for date in getattr(self, required_dates_attr) if date not in loaded_dates])
+
+                # sorting the added summaries in
+                if len(added_summaries) > 0:
+                    summaries = summaries + added_summaries
+                    summary_ordinals = np.concatenate([summary_ordinals, np.asarray(added_ordinals, dtype=np.int64)])
+                    order = np.argsort(summary_ordinals, kind='stable')
+                    setattr(self, container_attr, [summaries[i] for i in order])
+                    self.__summary_ordinals[summary_type] = summary_ordinals[order]
+                    if summary_type == SummaryType.subjective:
+                        self.__missing_subjective_data_days.remove_ordinals(added_ordinals)
+                    self.__notify_load_listeners(summary_type, np.asarray(added_ordinals, dtype=np.int64))
+                elif len(loaded_dates) > 0:
+                    setattr(self, container_attr, summaries)
+
+            if self.__measurement_arrays is not None and len(changes) > 0:
+                changed_ordinals = np.unique(np.concatenate([np.asarray(o, dtype=np.int64) for o in changes.values()]))
+                self.__measurement_arrays.save(self, dates=ordinals_to_date_strings(changed_ordinals))
+
+            return {key: np.asarray(changed_ordinals, dtype=np.int64) for key, changed_ordinals in changes.items()}
+
+
+    def get_latest_summary_date(self, summary_type: SummaryType) -> Union[str, None]:
+        """ Returns the latest date with a loaded summary or values in the measurement arrays of the summary type, None if there is none. """
+        with self.__lock.reading():
+            ordinals = self.get_available_ordinals(summary_type)
+            if len(ordinals) == 0:
+                return None
+            return ordinal_to_date_string(int(ordinals[-1]))
+
+
+    def get_available_ordinals(self, summary_type: SummaryType) -> np.array:
+        """ Returns the sorted day ordinals with a loaded summary or values in the measurement arrays of the summary type. """
+        with self.__lock.reading():
+            ordinals = self.__summary_ordinals.get(summary_type, np.array([], dtype=np.int64))
+            array_ordinals = self.__array_ordinals.get(summary_type)
+            if array_ordinals is None or len(array_ordinals) == 0:
+                return ordinals
+            return np.union1d(ordinals, array_ordinals)
 
 
     def __get_container_attribute_name(self, summary_type: SummaryType) -> str:
@@ -211,28 +429,54 @@ class SummaryContainer:
         return None
     
 
+    def __get_index_range(self, summary_type: SummaryType, start_ordinal: int, end_ordinal: int) -> Tuple[int, int]:
+        """ Helper method to get the positions of the first and after the last summary within the timerange, by binary search. """
+        ordinals = self.__summary_ordinals[summary_type]
+        first = np.searchsorted(ordinals, start_ordinal, side='left')
+        after_last = np.searchsorted(ordinals, end_ordinal, side='right')
+        return first, after_last
+
+
     def get_summary_of_date(self, summary_type: SummaryType, date: str) -> Union[Summary, None]:
         """ Returns the summary object with the given summary type and date if its contained. """
-        cont_attr_name = self.__get_container_attribute_name(summary_type)
-        if cont_attr_name:
-            container_of_type = getattr(self, cont_attr_name)
-            filtered = list(filter(lambda s: s.summary_date == date, container_of_type))
-            if len(filtered) > 0:
-                return filtered[0]
-        return None
+        with self.__lock.reading():
+            cont_attr_name = self.__get_container_attribute_name(summary_type)
+            if cont_attr_name:
+                ordinal = date_string_to_ordinal(date)
+                first, after_last = self.__get_index_range(summary_type, ordinal, ordinal)
+                if first < after_last:
+                    return getattr(self, cont_attr_name)[first]
+            return None
 
 
     def get_summaries_within_timerange(self, summary_type: SummaryType, start: str, end: str) -> Union[List[Summary], None]:
         """ Returns a List of all summary objects with the given summary type within the timerange if contained. """
+        with self.__lock.reading():
+            summaries, _ = self.__get_summaries_and_ordinals_within_timerange(summary_type, date_string_to_ordinal(start), date_string_to_ordinal(end))
+            if len(summaries) > 0:
+                return summaries
+            return None
+
+
+    def __get_summaries_and_ordinals_within_timerange(self, summary_type: SummaryType, start_ordinal: int, end_ordinal: int) -> Tuple[List[Summary], np.array]:
+        """ Helper method returning the summary objects within the timerange and their day ordinals. """
         cont_attr_name = self.__get_container_attribute_name(summary_type)
-        if cont_attr_name:
-            container_of_type = getattr(self, cont_attr_name)
-            filtered = list(filter(lambda s: is_date_within_range(s.summary_date, start, end), container_of_type))
-            if len(filtered) > 0:
-                return filtered
-        return None
+        if not cont_attr_name:
+            return [], np.array([], dtype=np.int64)
+
+        first, after_last = self.__get_index_range(summary_type, start_ordinal, end_ordinal)
+        return getattr(self, cont_attr_name)[first:after_last], self.__summary_ordinals[summary_type][first:after_last]
 
 
+
+    def get_summaries_and_ordinals(self, summary_type: SummaryType) -> Tuple[List[Summary], np.array]:
+        """ Returns all loaded summary objects of the summary type sorted by date, and their day ordinals. """
+        with self.__lock.reading():
+            cont_attr_name = self.__get_container_attribute_name(summary_type)
+            if not cont_attr_name:
+                return [], np.array([], dtype=np.int64)
+            return getattr(self, cont_attr_name), self.__summary_ordinals[summary_type]
+
     
     def get_dict_of_bundles(self) -> dict[int, dict]:
         """
@@ -241,11 +485,12 @@ class SummaryContainer:
         The keys of the outer dictionary are indices.
         """
 
-        data = dict()
-        for index, date in enumerate(self.__dates):
-            bundle = self.get_summary_bundle_of_date(date)
-            data[index] = bundle
-        return data
+        with self.__lock.reading():
+            data = dict()
+            for index, date in enumerate(self.__dates):
+                bundle = self.get_summary_bundle_of_date(date)
+                data[index] = bundle
+            return data
 
     def get_summary_bundle_of_date(self, date: str) -> dict:
         """
@@ -254,25 +499,26 @@ class SummaryContainer:
         The keys in the dictionary are the attributes of the summary objects.
         """
 
-        date_summaries = []
-        for summary_type in self.__contained_summaries:
-            date_summary = self.get_summary_of_date(summary_type, date)
-            if date_summary:
-                date_summaries.append(date_summary)
+        with self.__lock.reading():
+            date_summaries = []
+            for summary_type in self.__contained_summaries:
+                date_summary = self.get_summary_of_date(summary_type, date)
+                if date_summary:
+                    date_summaries.append(date_summary)
         
-        bundle = dict()
-        bundle[SUMMARY_DATE] = date
-        for summary in date_summaries:
-            summary_type = summary.summary_type
+            bundle = dict()
+            bundle[SUMMARY_DATE] = date
+            for summary in date_summaries:
+                summary_type = summary.summary_type
             
-            # every attribute we stored in the summary
-            for attr in summary.measurement_attributes: 
-                if attr == SUMMARY_DATE:
-                    continue
-                bundle_attr_name = "{}_{}".format(summary_type.name, attr)
-                bundle[bundle_attr_name] = getattr(summary, attr)
+                # every attribute we stored in the summary
+                for attr in summary.measurement_attributes: 
+                    if attr == SUMMARY_DATE:
+                        continue
+                    bundle_attr_name = "{}_{}".format(summary_type.name, attr)
+                    bundle[bundle_attr_name] = getattr(summary, attr)
 
-        return bundle
+            return bundle
 
 
     def get_values(self, start: str, end: str, summary_type: SummaryType, measurement_name: str, output_as_np_array=True) -> Union[np.array, List]:
@@ -280,48 +526,116 @@ class SummaryContainer:
         Creating a one dimensional numpy array with one entry for each date from start to end.
         The array is containing the values of the given summary type and measurement.
         If a summary object is not contained, the content will be NaN.
+        If measurement arrays are set and contain the measurement, the values are read from them,
+        the numpy array is a read only slice of them and missing values of the list are None.
         """
 
-        dates = all_date_strings_between_dates(start, end)
-        if output_as_np_array:
-            values = np.empty(len(dates))
-            values[:] = np.NaN
-        else: # output as python list
-            values = [None] * len(dates)
-
-        summaries = self.get_summaries_within_timerange(summary_type, start, end)
-        summary_iter = iter(summaries)
+        with self.__lock.reading():
+            if self.__measurement_arrays is not None and self.__measurement_arrays.has_measurement(summary_type, measurement_name):
+                values = self.__measurement_arrays.get_values(start, end, summary_type, measurement_name)
+                is_missing = np.isnan(values)
+                if is_missing.all():
+                    raise AttributeError("No {}-{} avalable from {} until {}".format(summary_type.name, measurement_name, start, end))
+                if output_as_np_array:
+                    return values
+                return [None if missing else value for value, missing in zip(values.tolist(), is_missing.tolist())]
 
-        current_summary = next(summary_iter)
-        always_attribute_error = True
+            start_ordinal = date_string_to_ordinal(start)
+            end_ordinal = date_string_to_ordinal(end)
+            n_days = end_ordinal - start_ordinal + 1
 
-        for index, date in enumerate(dates):
-            if current_summary.summary_date == date:
+            summaries, ordinals = self.__get_summaries_and_ordinals_within_timerange(summary_type, start_ordinal, end_ordinal)
+            if len(summaries) == 0:
+                raise AttributeError("No {} summaries available from {} until {}".format(summary_type.name, start, end))
 
+            # the values and their positions of all summaries the measurement is available in
+            positions, available_values = [], []
+            for position, summary_obj in zip(ordinals - start_ordinal, summaries):
                 # value might not be available for that date
                 try:
-                    value = getattr(current_summary, measurement_name)
-                    values[index] = value
-                    always_attribute_error = False
+                    available_values.append(getattr(summary_obj, measurement_name))
+                    positions.append(position)
                 except AttributeError:
                     pass
 
-                # iterator might be at end
+            if len(positions) == 0:
+                raise AttributeError("No {}-{} avalable in summary objects".format(summary_type.name, measurement_name))
+
+            if output_as_np_array:
+                values = np.full(n_days, np.nan)
+                values[positions] = available_values
+            else: # output as python list
+                values = [None] * n_days
+                for position, value in zip(positions, available_values):
+                    values[position] = value
+
+            return values
+
+    def get_value_matrix(self, start: str, end: str, summary_type_measurement_tuples: List[Tuple[SummaryType, str]]) -> np.array:
+        """
+        Creating a two dimensional numpy array with one row for each date from start to end
+        and one column for each summary_type-measurement_name combination, in the given order.
+        Values which are not contained are NaN, as well as whole columns
+        of measurements which are not available at all.
+        """
+
+        with self.__lock.reading():
+            n_days = date_string_to_ordinal(end) - date_string_to_ordinal(start) + 1
+            matrix = np.full((n_days, len(summary_type_measurement_tuples)), np.nan)
+
+            for column, (summary_type, measurement_name) in enumerate(summary_type_measurement_tuples):
                 try:
-                    current_summary = next(summary_iter)
-                except StopIteration:
-                    return values
+                    matrix[:, column] = self.get_values(start, end, summary_type, measurement_name)
+                except AttributeError:
+                    # measurement not available
+                    pass
+
+            return matrix
+
 
-        if always_attribute_error:
-            raise AttributeError("No {}-{} avalable in summary objects".format(summary_type.name, measurement_name))
+    def get_measurement_names(self, summary_type: SummaryType) -> List[str]:
+        """ Returns the sorted names of all measurements contained in any summary object of the given summary type. """
+        with self.__lock.reading():
+            cont_attr_name = self.__get_container_attribute_name(summary_type)
+            if not cont_attr_name:
+                return []
+
+            measurement_names = set()
+            for summary_obj in getattr(self, cont_attr_name):
+                measurement_names.update(summary_obj.measurement_attributes)
+            measurement_names.discard(SUMMARY_DATE)
+
+            if self.__measurement_arrays is not None:
+                measurement_names.update(self.__measurement_arrays.get_measurement_names(summary_type))
+
+            return sorted(measurement_names)
 
-        return values
 
     def get_missing_subjective_data_days(self) -> List[str]:
-        given_dates = []
-        for summary_obj in getattr(self, self.__get_container_attribute_name(SummaryType.subjective)):
-            date = summary_obj.summary_date
-            given_dates.append(date)
-        
-        missing_dates = sorted(set(self.__dates) - set(given_dates))
-        return missing_dates
\ No newline at end of file
+        """ Returns the sorted days without subjective data in YYYY-MM-DD format. """
+        return ordinals_to_date_strings(np.asarray(self.__missing_subjective_data_days.get_ordinals(), dtype=np.int64))
+
+    def count_missing_subjective_data_days(self) -> int:
+        return self.__missing_subjective_data_days.count_all_days()
+
+    def get_next_missing_subjective_data_day(self, date: str = None) -> Union[str, None]:
+        """
+        Returns the first day without subjective data at or after the given day,
+        by default from the starting date on. None if there is no such day.
+        """
+        date = self.__starting_date if date is None else date
+        ordinal = self.__missing_subjective_data_days.get_next_ordinal(date_string_to_ordinal(date))
+        return None if ordinal is None else ordinal_to_date_string(ordinal)
+
+    def get_missing_subjective_data_month_days(self, year: int, month: int) -> List[int]:
+        """ Returns the days of the month without subjective data, e.g. [1, 2, 17]. """
+        return self.__missing_subjective_data_days.get_days(year, month)
+
+    def is_missing_subjective_data_day(self, date: str) -> bool:
+        return self.__missing_subjective_data_days.contains_ordinal(date_string_to_ordinal(date))
+
+    def discard_missing_subjective_data_days(self, dates: List[str]):
+        """
+        Marking the days as given, e.g. for subjective inputs which are loaded into the container with the next load.
+        """
+        self.__missing_subjective_data_days.remove_ordinals(date_strings_to_ordinals(dates).tolist())
\ No newline at end of file
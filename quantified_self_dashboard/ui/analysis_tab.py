@@ -1,9 +1,14 @@
 import wx
 import wx.adv
 
+from common.constants import AnalysisJobState
+
 
 class AnalysisTab(wx.Panel):
 
+    # background of calendar days with data of only some summary types
+    __partial_coverage_colour = wx.Colour(255, 230, 180)
+
     def __init__(self, parent, callback_wrapper):
         self.__display_name = "Analysis"
         self.__callback_wrapper = callback_wrapper
@@ -14,11 +19,19 @@ class AnalysisTab(wx.Panel):
         self.calendar_heading_sizer = wx.GridSizer(rows=1, cols=2, hgap=5, vgap=300)
         self.calendar_sizer = wx.GridSizer(rows=1, cols=2, hgap=5, vgap=20)
 
+        self.submission_sizer = wx.BoxSizer(wx.HORIZONTAL)
+
+        # analysis type: row of the job in the job list
+        self.__job_rows = dict()
+
         self.__prepare_calendar()
         self.__prepare_choice_and_submission()
 
         top_sizer.Add(self.calendar_heading_sizer, 0, 0)
         top_sizer.Add(self.calendar_sizer, 0, wx.EXPAND)
+        top_sizer.Add(self.submission_sizer, 0, 0)
+        top_sizer.Add(self.job_list, 0, wx.EXPAND)
+        top_sizer.Add(self.analysis_image, 1, wx.EXPAND)
 
         top_sizer.SetSizeHints(self)
         self.SetSizer(top_sizer)
@@ -53,63 +66,121 @@ class AnalysisTab(wx.Panel):
         self.calendar_sizer.Add(self.start_cal)
         self.calendar_sizer.Add(self.end_cal)
 
-        self.__highlight_available_month_days_start_cal()
-        self.__highlight_available_month_days_end_cal()
+        self.__highlight_available_month_days(self.start_cal)
+        self.__highlight_available_month_days(self.end_cal)
 
 
     def __prepare_choice_and_submission(self):
-        
 
-        # self.analyse_btn = wx.Button(self, -1, "Analyse")
-        # self.analyse_btn.Bind(wx.EVT_BUTTON, self.on_analyse_btn_click)
-        pass
+        self.analysis_choice = wx.Choice(self, -1, choices=self.__callback_wrapper.get_analysis_type_choice_list())
+        self.analysis_choice.SetSelection(0)
+
+        self.analyse_btn = wx.Button(self, -1, "Analyse")
+        self.analyse_btn.Bind(wx.EVT_BUTTON, self.on_analyse_btn_click)
+
+        self.cancel_btn = wx.Button(self, -1, "Cancel")
+        self.cancel_btn.Bind(wx.EVT_BUTTON, self.on_cancel_btn_click)
+
+        self.submission_sizer.Add(self.analysis_choice, 0, 0)
+        self.submission_sizer.Add(self.analyse_btn, 0, 0)
+        self.submission_sizer.Add(self.cancel_btn, 0, 0)
+
+        # queued, running and finished analyses, one row per analysis type
+        self.job_list = wx.ListCtrl(self, -1, style=wx.LC_REPORT | wx.LC_SINGLE_SEL)
+        self.job_list.InsertColumn(0, "Analysis")
+        self.job_list.InsertColumn(1, "Range")
+        self.job_list.InsertColumn(2, "State")
+
+        # image of the latest finished analysis
+        self.analysis_image = wx.StaticBitmap(self, -1)
 
 
 
     def on_change_sel_start_date(self, evt):
-        self.__current_start_date = evt.GetDate()
+        self.__set_current_start_date(evt.GetDate())
 
     def on_change_sel_end_date(self, evt):
-        self.__current_end_date = evt.GetDate()
+        self.__set_current_end_date(evt.GetDate())
 
     def on_change_month_start_date(self, evt):
-        self.__current_start_date = evt.GetDate()
-        self.__highlight_available_month_days_start_cal()
+        self.__set_current_start_date(evt.GetDate())
+        self.__highlight_available_month_days(self.start_cal)
 
     def on_change_month_end_date(self, evt):
-        self.__current_end_date = evt.GetDate()
-        self.__highlight_available_month_days_end_cal()
+        self.__set_current_end_date(evt.GetDate())
+        self.__highlight_available_month_days(self.end_cal)
+
+    def __set_current_start_date(self, date):
+        if not date.IsSameDate(self.__current_start_date):
+            # analyses of the old date range are not needed anymore
+            self.__callback_wrapper.cancel_analyses()
+        self.__current_start_date = date
+
+    def __set_current_end_date(self, date):
+        if not date.IsSameDate(self.__current_end_date):
+            self.__callback_wrapper.cancel_analyses()
+        self.__current_end_date = date
     
-    def __highlight_available_month_days_start_cal(self):
-        for i in range(1, 32):
-            self.start_cal.ResetAttr(i)
+    def __highlight_available_month_days(self, cal):
+        """
+        Highlighting the days of the shown month with data,
+        days with all summary types as holidays and days with only some summary types by their background.
+        """
 
-        date = self.start_cal.GetDate()
-        self.__current_start_year = date.GetYear()
-        self.__current_start_month = date.GetMonth() + 1
-
-        for date_str in self.__callback_wrapper.get_available_dates():
-            year, month, day = map(int, date_str.split('-'))
-            if month == self.__current_start_month and year == self.__current_start_year:
-                self.start_cal.SetHoliday(day)
-    
-    def __highlight_available_month_days_end_cal(self):
         for i in range(1, 32):
-            self.end_cal.ResetAttr(i)
+            cal.ResetAttr(i)
 
-        date = self.end_cal.GetDate()
-        self.__current_end_year = date.GetYear()
-        self.__current_end_month = date.GetMonth() + 1
+        date = cal.GetDate()
+        n_summary_types = len(self.__callback_wrapper.get_covered_summary_types())
+        coverage = self.__callback_wrapper.get_month_coverage(date.GetYear(), date.GetMonth() + 1)
 
-        for date_str in self.__callback_wrapper.get_available_dates():
-            year, month, day = map(int, date_str.split('-'))
-            if month == self.__current_end_month and year == self.__current_end_year:
-                self.end_cal.SetHoliday(day)
+        for day, summary_types in coverage.items():
+            if len(summary_types) == n_summary_types:
+                cal.SetHoliday(day)
+            else:
+                cal.SetAttr(day, wx.adv.CalendarDateAttr(colBack=self.__partial_coverage_colour))
+        cal.Refresh()
 
 
     @property
     def display_name(self):
         return self.__display_name
 
-    def on_analyse_btn_click(self):
-        pass
+    def on_analyse_btn_click(self, evt):
+        start = self.__current_start_date.FormatISODate()
+        end = self.__current_end_date.FormatISODate()
+        selection = self.analysis_choice.GetString(self.analysis_choice.GetSelection())
+
+        # the job runs on a worker thread, its state changes are passed on to the event thread
+        self.__callback_wrapper.create_analysis(start, end, selection, lambda job: wx.CallAfter(self.on_analysis_job_state_changed, job))
+
+    def on_cancel_btn_click(self, evt):
+        self.__callback_wrapper.cancel_analyses()
+
+    def on_analysis_job_state_changed(self, job):
+        # a superseded job must not overwrite the row of the newer job of the same analysis type
+        if job not in self.__callback_wrapper.get_analysis_jobs():
+            return
+
+        if job.analysis_type not in self.__job_rows.keys():
+            self.__job_rows[job.analysis_type] = self.job_list.InsertItem(self.job_list.GetItemCount(), job.analysis_type.name)
+        row = self.__job_rows[job.analysis_type]
+
+        state = job.state.name if job.error is None else "{}: {}".format(job.state.name, job.error)
+        self.job_list.SetItem(row, 1, "{} - {}".format(job.start, job.end))
+        self.job_list.SetItem(row, 2, state)
+
+        if job.state == AnalysisJobState.finished:
+            self.__show_image(job.path_names)
+
+    def __show_image(self, path_names):
+        image_path_names = [path_name for path_name in path_names if path_name.endswith(".png")]
+        if len(image_path_names) == 0:
+            return
+
+        image = wx.Image(image_path_names[0], wx.BITMAP_TYPE_PNG)
+        width, height = self.GetClientSize()
+        if width > 0 and image.GetWidth() > width:
+            image = image.Scale(width, int(image.GetHeight() * width / image.GetWidth()), wx.IMAGE_QUALITY_HIGH)
+        self.analysis_image.SetBitmap(wx.Bitmap(image))
+        self.Layout()
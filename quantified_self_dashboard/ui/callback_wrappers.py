@@ -1,36 +1,300 @@
-from typing import List
-from common.constants import *
-from common.date_helper import *
+from __future__ import annotations
+
+import contextlib
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Union
+from common.constants import AnalysisType, AnalysisJobState, SummaryType, all_analysis_types
+from common.date_helper import all_date_strings_between_dates, datetime_to_simple_iso, ordinals_between_dates
+from common.month_day_index import MonthDayIndex
 from datetime import datetime
+from common import instrumentation
 
 
 class MainTabCallbackWrapper:
-    def __init__(self, summary_container, storage):
+    def __init__(self, summary_container, storage, journal=None):
         self.__summary_container = summary_container
         self.__storage = storage
+        self.__journal = journal
+
+        # state of the background save, a request while saving is merged into one follow-up save
+        self.__save_lock = threading.Lock()
+        self.__save_thread = None
+        self.__save_pending = False
+        self.__save_callbacks = (None, None)
+
+    def save_session(self, on_progress: Callable[[str, float], None] = None):
+        """
+        Loading the new data into the container and saving it into the storage file.
+
+        Parameters
+        ----------
+        on_progress : Callable[[str, float], None]
+            Called with the name of each stage and the finished fraction from 0 to 1.
+        """
+
+        def progress(stage, fraction):
+            if on_progress is not None:
+                on_progress(stage, fraction)
+
+        with instrumentation.span("save_session"):
+            # records written while saving are not in the storage file yet and stay in the journal
+            journal_position = self.__journal.get_position() if self.__journal is not None else None
+            progress("loading", 0.0)
+            self.__summary_container.load()
+            progress("saving", 0.3)
+            self.__storage.save(self.__summary_container)
+            if self.__journal is not None:
+                progress("journal", 0.9)
+                self.__journal.discard_until(journal_position)
+            progress("finished", 1.0)
+
+    def request_save(self, on_progress: Callable[[str, float], None] = None, on_finished: Callable[[Exception], None] = None) -> bool:
+        """
+        Saving the session on a background thread, so the caller, e.g. the GUI event thread, is not blocked.
+        While a save is running, all further requests are merged into one save after it.
+        The callbacks are called from the background thread,
+        the GUI has to pass them on to its event thread, e.g. with wx.CallAfter.
+
+        Parameters
+        ----------
+        on_progress : Callable[[str, float], None]
+            Called with the name of each stage and the finished fraction from 0 to 1.
+
+        on_finished : Callable[[Exception], None]
+            Called after each save with None, or with the exception the save failed with.
+
+        Returns
+        -------
+        bool
+            whether a new save started, False if the request was merged into the follow-up save
+        """
+
+        with self.__save_lock:
+            self.__save_callbacks = (on_progress, on_finished)
+            if self.__save_thread is not None:
+                self.__save_pending = True
+                return False
+
+            # not a daemon thread, so a running save is finished before the application exits
+            self.__save_thread = threading.Thread(target=self.__save_in_background, name="save_session")
+            self.__save_thread.start()
+            return True
+
+    def __save_in_background(self):
+        while True:
+            with self.__save_lock:
+                self.__save_pending = False
+                on_progress, on_finished = self.__save_callbacks
 
-    def save_session(self):
-        self.__summary_container.load()
-        self.__storage.save(self.__summary_container)
-        print("finished saving")
+            error = None
+            try:
+                self.save_session(on_progress)
+            except Exception as e:
+                error = e
+            if on_finished is not None:
+                on_finished(error)
 
+            with self.__save_lock:
+                if not self.__save_pending:
+                    self.__save_thread = None
+                    return
+
+    def is_saving(self) -> bool:
+        with self.__save_lock:
+            return self.__save_thread is not None
+
+    def wait_for_save(self):
+        """ Blocking until the running save and its follow-up save are finished. """
+        while True:
+            with self.__save_lock:
+                save_thread = self.__save_thread
+            if save_thread is None:
+                return
+            save_thread.join()
+
+
+
+
+class AnalysisJob:
+    """ One requested analysis, its state and its output paths once it is finished. """
+
+    def __init__(self, job_id: int, analysis_type: AnalysisType, start: str, end: str, on_state_changed: Callable[[AnalysisJob], None] = None):
+        self.job_id = job_id
+        self.analysis_type = analysis_type
+        self.start = start
+        self.end = end
+        self.state = AnalysisJobState.queued
+        self.path_names = []
+        self.error = None
+
+        # set when the job is superseded or cancelled while it is running
+        self.cancel_requested = threading.Event()
+        self.future = None
+        self.__on_state_changed = on_state_changed
+
+    def set_state(self, state: AnalysisJobState):
+        self.state = state
+        if self.__on_state_changed is not None:
+            self.__on_state_changed(self)
+
+    @property
+    def is_done(self) -> bool:
+        return self.state in [AnalysisJobState.finished, AnalysisJobState.failed, AnalysisJobState.cancelled]
 
 
 
 class AnalysisTabCallbackWrapper:
-    def __init__(self, analyser, starting_date):
+
+    # summary types whose available days are shown in the calendars
+    __covered_summary_types = [SummaryType.sleep, SummaryType.readiness, SummaryType.activity, SummaryType.bedtime, SummaryType.subjective]
+
+    def __init__(self, analyser, starting_date, container=None, max_workers: int = 1):
+        """
+        Parameters
+        ----------
+        container : SummaryContainer
+            Container of the analyser, for indexing the days with data of each summary type
+            and for holding off its loads while an analysis reads its data.
+            Without a container, all days from the starting date until today are available.
+
+        max_workers : int
+            Number of threads creating the figures of the analyses,
+            the images are exported by the exporter processes of the analyser.
+        """
+
         self.__analyser = analyser
         self.__starting_date = starting_date
+        self.__container = container
+
+        # summary type: index of the days with a summary, kept up to date by the loads of the container
+        self.__coverage = dict()
+        if container is not None:
+            for summary_type in self.__covered_summary_types:
+                ordinals = container.get_available_ordinals(summary_type)
+                if len(ordinals) > 0:
+                    self.__coverage[summary_type] = MonthDayIndex(ordinals.tolist())
+            container.add_load_listener(self.__on_summaries_loaded)
+        else:
+            self.__coverage[None] = MonthDayIndex(ordinals_between_dates(starting_date, datetime_to_simple_iso(datetime.today())).tolist())
+
+        self.__executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analysis")
+        self.__jobs_lock = threading.Lock()
+        self.__job_ids = itertools.count()
+
+        # analysis type: latest job, a newer job of the same analysis type supersedes the older one
+        self.__latest_jobs = dict()
 
     def get_available_dates(self) -> List[str]:
         return all_date_strings_between_dates(self.__starting_date, datetime_to_simple_iso(datetime.today()))
 
+    def __on_summaries_loaded(self, summary_type: SummaryType, added_ordinals):
+        if summary_type not in self.__covered_summary_types:
+            return
+        if summary_type not in self.__coverage.keys():
+            self.__coverage[summary_type] = MonthDayIndex()
+        self.__coverage[summary_type].add_ordinals(added_ordinals.tolist())
+
+    def get_covered_summary_types(self) -> List[SummaryType]:
+        """ Summary types with at least one available day, None if only the date range is known. """
+        return list(self.__coverage.keys())
+
+    def get_month_coverage(self, year: int, month: int) -> Dict[int, List[SummaryType]]:
+        """ Returns the days of the month with data, each with the summary types available on it. """
+
+        coverage = dict()
+        for summary_type, index in list(self.__coverage.items()):
+            for day in index.get_days(year, month):
+                coverage.setdefault(day, []).append(summary_type)
+        return coverage
+
     def get_analysis_type_choice_list(self) -> List[str]:
         return list(map(lambda x: x.name, all_analysis_types))
 
-    def create_analysis(self, start, end):
+    def create_analysis(self, start: str, end: str, selection: str, on_state_changed: Callable[[AnalysisJob], None] = None) -> AnalysisJob:
+        """
+        Queueing the analysis on the worker threads, so the caller, e.g. the GUI event thread, is not blocked.
+        A queued or running job of the same analysis type is cancelled.
+        The callback is called from the worker threads with each state change of the job,
+        the GUI has to pass it on to its event thread, e.g. with wx.CallAfter.
+
+        Parameters
+        ----------
+        start : str
+            Analysis start date in YYYY-MM-DD format.
+
+        end : str
+            Analysis end date in YYYY-MM-DD format.
+
+        selection : str
+            Name of the analysis type.
+
+        on_state_changed : Callable[[AnalysisJob], None]
+            Called with the job whenever its state changed.
+        """
+
         analysis_type = AnalysisType[selection]
-        # self.__analyser.analyse()
+        job = AnalysisJob(next(self.__job_ids), analysis_type, start, end, on_state_changed)
+
+        with self.__jobs_lock:
+            superseded_job = self.__latest_jobs.get(analysis_type)
+            self.__latest_jobs[analysis_type] = job
+        if superseded_job is not None:
+            self.__cancel_job(superseded_job)
+
+        job.set_state(AnalysisJobState.queued)
+        job.future = self.__executor.submit(self.__run_job, job)
+        return job
+
+    def __run_job(self, job: AnalysisJob):
+        if job.cancel_requested.is_set():
+            job.set_state(AnalysisJobState.cancelled)
+            return
+
+        job.set_state(AnalysisJobState.running)
+
+        try:
+            with instrumentation.span("analysis_job"):
+                # a save loading the container meanwhile would mix data from before and after the load
+                with self.__container.reading() if self.__container is not None else contextlib.nullcontext():
+                    futures = self.__analyser.analyse(job.start, job.end, job.analysis_type)
+                for future in futures:
+                    if job.cancel_requested.is_set():
+                        # exports which did not start yet are dropped
+                        for remaining_future in futures:
+                            remaining_future.cancel()
+                        break
+                    job.path_names.append(future.result())
+        except Exception as e:
+            job.error = e
+            job.set_state(AnalysisJobState.failed)
+        else:
+            job.set_state(AnalysisJobState.cancelled if job.cancel_requested.is_set() else AnalysisJobState.finished)
+
+    def __cancel_job(self, job: AnalysisJob):
+        """ Cancelling a queued job right away, a running job stops after its current step. """
+        job.cancel_requested.set()
+        if job.future is not None and job.future.cancel():
+            job.set_state(AnalysisJobState.cancelled)
+
+    def cancel_analyses(self):
+        """ Cancelling all queued and running analyses, e.g. when the date range changed. """
+        with self.__jobs_lock:
+            jobs = list(self.__latest_jobs.values())
+        for job in jobs:
+            if not job.is_done:
+                self.__cancel_job(job)
+
+    def get_analysis_jobs(self) -> List[AnalysisJob]:
+        """ Returns the latest job of each requested analysis type. """
+        with self.__jobs_lock:
+            return list(self.__latest_jobs.values())
+
+    def shutdown(self, wait: bool = True):
+        """ Cancelling all analyses and stopping the worker threads. """
+        self.cancel_analyses()
+        self.__executor.shutdown(wait=wait)
 
     def get_starting_date(self):
         return self.__starting_date
@@ -46,13 +310,18 @@ class SubjectiveInputCallbackWrapper:
         self.__analyser = analyser
         self.__subjective_input_structure = subjective_input_structure
 
-        self.__load_missing_subjective_data_days()
+    def get_missing_month_days(self, year: int, month: int) -> List[int]:
+        """ Returns the days of the month without subjective data. """
+        return self.__summary_container.get_missing_subjective_data_month_days(year, month)
 
-    def __load_missing_subjective_data_days(self):
-        self.__missing_subjective_data_days = self.__summary_container.get_missing_subjective_data_days()
-    
-    def get_missing_subjective_data_days(self):
-        return self.__missing_subjective_data_days 
+    def is_missing_subjective_data_day(self, date: str) -> bool:
+        return self.__summary_container.is_missing_subjective_data_day(date)
+
+    def get_next_missing_subjective_data_day(self, date: str = None) -> Union[str, None]:
+        return self.__summary_container.get_next_missing_subjective_data_day(date)
+
+    def count_missing_subjective_data_days(self) -> int:
+        return self.__summary_container.count_missing_subjective_data_days()
 
     def get_subjective_input_structure(self):
         return self.__subjective_input_structure
@@ -62,5 +331,7 @@ class SubjectiveInputCallbackWrapper:
 
     def add_subjective_input(self, summary_date, data: dict):
         self.__gui_intput_connector.add_subjective_input(summary_date, data)
+        # the input is loaded into the container with the next save
+        self.__summary_container.discard_missing_subjective_data_days([summary_date])
 
     
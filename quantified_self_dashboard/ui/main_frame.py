@@ -2,7 +2,7 @@ import wx
 from ui.main_tab import MainTab
 from ui.subjective_input_tab import SubjectiveInputTab
 from ui.analysis_tab import AnalysisTab
-from ui.callback_wrappers import *
+from ui.callback_wrappers import SubjectiveInputCallbackWrapper, MainTabCallbackWrapper, AnalysisTabCallbackWrapper
 
 class MainFrame(wx.Frame):
 
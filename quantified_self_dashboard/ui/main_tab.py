@@ -8,12 +8,43 @@ class MainTab(wx.Panel):
 
         wx.Panel.__init__(self, parent)
 
+        top_sizer = wx.BoxSizer(wx.VERTICAL)
+
         self.save_btn = wx.Button(self, -1, "Save Changes")
         self.save_btn.Bind(wx.EVT_BUTTON, self.on_save_btn_click)
 
+        # progress of the save running in the background
+        self.save_gauge = wx.Gauge(self, -1, range=100)
+        self.save_status = wx.StaticText(self, -1, "")
+
+        top_sizer.Add(self.save_btn, 0, 0)
+        top_sizer.Add(self.save_gauge, 0, wx.EXPAND)
+        top_sizer.Add(self.save_status, 0, 0)
+
+        top_sizer.SetSizeHints(self)
+        self.SetSizer(top_sizer)
+
     @property
     def display_name(self):
         return self.__display_name
-    
+
     def on_save_btn_click(self, event):
-        self.__callback_wrapper.save_session()
\ No newline at end of file
+        # the save runs on a background thread, its callbacks are passed on to the event thread
+        started = self.__callback_wrapper.request_save(
+            on_progress=lambda stage, fraction: wx.CallAfter(self.on_save_progress, stage, fraction),
+            on_finished=lambda error: wx.CallAfter(self.on_save_finished, error),
+        )
+        if not started:
+            self.save_status.SetLabel("Saving again after the running save")
+
+    def on_save_progress(self, stage, fraction):
+        self.save_gauge.SetValue(int(round(fraction * 100)))
+        self.save_status.SetLabel("Saving: {}".format(stage))
+
+    def on_save_finished(self, error):
+        if error is None:
+            self.save_status.SetLabel("Saved")
+        else:
+            self.save_gauge.SetValue(0)
+            self.save_status.SetLabel("Saving failed")
+            wx.MessageBox(str(error), "Saving failed", wx.OK | wx.ICON_ERROR)
@@ -74,7 +74,6 @@ class SubjectiveInputTab(wx.Panel):
         self.cal.Bind(wx.adv.EVT_CALENDAR_MONTH,           self.on_change_month)
         self.cal.Bind(wx.adv.EVT_CALENDAR_SEL_CHANGED,     self.on_cal_sel_changed)
 
-        self.__missing_input_days = self.__subjective_input_callback_wrapper.get_missing_subjective_data_days()
         self.__highlight_month_days()
 
 
@@ -87,10 +86,9 @@ class SubjectiveInputTab(wx.Panel):
         self.__current_year = date.GetYear()
         self.__current_month = date.GetMonth() + 1
 
-        for date_str in self.__missing_input_days:
-            year, month, day = map(int, date_str.split('-'))
-            if month == self.__current_month and year == self.__current_year:
-                self.cal.SetHoliday(day)
+        for day in self.__subjective_input_callback_wrapper.get_missing_month_days(self.__current_year, self.__current_month):
+            self.cal.SetHoliday(day)
+        self.cal.Refresh()
             
 
     def on_change_month(self, evt):
@@ -107,18 +105,7 @@ class SubjectiveInputTab(wx.Panel):
 
     def on_select_btn_click(self, evt):
         date = self.cal.GetDate()
-        selected_year = date.GetYear()
-        selected_month = date.GetMonth()+1
-        selected_day = date.GetDay()
-
-        selected_date_is_missing_input = False
-        for date_str in self.__missing_input_days:
-            year, month, day = map(int, date_str.split('-'))
-            if year == selected_year and selected_month == selected_month and day == selected_day:
-                selected_date_is_missing_input = True
-                break
-
-        if selected_date_is_missing_input:
+        if self.__subjective_input_callback_wrapper.is_missing_subjective_data_day(date.FormatISODate()):
             self.enable_input_fields()
             self.save_btn.Enable()
 
@@ -128,8 +115,6 @@ class SubjectiveInputTab(wx.Panel):
         year, month, day = date.GetYear(), date.GetMonth()+1, date.GetDay()
 
         date_str = "{}-{:02d}-{:02d}".format(year, month, day)
-        self.__missing_input_days.remove(date_str)
-        self.__highlight_month_days()
 
         current_input_data = dict()
         for name, tupl in self.__input_fields.items():
@@ -138,6 +123,14 @@ class SubjectiveInputTab(wx.Panel):
             current_input_data[name] = value
         self.__subjective_input_callback_wrapper.add_subjective_input(date_str, current_input_data)
 
+        # moving on to the next day without input, for entering several days in a row
+        next_missing_day = self.__subjective_input_callback_wrapper.get_next_missing_subjective_data_day(date_str)
+        if next_missing_day is not None:
+            next_date = wx.DateTime()
+            next_date.ParseISODate(next_missing_day)
+            self.cal.SetDate(next_date)
+        self.__highlight_month_days()
+
         self.disable_input_fields()
         self.save_btn.Disable()
 